@@ -0,0 +1,114 @@
+"""
+Benchmark do TextCleaner (src/processors/cleaner.py): MB/s do process()
+original (cópia congelada em benchmarks/reference_cleaner.py) x atual,
+melhor de N execuções, sobre o texto bruto dos PDFs de data/inputs e as
+páginas HTML do cache HTTP (ou, sem eles, textos sintéticos gerados com os
+gatilhos de todas as regras, semente fixa).
+
+A equivalência com o original é verificada em tests/test_cleaner_golden.py.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_cleaner
+    python -m benchmarks.bench_cleaner --samples 5000 --repeat 5
+"""
+import argparse
+import glob
+import os
+import random
+import time
+
+from benchmarks.reference_cleaner import ReferenceTextCleaner
+from src.processors.cleaner import TextCleaner
+
+# Trechos que disparam as regras do cleaner (e combinações perigosas entre elas)
+TRIGGERS = [
+    "ipam_amazonia x", "IPAMamazonia", "ipam.org.br/nota", "otnemuA", "oãçudeR",
+    "Sugestão de referência: Silva", "NOTA TÉCNICA Nº 5", "--- PAGE 3 ---",
+    "http://g1.globo.com/a?b=1", "www.inpe.br/queimadas", "Ouça este conteúdo",
+    "VEJA TAMBÉM", "Notícias \n MEIO AMBIENTE", "Por WWF-Brasil", "brasília, 12 34",
+    "Brigadistas do Ibama atuam no Amazonas", "- •", "Terra Brasilis|",
+    "Terra Brasilis Queimadas painel\nclicando nesta caixa.",
+    "Sobre Terra Brasillis aviso Não mostrar novamente.", "vide linha 13 abaixo",
+    "viAcessar material", "Acesse o site do INPE", "Clique aqui para ver",
+    "- Foto: MapBiomas ", "– Arte g1", "/ File Photo", "/Reuters",
+    "— Foto: João Silva/Agência Brasil", "Foto: Divulgação", "Fonte: INPE",
+    "(ver Figura 2)", "( Tabela 3.1 ).", "(Fig. 4)", "Figura 4.", "Tabela 5",
+    "Quadro 6", "SILVA, J. Fogo.", "2020. Título", "Vol. 3", "Disponível em: link",
+    "Acesso em: 10 jan.", "SUMÁRIO 3.", "REFERÊNCIAS", "INTRODUÇÃO ...",
+    "cons- tituição", "1.234.567", "silvaet al. 2020", "texto • item", "●",
+    "algoprint", "textoinfo", "infoprint", "20202021", "fim:Começo", "a;B", "(x)Y",
+    "MATO GROSSO DO SUL", "MATO GROSSO", "PARÁ", "PARAÍBA", "PARANÁ", "RIO DE JANEIRO",
+    "xYz", "ABCd", "12abc", "fim.Começo", "Map Biomas", "You Tube", "“aspas”",
+    "‘simples’", "–", "—", "√°", "√£", "√ß√£o", "‚Äú", "‚Äù", "‚Äì", "\x00", "\x07",
+    "​", "﻿", "­", "<b>", "</p>", "<a href='x'>", "é", "\t",
+    # Trocas em cascata/sobrepostas das tabelas literais (LiteralReplacer)
+    "√√°", "√√√°", "‚Ä√¨", "√‚Äú", "BAHIAMAPÁ", "AMAZONASERGIPE", "PARÁPARANÁ",
+    "MATO GROSSO DO SULMATO GROSSO", "“–”",
+    # Letras que o re.IGNORECASE iguala a i/s mas o str.lower() não
+    "Sugeſtão de referência", "ıpam.org.br", "İPAM_amazonia",
+]
+WORDS = ["queimadas", "Amazônia", "focos", "de", "calor", "no", "Cerrado", "INPE",
+         "satélite", "O", "desmatamento", "cresceu", "em", "2024", "A", "área", "."]
+SEPARATORS = ["", " ", " ", " ", "\n", "\n\n", ". ", ", "]
+
+
+def synthetic_samples(n, seed=42):
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(n):
+        parts = []
+        for _ in range(rng.randint(3, 60)):
+            parts.append(rng.choice(TRIGGERS) if rng.random() < 0.5 else rng.choice(WORDS))
+            parts.append(rng.choice(SEPARATORS))
+        samples.append("".join(parts))
+    return samples
+
+
+def real_samples(input_dir='data/inputs', cache_dir='data/00_state/http_cache'):
+    samples = []
+    pdfs = sorted(glob.glob(os.path.join(input_dir, '*.pdf')))
+    if pdfs:
+        from src.collectors.pdf_engine import PDFEngine
+        engine = PDFEngine()
+        try:
+            for path in pdfs:
+                result = engine.parse(path)
+                if result:
+                    samples.append(result['raw_content'])
+        finally:
+            engine.close()
+    for path in sorted(glob.glob(os.path.join(cache_dir, '*.body'))):
+        with open(path, 'rb') as f:
+            samples.append(f.read().decode('utf-8', errors='replace'))
+    return samples
+
+
+def throughput(cleaner, text, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cleaner.process(text)
+        best = min(best, time.perf_counter() - start)
+    return len(text.encode('utf-8')) / best / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do TextCleaner")
+    parser.add_argument('--samples', type=int, default=3000, help="textos sintéticos")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    real = real_samples()
+    synthetic = synthetic_samples(args.samples)
+
+    corpus = "\n".join(real) or "\n".join(synthetic)
+    before = throughput(ReferenceTextCleaner(), corpus, args.repeat)
+    after = throughput(TextCleaner(), corpus, args.repeat)
+    print(f"\n[VAZÃO] process() sobre {len(corpus.encode('utf-8')) / 1e6:.2f} MB "
+          f"(melhor de {args.repeat}):")
+    print(f"  original: {before:8.2f} MB/s")
+    print(f"  atual:    {after:8.2f} MB/s  ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
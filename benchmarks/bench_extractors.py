@@ -0,0 +1,109 @@
+"""
+Benchmark dos motores de extração de notícias (src/collectors/extractors.py).
+
+Mede o tempo de parse por página de cada motor e a sobreposição do texto
+extraído em relação à heurística original (bs4), usando as páginas já
+baixadas no cache HTTP (data/00_state/http_cache) ou uma pasta de .html.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_extractors
+    python -m benchmarks.bench_extractors --html-dir pasta/com/html --repeat 5
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import time
+
+from src.collectors.encoding import resolve_encoding
+from src.collectors.extractors import EXTRACTORS, get_extractor
+
+CACHE_DIR = "data/00_state/http_cache"
+
+
+def _synthetic_page(n_paragraphs=400):
+    # Página grande e "suja" para quando ainda não há cache (menus, scripts, rodapé)
+    nav = "".join(f"<li><a href='/s{i}'>Seção {i}</a></li>" for i in range(200))
+    body = "".join(
+        f"<p class='txt'>Parágrafo {i}: focos de calor na Amazônia e no Cerrado "
+        f"seguem monitorados pelo INPE com satélites AQUA e VIIRS.</p>"
+        f"<div class='ad'><script>var x={i};</script><p>curto</p></div>"
+        for i in range(n_paragraphs))
+    return ("<html><head><title>Sintético</title></head><body>"
+            f"<nav><ul>{nav}</ul></nav><main><h1>Queimadas</h1><article>{body}</article></main>"
+            "<footer><p>Copyright Portal de Notícias - Todos os direitos reservados</p></footer>"
+            "</body></html>")
+
+
+def load_pages(html_dir=None):
+    pages = []
+    if html_dir:
+        for path in sorted(glob.glob(os.path.join(html_dir, '*.html'))):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                pages.append((path, f.read()))
+    elif os.path.exists(os.path.join(CACHE_DIR, 'index.json')):
+        with open(os.path.join(CACHE_DIR, 'index.json'), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        for key, entry in index.items():
+            content_type = entry.get('headers', {}).get('Content-Type', 'text/html')
+            if 'html' not in content_type:
+                continue
+            body_path = os.path.join(CACHE_DIR, f"{key}.body")
+            if os.path.exists(body_path):
+                with open(body_path, 'rb') as f:
+                    body = f.read()
+                encoding, _ = resolve_encoding(content_type, body)
+                pages.append((entry['url'], body.decode(encoding, errors='replace')))
+
+    if not pages:
+        print("[BENCH] Nenhuma página em cache. Usando página sintética.")
+        pages = [("synthetic://page", _synthetic_page())]
+    return pages
+
+
+def _overlap(text_a, text_b):
+    # Jaccard das palavras: 1.0 = mesmo vocabulário extraído
+    words_a, words_b = set(text_a.split()), set(text_b.split())
+    if not words_a and not words_b:
+        return 1.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+def run(pages, repeat=3):
+    baseline = get_extractor('bs4')
+    reference = {url: (baseline.extract(html, url) or {}).get('content', '')
+                 for url, html in pages}
+
+    print(f"\n{'motor':<12} {'ms/página (mediana)':>20} {'ms/página (média)':>18} {'overlap vs bs4':>15}")
+    for name in EXTRACTORS:
+        extractor = get_extractor(name)
+        if extractor.name != name:
+            print(f"{name:<12} {'indisponível':>20}")
+            continue
+
+        timings, overlaps = [], []
+        for url, html in pages:
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = extractor.extract(html, url)
+                best = min(best, time.perf_counter() - start)
+            timings.append(best * 1000)
+            overlaps.append(_overlap((result or {}).get('content', ''), reference[url]))
+
+        print(f"{name:<12} {statistics.median(timings):>20.2f} "
+              f"{statistics.mean(timings):>18.2f} {statistics.mean(overlaps):>15.3f}")
+    print(f"\n{len(pages)} páginas, melhor de {repeat} execuções por página.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos extratores HTML")
+    parser.add_argument('--html-dir', help="Pasta com arquivos .html (padrão: cache HTTP)")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(load_pages(args.html_dir), repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark do filtro de linhas do PDFCleaner (_filter_content_lines,
+classificação em lote) x a versão original linha a linha (cópia congelada
+em benchmarks/reference_line_filter.py), sobre:
+  - o texto dos PDFs de data/inputs, no ponto em que chega ao filtro;
+  - linhas geradas com os casos de borda de cada regra (metadados que
+    atravessariam a quebra de linha, autores com espaços Unicode nas
+    pontas, 'RESOLUÇÃO Nº', letras que mudam de tamanho no lower(), ...).
+
+A paridade com o original é verificada em tests/test_line_filter.py.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_line_filter
+    python -m benchmarks.bench_line_filter --lines 50000 --repeat 7
+"""
+import argparse
+import random
+import time
+
+from benchmarks.bench_cleaner import real_samples
+from benchmarks.reference_line_filter import reference_filter_content_lines
+from src.processors.pdf_cleaner import PDFCleaner
+
+# Pedaços de linha que disparam (ou quase) cada regra do filtro
+FRAGMENTS = [
+    "Acesso em:", "Disponível em:", "v. 12", "v.\n3", "n.\t4", "p. 10-20", "Vol. 5",
+    "Vol.\n5", "Revista Brasileira", "JOURNAL of Ecology", "In: Silva", "In:\nSilva",
+    "in: x", "et al.", "ET AL.", "SILVA, J.", "SOUZA; M.", "  ABC,", " SANTOS. ",
+    "\tAB.", "ÁÉÍ, Ó.", "RESOLUÇÃO Nº 5", "Resolução nº", " resolução nº 12",
+    "the", "and", "of", "to", "in", "is", "as", "a", "o", "de", "que", "não", "introdução",
+    "The results of the", "os dados de queimadas", "İstanbul", "ΣΑΣ", "ﬁre", "ǅ",
+    "fire", "queimadas", "Amazônia", "2024", "-", ".", ",", "\r", "\x0b", " ", "\x1c",
+    # \b antes de v./n./p. (conferido à parte no lote)
+    "xv. 12", "2n. 3", "_p. 4", "év. 5", "(v. 6)", "vv.7",
+    # Letras que o IGNORECASE iguala a i/s mas o lower() não
+    "İn: Silva", "ın: x", "In: ı", "Reviſta", "JOURNAL ıx", "ſ",
+]
+
+
+def edge_lines(n, seed=11):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(n):
+        parts = [rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 12))]
+        lines.append(rng.choice(["", " ", "  ", "\t"]).join(parts))
+    return lines
+
+
+def filter_inputs(texts):
+    """O texto como chega ao filtro (mesmas etapas anteriores do process())."""
+    cleaner = PDFCleaner()
+    inputs = []
+    for text in texts:
+        text = cleaner._truncate_at_references(cleaner._clean_structure(text))
+        for group in cleaner.LINE_RULE_GROUPS:
+            text = cleaner._apply_regex_rules(text, cleaner.REGEX_PATTERNS[group])
+        inputs.append(text)
+    return inputs
+
+
+def best_of(func, text, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do filtro de linhas")
+    parser.add_argument('--lines', type=int, default=20000, help="linhas de casos de borda")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    real = filter_inputs(real_samples())
+    edges = edge_lines(args.lines)
+
+    cases = [('casos de borda', "\n".join(edges))]
+    if real:
+        cases.insert(0, ('PDFs reais', "\n".join(real)))
+    cleaner = PDFCleaner()
+    print(f"\n[VAZÃO] melhor de {args.repeat}")
+    for name, text in cases:
+        mb = len(text.encode('utf-8')) / 1e6
+        before = best_of(reference_filter_content_lines, text, args.repeat)
+        after = best_of(cleaner._filter_content_lines, text, args.repeat)
+        print(f"  {name:<16} {text.count(chr(10)) + 1:>7} linhas | original {mb / before:7.2f} MB/s"
+              f" | lote {mb / after:7.2f} MB/s ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Micro-benchmark do LiteralReplacer (src/processors/literal_replacer.py).
+
+Compara, para cada tabela do TextCleaner (mojibake, estados), a
+sequência original de str.replace com a passada única do LiteralReplacer:
+  - texto real dos PDFs de data/inputs, se houver;
+  - texto sintético limpo (frases curtas com dois estados cada);
+  - texto com mojibake pesado (PDF lido como MacRoman);
+  - por linha, como o CorpusCompiler fazia antes (uma chamada por linha).
+Confere também que as duas saídas são idênticas.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_literal_replacer
+    python -m benchmarks.bench_literal_replacer --size 5 --repeat 7
+"""
+import argparse
+import random
+import sys
+import time
+
+from benchmarks.bench_cleaner import real_samples
+from src.processors.cleaner import TextCleaner
+
+SENTENCE = ("O INPE registrou 1234 focos de calor no PARÁ e no MATO GROSSO DO SUL "
+            "em 2024, segundo o “monitoramento” – dados do satélite AQUA.\n")
+
+
+def sequential(table):
+    def replace(text):
+        for old, new in table:
+            text = text.replace(old, new)
+        return text
+    return replace
+
+
+def corrupt(text, table, rate=0.3, seed=7):
+    # Desfaz a correção: troca parte dos caracteres pela forma com mojibake
+    reverse = {}
+    for bad, good in table:
+        reverse.setdefault(good, bad)
+    rng = random.Random(seed)
+    return "".join(reverse[ch] if ch in reverse and rng.random() < rate else ch
+                   for ch in text)
+
+
+def best_of(func, data, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(data)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark do LiteralReplacer")
+    parser.add_argument('--size', type=float, default=2.0, help="MB de texto por caso")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    clean = SENTENCE * int(args.size * 1e6 / len(SENTENCE.encode('utf-8')))
+    real = "\n".join(real_samples())
+    cases = [
+        ('mojibake', TextCleaner._MOJIBAKE, clean),
+        ('mojibake (sujo)', TextCleaner._MOJIBAKE, corrupt(clean, TextCleaner._MOJIBAKE.table)),
+        ('estados', TextCleaner._STATES, clean),
+    ]
+    if real:
+        cases += [('mojibake (PDFs)', TextCleaner._MOJIBAKE, real),
+                  ('estados (PDFs)', TextCleaner._STATES, real)]
+
+    failed = False
+    print(f"\n{'tabela':<22} {'sequencial':>12} {'uma passada':>12} {'ganho':>7}")
+    for name, replacer, text in cases:
+        mb = len(text.encode('utf-8')) / 1e6
+        before, expected = best_of(sequential(replacer.table), text, args.repeat)
+        after, result = best_of(replacer.replace, text, args.repeat)
+        failed |= result != expected
+        print(f"{name:<22} {mb / before:>9.1f} MB/s {mb / after:>9.1f} MB/s {before / after:>6.1f}x"
+              + ("" if result == expected else "  SAÍDA DIFERENTE"))
+
+    # Uma chamada por linha (CorpusCompiler antigo) x uma chamada por arquivo
+    lines = clean.split('\n')
+    before, _ = best_of(lambda ls: [sequential(TextCleaner._MOJIBAKE.table)(l) for l in ls],
+                        lines, args.repeat)
+    after, _ = best_of(lambda t: TextCleaner.fix_mojibake(t).split('\n'), clean, args.repeat)
+    mb = len(clean.encode('utf-8')) / 1e6
+    print(f"{'mojibake por linha':<22} {mb / before:>9.1f} MB/s {mb / after:>9.1f} MB/s {before / after:>6.1f}x"
+          "  (arquivo inteiro)")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
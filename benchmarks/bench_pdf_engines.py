@@ -0,0 +1,107 @@
+"""
+Benchmark dos motores de texto de PDF (src/collectors/pdf_backends.py).
+
+Roda o PDFEngine com cada motor sobre os PDFs de data/inputs (ou outra
+pasta) e mede, por motor:
+  - páginas/s (melhor de N execuções por documento);
+  - taxa de OCR (páginas que o PageRouter mandou para o Tesseract);
+  - rendimento: caracteres por página no texto bruto e após o PDFCleaner;
+  - sobreposição (Jaccard das palavras limpas) com o motor pymupdf.
+
+O cache de OCR fica desligado por padrão para medir o custo real.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_pdf_engines
+    python -m benchmarks.bench_pdf_engines --input-dir pasta/com/pdfs --repeat 3 --ocr-cache
+"""
+import argparse
+import glob
+import os
+import time
+from collections import Counter
+
+from src.collectors.pdf_backends import PDF_BACKENDS, get_pdf_backend
+from src.collectors.pdf_engine import PDFEngine
+from src.processors.pdf_cleaner import PDFCleaner
+
+
+def _overlap(text_a, text_b):
+    # Jaccard das palavras: 1.0 = mesmo vocabulário extraído
+    words_a, words_b = set(text_a.split()), set(text_b.split())
+    if not words_a and not words_b:
+        return 1.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+def run_engine(name, files, repeat=1, ocr_cache=False):
+    engine = PDFEngine(text_engine=name, ocr_cache={} if ocr_cache else None)
+    cleaner = PDFCleaner()
+    elapsed, raw_chars, clean_chars = 0.0, 0, 0
+    stats, texts = Counter(), {}
+    try:
+        for path in files:
+            best = float('inf')
+            for _ in range(repeat):
+                engine.stats.clear()
+                start = time.perf_counter()
+                result = engine.parse(path)
+                best = min(best, time.perf_counter() - start)
+            elapsed += best
+            stats.update(engine.stats)
+
+            raw = (result or {}).get('raw_content', '')
+            texts[path] = cleaner.process(raw)
+            raw_chars += len(raw)
+            clean_chars += len(texts[path])
+    finally:
+        engine.close()
+
+    pages = sum(stats.values())
+    return {
+        'pages': pages,
+        'seconds': elapsed,
+        'pages_per_sec': pages / elapsed if elapsed else 0.0,
+        'ocr_rate': stats['ocr'] / pages if pages else 0.0,
+        'skipped': stats['skip'],
+        'raw_per_page': raw_chars / pages if pages else 0.0,
+        'clean_per_page': clean_chars / pages if pages else 0.0,
+        'texts': texts
+    }
+
+
+def run(files, repeat=1, ocr_cache=False):
+    results = {}
+    for name in PDF_BACKENDS:
+        if get_pdf_backend(name).name != name:
+            print(f"{name:<12} indisponível")
+            continue
+        results[name] = run_engine(name, files, repeat, ocr_cache)
+
+    baseline = results.get('pymupdf')
+    print(f"\n{'motor':<12} {'págs/s':>8} {'OCR':>7} {'puladas':>8} "
+          f"{'chars/pág':>10} {'limpo/pág':>10} {'overlap':>8}")
+    for name, r in results.items():
+        overlap = sum(_overlap(r['texts'][f], baseline['texts'][f]) for f in files) / len(files)
+        print(f"{name:<12} {r['pages_per_sec']:>8.1f} {r['ocr_rate']:>7.1%} {r['skipped']:>8} "
+              f"{r['raw_per_page']:>10.0f} {r['clean_per_page']:>10.0f} {overlap:>8.3f}")
+    pages = next(iter(results.values()))['pages'] if results else 0
+    print(f"\n{len(files)} PDFs, {pages} páginas, melhor de {repeat} execução(ões) por documento.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos motores de PDF")
+    parser.add_argument('--input-dir', default='data/inputs')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--ocr-cache', action='store_true',
+                        help="Usa o cache de OCR (mede reexecuções, não o OCR em si)")
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.input_dir, '*.pdf')))
+    if not files:
+        print(f"[BENCH] Nenhum PDF em {args.input_dir}.")
+        return
+    run(files, repeat=args.repeat, ocr_cache=args.ocr_cache)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Verificação + benchmark do motor RE2 das regras de limpeza
+(cleaning.regex_engine: re2; src/processors/cleaning_rules.py).
+
+1. Tradução: as classes \\s, \\d, \\w (e negações) traduzidas para o RE2 casam
+   exatamente os mesmos code points que no re (fora os surrogates, que
+   sempre vão para o re), e as letras em que o
+   IGNORECASE dos dois motores discorda estão todas em RE2_CASE_EXOTIC.
+2. Paridade: PDFCleaner.process, PDFCleaner.process_stream e
+   TextCleaner.process dão a mesma saída com re e com re2, sobre os textos
+   reais, os sintéticos do bench_cleaner e entradas patológicas.
+3. Tempo: cada motor sobre o texto real e sobre as entradas patológicas
+   (com orçamento por documento, como no pipeline).
+Qualquer diferença termina com código 1.
+
+Requer o google-re2 (pip install google-re2).
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_regex_engine
+    python -m benchmarks.bench_regex_engine --samples 1000 --budget 20
+"""
+import argparse
+import re
+import sys
+import time
+
+from benchmarks.bench_cleaner import real_samples, synthetic_samples
+from src.processors.cleaner import TextCleaner
+from src.processors.cleaning_rules import (
+    CLEANING_RULES, RE2_CASE_EXOTIC, CleaningBudget, CleaningTimeout, re2, re2_source)
+from src.processors.pdf_cleaner import PDFCleaner
+
+# Textos de OCR malformado que fazem o re voltar atrás sem parar
+PATHOLOGICAL = {
+    "parênteses sem fechar": "Focos de calor (INPE 2024 " * 20000,
+    "bloco sem fim": "Terra Brasilis Queimadas painel " * 20000,
+    "colunas de números": "1,25 3,40 " * 30000,
+}
+
+
+def class_translation_check():
+    """Code points em que uma classe traduzida casa diferente no RE2."""
+    options = re2.Options()
+    options.log_errors = False
+    # Sem os surrogates: com eles o texto nem chega ao RE2 (needs_re_fallback)
+    everything = "".join(chr(cp) for cp in range(sys.maxunicode + 1)
+                         if not 0xd800 <= cp <= 0xdfff)
+    differ = {}
+    for escape in (r'\s', r'\S', r'\d', r'\D', r'\w', r'\W'):
+        python = re.compile(escape).findall(everything)
+        ported = re2.compile(re2_source(escape, 0), options).findall(everything)
+        if python != ported:
+            differ[escape] = sorted(set(python) ^ set(ported))[:10]
+    return differ
+
+
+def case_check():
+    """Letras (até U+024F) que o IGNORECASE iguala num motor e não no outro."""
+    options = re2.Options()
+    options.log_errors = False
+    letters = [chr(cp) for cp in range(0x250) if chr(cp).isalpha()]
+    known = set(letters)
+    candidates = set(letters) | {chr(cp) for cp in range(sys.maxunicode + 1)
+                                 if set(chr(cp).lower() + chr(cp).upper() + chr(cp).casefold()) & known}
+    missing = set()
+    for letter in letters:
+        python = re.compile('(?i)' + re.escape(letter))
+        ported = re2.compile('(?i)' + re.escape(letter), options)
+        for ch in candidates:
+            if bool(python.fullmatch(ch)) != bool(ported.fullmatch(ch)):
+                missing |= {letter, ch}
+    return sorted(missing - set(RE2_CASE_EXOTIC) - set('iI'))
+
+
+def outputs(samples):
+    pdf, text = PDFCleaner(), TextCleaner()
+    return ([pdf.process(s) for s in samples],
+            # O spool do modo streaming é UTF-8 estrito (sem surrogates)
+            [list(pdf.process_stream(iter(s.encode('utf-8', 'replace').decode().split('\n\n'))))
+             for s in samples],
+            [text.process(s) for s in samples])
+
+
+def timed(cleaner, text, budget):
+    start = time.perf_counter()
+    try:
+        with CleaningBudget(budget).allow(text):
+            cleaner.process(text)
+    except CleaningTimeout:
+        return f">{time.perf_counter() - start:6.1f}s (quarentena)"
+    return f"{time.perf_counter() - start:7.2f}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paridade + benchmark do motor RE2")
+    parser.add_argument('--samples', type=int, default=500, help="textos sintéticos")
+    parser.add_argument('--budget', type=float, default=10.0,
+                        help="segundos por documento patológico")
+    args = parser.parse_args()
+
+    if re2 is None:
+        print("[RE2] google-re2 não instalado (pip install google-re2).")
+        sys.exit(1)
+
+    failed = False
+    differ = class_translation_check()
+    for escape, chars in differ.items():
+        print(f"[RE2] {escape} traduzida difere em: {[hex(ord(ch)) for ch in chars]}")
+    missing = case_check()
+    if missing:
+        print(f"[RE2] Faltam em RE2_CASE_EXOTIC: {missing!r}")
+    failed |= bool(differ or missing)
+
+    real = real_samples()
+    samples = real + synthetic_samples(args.samples) + [
+        text[:20000] for text in PATHOLOGICAL.values()] + [
+        "Sugestão de citação: \udcc3 İNPE 2024 (ver Figura 2) ıpam.org.br x"]
+
+    CLEANING_RULES.use_engine('re')
+    expected = outputs(samples)
+    CLEANING_RULES.use_engine('re2')
+    engine_rules = sum(rule.engine == 're2' for rule in CLEANING_RULES.rules())
+    result = outputs(samples)
+    print(f"\n[PARIDADE] {len(samples)} textos, {engine_rules} regras no RE2")
+    for name, before, after in zip(('PDFCleaner.process', 'PDFCleaner.process_stream',
+                                    'TextCleaner.process'), expected, result):
+        diffs = [i for i, (a, b) in enumerate(zip(before, after)) if a != b]
+        failed |= bool(diffs)
+        print(f"  {name:<26} " + (f"{len(diffs)} DIFERENÇAS (ex.: {diffs[:5]})" if diffs
+                                  else "idêntico"))
+
+    print(f"\n[TEMPO] orçamento de {args.budget:.0f}s por documento")
+    print(f"{'entrada':<24} {'cleaner':<12} {'re':>22} {'re2':>22}")
+    cases = [(name, text) for name, text in PATHOLOGICAL.items()]
+    if real:
+        cases.insert(0, ('PDFs reais', "\n".join(real)))
+    for name, text in cases:
+        for cleaner in (PDFCleaner(), TextCleaner()):
+            row = []
+            for engine in ('re', 're2'):
+                CLEANING_RULES.use_engine(engine)
+                row.append(timed(cleaner, text, args.budget))
+            print(f"{name:<24} {type(cleaner).__name__:<12} {row[0]:>22} {row[1]:>22}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Cópia congelada do PDFCleaner._filter_content_lines original (linha a
+linha, antes da classificação em lote), usada como referência pelo
+benchmark e pelos testes: a versão em src/processors/pdf_cleaner.py tem
+que manter e descartar exatamente as mesmas linhas.
+
+NÃO EDITAR: mudanças de comportamento do filtro são feitas lá (e aqui só
+se a referência precisar mudar junto, de propósito).
+"""
+import re
+
+from src.processors.pdf_cleaner import PDFCleaner
+
+
+def reference_filter_content_lines(text):
+    """_filter_content_lines original (antes da classificação em lote)."""
+    lines = text.split('\n')
+    clean_lines = []
+
+    author_pattern = re.compile(r'^[A-ZÀ-Ú\.\s,;-]{4,}[\.,]$')
+    metadata_garbage = re.compile(
+        r"Acesso em:|Disponível em:|\bv\.\s*\d+|\bn\.\s*\d+|\bp\.\s*\d+|Vol\.\s*\d+|Revista|Journal|In:\s+[A-Z]|et al\.",
+        re.IGNORECASE
+    )
+
+    for line in lines:
+        line_str = line.strip()
+        if len(line_str) < 3:
+            continue
+
+        if metadata_garbage.search(line_str):
+            continue
+
+        if author_pattern.match(line_str):
+            if ',' in line_str or '.' in line_str:
+                continue
+
+        if line_str.lower().startswith('resolução nº'):
+            continue
+
+        words = re.findall(r'\b[a-z]+\b', line_str.lower())
+        if len(words) >= 3:
+            eng_score = sum(1 for w in words if w in PDFCleaner.ENGLISH_STOPS)
+            pt_score = sum(1 for w in words if w in PDFCleaner.PORTUGUESE_STOPS)
+            if eng_score > pt_score and eng_score >= 2:
+                continue
+
+        clean_lines.append(line)
+
+    return " ".join(clean_lines)
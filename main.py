@@ -1,21 +1,33 @@
+import functools
 import os
 import json
 import logging
 import argparse
 import sys
+import time
 
 # --- 1. IMPORTAÇÕES DE COLETORES (CORRIGIDO) ---
 # Importa direto do html_scraper, sem try/except confuso
 from src.collectors.html_scraper import NewsScraper
 from src.collectors.dynamic_scraper import DynamicScraper
 from src.collectors.pdf_engine import PDFEngine
+from src.collectors.http_client import load_settings
+from src.collectors.concurrent_fetcher import ConcurrentFetcher
+from src.collectors.frontier import URLFrontier
+from src.collectors.resilience import RetryQueue
+from src.collectors.discovery import FeedDiscovery
 
 # --- 2. IMPORTAÇÕES DE PROCESSADORES ---
 from src.processors.cleaner import TextCleaner
+from src.processors.cleaning_rules import CLEANING_RULES, PROFILER, CleaningBudget, CleaningTimeout
 from src.processors.pdf_cleaner import PDFCleaner
 from src.processors.tokenizer import NLTKTokenizer
 from src.processors.corpus_compiler import CorpusCompiler  # <--- NOVO
+from src.processors.json_textifier import JSONTextifier
+from src.processors.pdf_batch import PDFBatchProcessor
+from src.storage.pdf_manifest import PDFManifest
 from src.storage.file_manager import FileManager
+from src.storage.fingerprint_store import FingerprintStore
 
 # Configuração de Logs
 logging.basicConfig(level=logging.INFO,
@@ -23,7 +35,24 @@ logging.basicConfig(level=logging.INFO,
 
 
 class PipelineController:
-    def __init__(self):
+    def __init__(self, refresh=False, cache_only=False, workers=1, stream=False,
+                 profile_rules=False):
+        self.refresh = refresh
+        self.workers = workers
+        # Replay do cache: não mexe no histórico da fronteira nem na fila de retentativa
+        self.cache_only = cache_only
+        self.stream = stream
+        self.settings = settings = load_settings('config/settings.yaml')
+
+        # Perfil por regra de limpeza (gravado no fim da execução)
+        cleaning_cfg = settings.get('cleaning', {})
+        self.rule_profile_path = cleaning_cfg.get(
+            'profile_report', 'data/00_state/cleaning_profile.json')
+        if profile_rules or cleaning_cfg.get('profile', False):
+            PROFILER.enable()
+        # re2 (opcional): regras de tempo linear; as sem tradução ficam no re
+        CLEANING_RULES.use_engine(cleaning_cfg.get('regex_engine', 're'))
+
         # Ferramentas de Processamento
         self.web_cleaner = TextCleaner()
         self.pdf_cleaner = PDFCleaner()
@@ -32,9 +61,69 @@ class PipelineController:
         self.storage = FileManager()
 
         # Coletores
-        self.news_scraper = NewsScraper()
+        self.pdf_engine = PDFEngine.from_settings(settings)
+        self.news_scraper = NewsScraper(
+            cache_only=cache_only, pdf_engine=self.pdf_engine)
         self.dynamic_scraper = DynamicScraper()
-        self.pdf_engine = PDFEngine()
+
+        # Downloads web em paralelo (limite global + por domínio)
+        concurrency = self.news_scraper.config.get('concurrency', {})
+        # As threads só baixam; PDFs são lidos aqui na thread principal (parse_pdf)
+        self.web_fetcher = ConcurrentFetcher(
+            functools.partial(self.news_scraper.fetch_article, parse_pdf=False),
+            max_workers=concurrency.get('max_workers', 8),
+            per_host=concurrency.get('per_host', 2))
+
+        # Índice do que já foi coletado (--refresh ignora o histórico;
+        # --cache-only também, pois o objetivo é reprocessar o que está no cache)
+        frontier_cfg = self.news_scraper.config.get('frontier', {})
+        self.frontier = URLFrontier(
+            index_path=frontier_cfg.get(
+                'index_path', 'data/00_state/frontier.json'),
+            revisit_after_days=frontier_cfg.get('revisit_after_days'),
+            ignore_history=refresh or cache_only)
+
+        # PDFs já processados com o mesmo conteúdo e a mesma versão do pipeline
+        # são pulados no modo pdf (--refresh reprocessa tudo)
+        self.pdf_manifest = PDFManifest(
+            pipeline_version=self._pdf_pipeline_version(),
+            ignore_history=refresh)
+
+        # URLs que falharam por erro transitório voltam na próxima execução
+        retry_cfg = self.news_scraper.config.get('retry', {})
+        self.retry_queue = RetryQueue(
+            path=retry_cfg.get('queue_path', 'data/00_state/retry_queue.json'),
+            max_attempts=retry_cfg.get('queue_max_attempts', 5))
+
+    @staticmethod
+    def _pdf_pipeline_version():
+        return (f"engine-{PDFEngine.VERSION}|pdf_cleaner-{PDFCleaner.VERSION}|"
+                f"text_cleaner-{TextCleaner.VERSION}|rules-{CLEANING_RULES.version}|"
+                f"tokenizer-{NLTKTokenizer.VERSION}")
+
+    def _clean(self, cleaner, text, source_name):
+        """cleaner.process() dentro do orçamento de tempo; None = documento em quarentena."""
+        try:
+            with CleaningBudget.from_settings(self.settings).allow(text):
+                return cleaner.process(text)
+        except CleaningTimeout as e:
+            logging.warning(f"[QUARANTINE] {source_name}: {e}. Documento fora do corpus.")
+            return None
+
+    def _quarantine_pdf(self, source_name, raw_data, filepath, digest, ocr_failed_pages=0):
+        """
+        Limpeza estourou o orçamento: guarda só o raw JSON (para reproduzir o
+        caso com --profile-rules) e marca o documento no manifesto, que não o
+        tenta de novo até o arquivo ou a versão do pipeline mudarem.
+        """
+        outputs = {'raw': self.storage.save_raw_json(raw_data, source_name)} if raw_data else {}
+        self.pdf_manifest.record(filepath, digest, outputs, quarantined=True,
+                                 ocr_failed_pages=ocr_failed_pages)
+
+    def report_rule_profile(self):
+        """Grava o perfil das regras de limpeza, se ligado (--profile-rules)."""
+        if PROFILER.enabled:
+            PROFILER.report(CLEANING_RULES, self.rule_profile_path)
 
     def run_pdf_mode(self):
         logging.info(">>> MODO PDF INICIADO")
@@ -46,77 +135,314 @@ class PipelineController:
         files = [f for f in os.listdir(
             INPUT_DIR) if f.lower().endswith('.pdf')]
 
-        for filename in files:
-            filepath = os.path.join(INPUT_DIR, filename)
-            source_name = os.path.splitext(filename)[0].replace(" ", "_")
+        # Só os documentos novos ou alterados (conteúdo ou versão do pipeline)
+        pending = self.pdf_manifest.filter(
+            [os.path.join(INPUT_DIR, f) for f in files])
+        digests = dict(pending)
 
-            raw_data = self.pdf_engine.parse(filepath)
+        if self.workers != 1:
+            if self.stream:
+                logging.warning(
+                    "[PDF BATCH] --stream vale só para o modo sequencial; usando o lote.")
+            self._run_pdf_batch(list(digests), digests)
+            return
 
-            if raw_data:
-                self.storage.save_raw_json(raw_data, source_name)
-                # PDF usa o Cleaner Específico
-                clean_text = self.pdf_cleaner.process(raw_data['raw_content'])
-                sentences = self.tokenizer.tokenize_sentences(clean_text)
-                self.storage.save_corpus_for_training(sentences, source_name)
-                logging.info(
-                    f"PDF Processado: {source_name} | {len(sentences)} sentenças")
+        try:
+            for filepath, digest in pending:
+                filename = os.path.basename(filepath)
+                source_name = os.path.splitext(filename)[0].replace(" ", "_")
+
+                if self.stream:
+                    self._stream_pdf(filepath, digest, source_name)
+                    continue
+
+                # Páginas em que o OCR falhou neste documento (refeito na próxima execução)
+                ocr_failed = self.pdf_engine.stats['ocr_failed']
+                raw_data = self.pdf_engine.parse(filepath)
+                ocr_failed = self.pdf_engine.stats['ocr_failed'] - ocr_failed
+
+                if raw_data:
+                    # PDF usa o Cleaner Específico
+                    clean_text = self._clean(
+                        self.pdf_cleaner, raw_data['raw_content'], source_name)
+                    if clean_text is None:
+                        self._quarantine_pdf(source_name, raw_data, filepath, digest, ocr_failed)
+                        continue
+                    sentences = self.tokenizer.tokenize_sentences(clean_text)
+                    self._store_pdf_result(
+                        source_name, raw_data, sentences, filepath, digest, ocr_failed)
+        finally:
+            # Libera o pool de OCR (recriado sob demanda se o modo web achar PDFs)
+            self.pdf_engine.close()
+
+    def _store_pdf_result(self, source_name, raw_data, sentences, filepath, digest,
+                          ocr_failed_pages=0):
+        outputs = {
+            'raw': self.storage.save_raw_json(raw_data, source_name),
+            'corpus': self.storage.save_corpus_for_training(sentences, source_name)
+        }
+        self.pdf_manifest.record(filepath, digest, outputs, ocr_failed_pages=ocr_failed_pages)
+        logging.info(
+            f"PDF Processado: {source_name} | {len(sentences)} sentenças")
+
+    def _stream_pdf(self, filepath, digest, source_name):
+        """
+        Modo streaming: páginas -> limpeza em janelas -> sentenças -> disco,
+        sem montar o texto do documento inteiro (memória constante).
+        """
+        ocr_failed = self.pdf_engine.stats['ocr_failed']
+        opened = self.pdf_engine.stream(filepath)
+        if opened is None:
+            return
+        info, pages = opened
 
-    def run_web_mode(self):
-        logging.info(">>> MODO WEB NEWS INICIADO")
+        stats = {'pages': 0, 'sentences': 0}
+
+        def counted(items, key):
+            for item in items:
+                stats[key] += 1
+                yield item
+
+        raw_path, page_texts = self.storage.stream_raw_json(info, pages, source_name)
+        chunks = self.pdf_cleaner.process_stream(
+            counted(page_texts, 'pages'), budget=CleaningBudget.from_settings(self.settings))
+        sentences = counted(self.tokenizer.tokenize_stream(chunks), 'sentences')
+        try:
+            corpus_path = self.storage.save_corpus_for_training(sentences, source_name)
+        except CleaningTimeout as e:
+            # O corpus parcial já foi apagado; o raw JSON ficou pela metade
+            logging.warning(f"[QUARANTINE] {source_name}: {e}. Documento fora do corpus.")
+            page_texts.close()
+            if os.path.exists(raw_path):
+                os.remove(raw_path)
+            self._quarantine_pdf(source_name, None, filepath, digest,
+                                 self.pdf_engine.stats['ocr_failed'] - ocr_failed)
+            return
+        except Exception as e:
+            # Página que o fitz não lê, disco cheio...: o documento fica fora
+            # do manifesto (tentado de novo na próxima execução) e o lote segue
+            logging.error(f"[PDF ENGINE] Falha no streaming de {filepath}: {e}")
+            page_texts.close()
+            if os.path.exists(raw_path):
+                os.remove(raw_path)
+            return
+
+        if not stats['pages']:
+            logging.warning(
+                f"[PDF ENGINE] Nenhum texto extraído de {filepath} (nem com OCR).")
+            os.remove(raw_path)
+            return
+
+        self.pdf_manifest.record(
+            filepath, digest, {'raw': raw_path, 'corpus': corpus_path},
+            ocr_failed_pages=self.pdf_engine.stats['ocr_failed'] - ocr_failed)
+        logging.info(
+            f"PDF Processado: {source_name} | {stats['pages']} páginas | "
+            f"{stats['sentences']} sentenças (streaming)")
+
+    def _run_pdf_batch(self, filepaths, digests):
+        """
+        Parse + limpeza + tokenização de cada PDF num processo do pool;
+        a gravação acontece aqui, no processo principal, conforme cada um termina.
+        """
+        batch = PDFBatchProcessor(
+            workers=self.workers or None, profile_rules=PROFILER.enabled)
+        logging.info(
+            f"[PDF BATCH] {len(filepaths)} arquivos em {batch.workers} processos")
+
+        start = time.perf_counter()
+        report = []
+        for result in batch.run(filepaths):
+            filename = os.path.basename(result['filepath'])
+            source_name = os.path.splitext(filename)[0].replace(" ", "_")
+
+            PROFILER.merge(result.get('rule_profile'))
+            if result['error']:
+                logging.error(f"[PDF BATCH] Falha em {filename}: {result['error']}")
+            elif result['quarantined']:
+                logging.warning(
+                    f"[QUARANTINE] {source_name}: {result['quarantined']}. Documento fora do corpus.")
+                self._quarantine_pdf(
+                    source_name, result['raw_data'], result['filepath'],
+                    digests[result['filepath']], result['ocr_failed_pages'])
+            elif result['raw_data']:
+                self._store_pdf_result(
+                    source_name, result['raw_data'], result['sentences'],
+                    result['filepath'], digests[result['filepath']],
+                    result['ocr_failed_pages'])
+            report.append((filename, result))
+
+        # Tempo por arquivo (parse / limpeza / tokenização)
+        print("\n" + "=" * 40)
+        print("TEMPOS POR ARQUIVO (s)")
+        print("=" * 40)
+        for filename, result in sorted(report, key=lambda r: -r[1]['timings'].get('total', 0)):
+            t = result['timings']
+            status = ("FALHA" if result['error'] else "QUARENTENA" if result['quarantined']
+                      else f"{len(result['sentences'])} sent.")
+            print(f"{t.get('total', 0):7.1f} | parse {t.get('parse', 0):6.1f} | "
+                  f"limpeza {t.get('clean', 0):5.1f} | token {t.get('tokenize', 0):5.1f} | "
+                  f"{status} | {filename}")
+        print(f"Tempo total (relógio): {time.perf_counter() - start:.1f}s")
+        print("=" * 40 + "\n")
+
+    def _load_sources(self):
         SOURCES_FILE = "config/sources.json"
 
         if not os.path.exists(SOURCES_FILE):
             logging.error(f"Arquivo {SOURCES_FILE} não encontrado.")
-            return
+            return None
 
         try:
             with open(SOURCES_FILE, 'r') as f:
-                data = json.load(f)
-                urls = data.get('news_urls', [])
+                return json.load(f)
         except Exception as e:
             logging.error(f"Erro ao ler JSON: {e}")
-            return
+            return None
+
+    def run_web_mode(self, urls=None):
+        # Sem argumento usa 'news_urls' do sources.json; o modo discover passa as URLs dos feeds
+        logging.info(">>> MODO WEB NEWS INICIADO")
+
+        if urls is None:
+            data = self._load_sources()
+            if data is None:
+                return
+            urls = data.get('news_urls', [])
+
+        queued = self.retry_queue.pending()
+        if queued:
+            logging.info(
+                f"[RETRY] {len(queued)} URLs que falharam na execução anterior voltam para a fila.")
+
+        # Remove duplicadas e já coletadas ANTES de qualquer acesso à rede
+        urls = self.frontier.filter(queued + urls)
+        self.frontier.report()
 
         logging.info(f"Processando {len(urls)} URLs...")
 
-        for url in urls:
-            # Web usa fetch_article do html_scraper
-            raw_data = self.news_scraper.fetch_article(url)
-
-            if raw_data and raw_data.get('content'):
-                slug = url.split(
-                    '/')[-1][:30].replace('.html', '').replace('.ghtml', '')
-                domain = url.split(
-                    '//')[-1].split('/')[0].replace('www.', '').replace('.', '_')
-                source_name = f"WEB_{domain}_{slug}"
-
-                self.storage.save_raw_json(raw_data, source_name)
-                # Web usa o Cleaner Geral
-                clean_text = self.web_cleaner.process(raw_data['content'])
-                sentences = self.tokenizer.tokenize_sentences(clean_text)
-
-                if sentences:
-                    self.storage.save_corpus_for_training(
-                        sentences, source_name)
-                    logging.info(
-                        f"WEB Sucesso: {source_name} | {len(sentences)} sentenças")
+        # Os artigos chegam conforme terminam de baixar: limpeza e tokenização
+        # rodam aqui enquanto os outros downloads continuam nas threads
+        try:
+            for url, raw_data in self.web_fetcher.fetch_all(urls):
+                if raw_data and 'pdf_path' in raw_data:
+                    raw_data = self.news_scraper.parse_pdf(url, raw_data['pdf_path'])
+                self._process_web_article(url, raw_data)
+                if self.cache_only:
+                    # Fora do cache não é falha de rede: a URL continua na fila
+                    # e o histórico de coletas reais fica como estava
+                    continue
+                success = bool(raw_data and raw_data.get('content'))
+                self.frontier.mark_fetched(url, success=success)
+
+                # Só falhas transitórias (rede, 5xx, circuito aberto) vão para a fila;
+                # 404 ou conteúdo rejeitado não adiantam tentar de novo
+                reason = self.news_scraper.http.transient_failures.pop(url, None)
+                if not success and reason:
+                    self.retry_queue.add(url, reason)
                 else:
-                    logging.warning(f"Texto vazio após limpeza: {source_name}")
+                    self.retry_queue.remove(url)
+        finally:
+            if not self.cache_only:
+                self.frontier.save()
+                self.retry_queue.save()
+            self.news_scraper.http.close()
+
+    def _process_web_article(self, url, raw_data):
+        if raw_data and raw_data.get('content'):
+            slug = url.split(
+                '/')[-1][:30].replace('.html', '').replace('.ghtml', '')
+            domain = url.split(
+                '//')[-1].split('/')[0].replace('www.', '').replace('.', '_')
+            source_name = f"WEB_{domain}_{slug}"
+
+            self.storage.save_raw_json(raw_data, source_name)
+            # Web usa o Cleaner Geral; links que entregaram PDF usam o Cleaner de PDF
+            cleaner = self.pdf_cleaner if raw_data.get(
+                'source_type') == 'web_pdf' else self.web_cleaner
+            clean_text = self._clean(cleaner, raw_data['content'], source_name)
+            if clean_text is None:
+                return
+            sentences = self.tokenizer.tokenize_sentences(clean_text)
+
+            if sentences:
+                self.storage.save_corpus_for_training(
+                    sentences, source_name)
+                logging.info(
+                    f"WEB Sucesso: {source_name} | {len(sentences)} sentenças")
+            else:
+                logging.warning(f"Texto vazio após limpeza: {source_name}")
+
+    def run_discovery_mode(self):
+        logging.info(">>> MODO DISCOVERY INICIADO")
+        data = self._load_sources()
+        if data is None:
+            return
+
+        # Palavras-chave do domínio: as mesmas que o compilador usa no corpus final
+        settings = data.get('discovery', {})
+        discovery = FeedDiscovery(
+            self.news_scraper.http,
+            settings,
+            domains=data.get('news_urls', []),
+            keywords=settings.get('keywords', self.compiler.DOMAIN_KEYWORDS))
+
+        urls = discovery.discover()
+        # A fronteira ainda descarta o que já foi coletado em execuções anteriores
+        self.run_web_mode(urls=urls)
+        discovery.save()
 
     def run_dynamic_mode(self):
         logging.info(">>> MODO DYNAMIC INICIADO")
-        target_url = "https://terrabrasilis.dpi.inpe.br/app/dashboard/fires/biomes/aggregated/"
+        data = self._load_sources()
+        if data is None:
+            return
+
+        # Alvos em sources.json: url, condições de espera e opções do modo dashboard
+        # (bloqueio de recursos, captura dos JSONs das APIs)
+        targets = data.get('dynamic_targets', [])
+        if not targets:
+            logging.warning("Nenhum alvo em 'dynamic_targets' no sources.json.")
+            return
+
+        # Todos os dashboards renderizam em paralelo no mesmo navegador
+        results = self.dynamic_scraper.extract_many(targets)
 
-        # Dashboard usa extract do dynamic_scraper
-        raw_data = self.dynamic_scraper.extract(target_url)
+        # Impressões digitais da execução anterior (--refresh ignora)
+        fingerprints = FingerprintStore()
 
-        if raw_data:
-            source_name = "DASH_INPE_TerraBrasilis"
+        for target, raw_data in zip(targets, results):
+            if not raw_data:
+                continue
+
+            source_name = target.get('name') or "DASH_" + target['url'].split(
+                '//')[-1].split('/')[0].replace('www.', '').replace('.', '_')
+
+            fingerprint = FingerprintStore.fingerprint(
+                raw_data, target.get('fingerprint_ignore', []))
+            if not self.refresh and fingerprints.is_unchanged(source_name, fingerprint):
+                fingerprints.touch(source_name)
+                logging.info(
+                    f"DASHBOARD sem alterações desde a última execução: {source_name}")
+                continue
+
+            # O raw JSON guarda também as respostas das APIs (captured_data)
             self.storage.save_raw_json(raw_data, source_name)
-            clean_text = self.web_cleaner.process(raw_data['content'])
+
+            text = raw_data['content']
+            if target.get('json_to_text') and raw_data.get('captured_data'):
+                text += "\n" + JSONTextifier.to_text(raw_data['captured_data'])
+
+            clean_text = self._clean(self.web_cleaner, text, source_name)
+            if clean_text is None:
+                continue
             sentences = self.tokenizer.tokenize_sentences(clean_text)
             self.storage.save_corpus_for_training(sentences, source_name)
-            logging.info(f"DASHBOARD Processado: {len(sentences)} sentenças")
+            fingerprints.update(source_name, fingerprint)
+            logging.info(
+                f"DASHBOARD Processado: {source_name} | {len(sentences)} sentenças")
+
+        fingerprints.save()
 
     # --- NOVO MODO: COMPILAÇÃO ---
     def run_compile_mode(self):
@@ -136,18 +462,53 @@ def main():
 
     parser.add_argument(
         '--mode',
-        choices=['pdf', 'web', 'dynamic', 'all', 'compile'],
+        choices=['pdf', 'web', 'discover', 'dynamic', 'all', 'compile'],
         required=True,
-        help="Modos: pdf, web, dynamic, all (coleta tudo) ou compile (gera dataset final)."
+        help="Modos: pdf, web, discover (novas notícias via sitemaps/RSS), dynamic, all (coleta tudo) ou compile (gera dataset final)."
+    )
+
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help="Ignora o histórico: baixa de novo as URLs já coletadas (web), reprocessa dashboards sem alterações (dynamic) e PDFs já processados (pdf)."
+    )
+
+    parser.add_argument(
+        '--cache-only',
+        action='store_true',
+        help="Modo web: reprocessa apenas as páginas do cache HTTP em disco, sem acessar a rede."
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help="Modo pdf: nº de processos em paralelo (0 = todos os núcleos). Padrão: 1 (sequencial)."
+    )
+
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help="Modo pdf: processa cada documento página a página (memória constante em PDFs enormes)."
+    )
+
+    parser.add_argument(
+        '--profile-rules',
+        action='store_true',
+        help="Mede cada regra de limpeza (matches, caracteres removidos, tempo) e grava o relatório em cleaning.profile_report."
     )
 
     args = parser.parse_args()
-    controller = PipelineController()
+    controller = PipelineController(
+        refresh=args.refresh, cache_only=args.cache_only, workers=args.workers,
+        stream=args.stream, profile_rules=args.profile_rules)
 
     if args.mode == 'pdf':
         controller.run_pdf_mode()
     elif args.mode == 'web':
         controller.run_web_mode()
+    elif args.mode == 'discover':
+        controller.run_discovery_mode()
     elif args.mode == 'dynamic':
         controller.run_dynamic_mode()
     elif args.mode == 'all':
@@ -157,6 +518,8 @@ def main():
     elif args.mode == 'compile':
         controller.run_compile_mode()
 
+    controller.report_rule_profile()
+
 
 if __name__ == "__main__":
     main()
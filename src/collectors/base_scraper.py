@@ -1,9 +1,9 @@
-import time
 import random
 import requests
 import logging
 import yaml
 from abc import ABC, abstractmethod
+from src.collectors.http_client import create_client
 
 # Configuração de Logs
 logging.basicConfig(level=logging.INFO,
@@ -11,9 +11,11 @@ logging.basicConfig(level=logging.INFO,
 
 
 class BaseScraper(ABC):
-    def __init__(self, config_path='config/settings.yaml'):
+    def __init__(self, config_path='config/settings.yaml', cache_only=False):
         self.config = self._load_config(config_path)
-        self.session = requests.Session()
+        self.http = create_client(self.config, cache_only=cache_only)
+        self.rate_limiter = self.http.rate_limiter
+        self.session = self.http.session
 
     def _load_config(self, path):
         with open(path, 'r') as file:
@@ -24,26 +26,27 @@ class BaseScraper(ABC):
         user_agent = random.choice(self.config['scraping']['user_agents'])
         return {'User-Agent': user_agent}
 
-    def _wait(self):
-        # Implementa Rate Limiting
-        min_delay = self.config['scraping']['min_delay']
-        max_delay = self.config['scraping']['max_delay']
-        sleep_time = random.uniform(min_delay, max_delay)
-        logging.info(f"Aguardando {sleep_time:.2f} segundos...")
-        time.sleep(sleep_time)
+    def _wait(self, url):
+        # Implementa Rate Limiting por domínio (token bucket)
+        self.rate_limiter.acquire(url)
 
     def fetch_page(self, url):
         # Método genérico para baixar conteúdo bruto
-        self._wait()
+        # O rate limiting por domínio é feito pelo HTTPClient antes de cada
+        # acesso à rede (replays do cache não esperam)
         try:
             headers = self._get_headers()
-            response = self.session.get(
-                url, headers=headers, timeout=self.config['scraping']['timeout'])
+            response = self.http.get(url, headers=headers)
             response.raise_for_status()
 
+            if response.content_kind == 'pdf':
+                logging.warning(
+                    f"{url} é um PDF (salvo em {response.pdf_path}); use o PDFEngine.")
+                return None
+
             # Garante a codificação correta (UTF-8 é padrão hoje em dia)
-            response.encoding = response.apparent_encoding
-            return response.text
+            # sem rodar a detecção estatística sobre a página inteira
+            return self.http.decode(response)
         except requests.exceptions.RequestException as e:
             logging.error(f"Erro ao acessar {url}: {e}")
             return None
@@ -0,0 +1,80 @@
+import logging
+import time
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlsplit
+
+
+class ConcurrentFetcher:
+    """
+    Executa downloads em paralelo com dois limites de concorrência:
+    - global (max_workers): total de requisições em andamento;
+    - por domínio (per_host): polidez com cada servidor alvo.
+
+    Os resultados são devolvidos à medida que terminam (gerador), então o
+    chamador pode limpar/tokenizar uma página enquanto as outras ainda baixam.
+    """
+
+    def __init__(self, fetch_fn, max_workers=8, per_host=2):
+        self.fetch_fn = fetch_fn
+        self.max_workers = max(1, max_workers)
+        self.per_host = max(1, per_host)
+
+    @staticmethod
+    def _host(url):
+        return urlsplit(url).netloc.lower()
+
+    def _timed_fetch(self, url):
+        start = time.perf_counter()
+        result = self.fetch_fn(url)
+        return result, time.perf_counter() - start
+
+    def fetch_all(self, urls):
+        """
+        Gera tuplas (url, resultado) na ordem de conclusão.
+        Cada domínio tem sua própria fila; uma URL só é despachada quando há
+        vaga global E vaga no domínio dela, para que um site com muitas URLs
+        não ocupe todas as threads esperando a própria vez.
+        """
+        queues = OrderedDict()
+        for url in urls:
+            queues.setdefault(self._host(url), deque()).append(url)
+
+        in_flight = {}
+        per_host_count = {host: 0 for host in queues}
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while queues or in_flight:
+                # 1. Despacha o máximo possível respeitando os dois limites
+                for host in list(queues):
+                    if len(in_flight) >= self.max_workers:
+                        break
+                    pending = queues[host]
+                    while pending and per_host_count[host] < self.per_host \
+                            and len(in_flight) < self.max_workers:
+                        url = pending.popleft()
+                        future = pool.submit(self._timed_fetch, url)
+                        in_flight[future] = (url, host)
+                        per_host_count[host] += 1
+                    if not pending:
+                        del queues[host]
+
+                if not in_flight:
+                    break
+
+                # 2. Entrega o que terminou e libera as vagas
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, host = in_flight.pop(future)
+                    per_host_count[host] -= 1
+                    try:
+                        result, elapsed = future.result()
+                        logging.debug(f"[FETCH] {elapsed:.2f}s {url}")
+                    except Exception as e:
+                        logging.error(f"[FETCH] Falha inesperada em {url}: {e}")
+                        result = None
+                    yield url, result
+
+        logging.info(
+            f"[FETCH] Coleta concorrente concluída em {time.perf_counter() - start:.1f}s")
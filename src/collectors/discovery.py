@@ -0,0 +1,256 @@
+import logging
+import re
+import unicodedata
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from src.collectors.frontier import URLFrontier
+from src.storage.state_store import JSONStateStore
+
+
+class FeedDiscovery:
+    """
+    Descoberta incremental de notícias pelos sitemaps e feeds RSS/Atom dos
+    domínios configurados em sources.json.
+
+    - Sitemaps vêm da lista 'sitemaps' e, opcionalmente, das linhas
+      'Sitemap:' do robots.txt de cada domínio de 'news_urls';
+    - Feeds RSS/Atom vêm da lista 'feeds';
+    - Só entram entradas publicadas/modificadas depois da última execução
+      (na primeira, até 'max_age_days' atrás) e cujo título/slug contém
+      alguma palavra-chave do domínio (queimadas, focos, INPE...) como
+      palavra inteira;
+    - Uma fonte que não baixou ou não parseou não avança o 'last_run': o
+      intervalo fica para a próxima execução.
+
+    Os downloads passam pelo HTTPClient do NewsScraper (cache, rate limiting,
+    retentativas); as URLs devolvidas ainda passam pela URLFrontier.
+    """
+
+    def __init__(self, http, settings, domains, keywords,
+                 state_path='data/00_state/discovery.json'):
+        self.http = http
+        self.feeds = settings.get('feeds', [])
+        self.sitemaps = settings.get('sitemaps', [])
+        self.use_robots = settings.get('use_robots_sitemaps', True)
+        self.max_age_days = settings.get('max_age_days', 30)
+        self.max_child_sitemaps = settings.get('max_child_sitemaps', 3)
+
+        self.domains = {self._domain(d) for d in domains}
+        self.keywords = [self._fold(k) for k in keywords]
+        # Palavras inteiras (com plural): 'terra', 'deter' ou 'aqua' soltos
+        # dentro de outras palavras não tornam a notícia relevante
+        self.keyword_pattern = re.compile(
+            r'\b(?:' + '|'.join(map(re.escape, self.keywords)) + r')(?:e?s)?\b'
+        ) if self.keywords else None
+
+        self.store = JSONStateStore(state_path)
+        self.state = self.store.load()
+        self.stats = {'entries': 0, 'old': 0, 'off_topic': 0, 'foreign': 0, 'queued': 0,
+                      'failed': 0}
+
+    @staticmethod
+    def _domain(url_or_host):
+        host = urlsplit(url_or_host).hostname if '//' in url_or_host else url_or_host
+        host = (host or '').lower()
+        return host[4:] if host.startswith('www.') else host
+
+    @staticmethod
+    def _fold(text):
+        # Slugs não têm acento: compara tudo sem diacríticos e em minúsculas
+        text = unicodedata.normalize('NFKD', text.lower())
+        return "".join(c for c in text if not unicodedata.combining(c))
+
+    @staticmethod
+    def _local(tag):
+        return tag.rsplit('}', 1)[-1]
+
+    @classmethod
+    def _child_text(cls, node, name):
+        for child in node:
+            if cls._local(child.tag) == name:
+                return (child.text or '').strip()
+        return ''
+
+    @staticmethod
+    def _parse_date(value):
+        if not value:
+            return None
+        value = value.strip()
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            try:
+                parsed = parsedate_to_datetime(value)  # RSS: RFC 822
+            except (TypeError, ValueError):
+                return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed
+
+    def _fetch_xml(self, url):
+        """XML da URL, ou None. Falhas de download/parse contam em stats['failed']."""
+        if url.endswith('.gz'):
+            logging.info(f"[DISCOVERY] Sitemap compactado ignorado: {url}")
+            return None
+        try:
+            response = self.http.get(url)
+            if response.status_code == 200:
+                return ET.fromstring(response.content)
+            logging.warning(f"[DISCOVERY] Erro {response.status_code} em {url}")
+        except ET.ParseError as e:
+            logging.warning(f"[DISCOVERY] XML inválido em {url}: {e}")
+        except Exception as e:
+            logging.error(f"[DISCOVERY] Falha ao baixar {url}: {e}")
+        self.stats['failed'] += 1
+        return None
+
+    def _robots_sitemaps(self):
+        sitemaps = []
+        for domain in sorted(self.domains):
+            try:
+                response = self.http.get(f"https://{domain}/robots.txt")
+                if response.status_code != 200:
+                    continue
+                for line in self.http.decode(response).splitlines():
+                    if line.lower().startswith('sitemap:'):
+                        sitemaps.append(line.split(':', 1)[1].strip())
+            except Exception as e:
+                logging.warning(f"[DISCOVERY] robots.txt indisponível em {domain}: {e}")
+        return sitemaps
+
+    # --- Leitura das entradas (url, data, texto para palavras-chave) ---
+
+    def _sitemap_entries(self, url, since, depth=0):
+        root = self._fetch_xml(url)
+        if root is None:
+            return []
+
+        kind = self._local(root.tag)
+        if kind == 'sitemapindex':
+            if depth >= 2:
+                return []
+            children = []
+            for node in root:
+                loc = self._child_text(node, 'loc')
+                lastmod = self._parse_date(self._child_text(node, 'lastmod'))
+                if loc and (lastmod is None or lastmod >= since):
+                    children.append((lastmod or since, loc))
+            # Índices de portais grandes têm milhares de filhos: só os mais recentes
+            children.sort(reverse=True)
+            entries = []
+            for _, loc in children[:self.max_child_sitemaps]:
+                entries.extend(self._sitemap_entries(loc, since, depth + 1))
+            return entries
+
+        entries = []
+        for node in root:
+            loc = self._child_text(node, 'loc')
+            if not loc:
+                continue
+            lastmod = self._child_text(node, 'lastmod')
+            title = ''
+            # Extensão Google News: <news:news><news:title>...</news:title>
+            for child in node:
+                if self._local(child.tag) == 'news':
+                    title = self._child_text(child, 'title')
+                    lastmod = lastmod or self._child_text(child, 'publication_date')
+            entries.append((loc, self._parse_date(lastmod), title))
+        return entries
+
+    def _feed_entries(self, url):
+        root = self._fetch_xml(url)
+        if root is None:
+            return []
+
+        entries = []
+        if self._local(root.tag) == 'rss':
+            for item in root.iter():
+                if self._local(item.tag) != 'item':
+                    continue
+                text = self._child_text(item, 'title') + ' ' + \
+                    self._child_text(item, 'description')
+                entries.append((self._child_text(item, 'link'),
+                                self._parse_date(self._child_text(item, 'pubDate')), text))
+        elif self._local(root.tag) == 'feed':
+            for entry in root:
+                if self._local(entry.tag) != 'entry':
+                    continue
+                link = ''
+                for child in entry:
+                    if self._local(child.tag) == 'link' and \
+                            child.get('rel', 'alternate') == 'alternate':
+                        link = child.get('href', '')
+                date = self._child_text(entry, 'updated') or self._child_text(entry, 'published')
+                text = self._child_text(entry, 'title') + ' ' + self._child_text(entry, 'summary')
+                entries.append((link, self._parse_date(date), text))
+        return entries
+
+    # --- Filtros ---
+
+    def _is_relevant(self, url, text):
+        slug = urlsplit(url).path.replace('-', ' ').replace('_', ' ')
+        if self.keyword_pattern is None:
+            return False
+        return self.keyword_pattern.search(self._fold(f"{text} {slug}")) is not None
+
+    def _since(self, source):
+        last_run = self.state.get(source, {}).get('last_run')
+        if last_run:
+            return datetime.fromisoformat(last_run)
+        return datetime.now(timezone.utc) - timedelta(days=self.max_age_days)
+
+    def _select(self, entries, since, selected, seen):
+        for url, date, text in entries:
+            self.stats['entries'] += 1
+            if not url:
+                continue
+            if self._domain(url) not in self.domains:
+                self.stats['foreign'] += 1
+                continue
+            if date is not None and date < since:
+                self.stats['old'] += 1
+                continue
+            if not self._is_relevant(url, text):
+                self.stats['off_topic'] += 1
+                continue
+            canonical = URLFrontier.canonicalize(url)
+            if canonical not in seen:
+                seen.add(canonical)
+                selected.append(url)
+
+    def discover(self):
+        """Devolve as URLs novas e relevantes encontradas nos sitemaps e feeds."""
+        run_started = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        # Domínios dos feeds configurados também valem
+        self.domains.update(self._domain(u) for u in self.feeds + self.sitemaps)
+
+        sitemaps = list(self.sitemaps)
+        if self.use_robots:
+            sitemaps += [s for s in self._robots_sitemaps() if s not in sitemaps]
+
+        selected, seen = [], set()
+        sources = [(source, 'sitemap') for source in sitemaps] + \
+            [(source, 'feed') for source in self.feeds]
+        for source, kind in sources:
+            failed = self.stats['failed']
+            since = self._since(source)
+            entries = (self._sitemap_entries(source, since) if kind == 'sitemap'
+                       else self._feed_entries(source))
+            self._select(entries, since, selected, seen)
+            # Fonte (ou sitemap filho) fora do ar: o que foi publicado no
+            # intervalo volta na próxima execução, a partir do last_run antigo
+            if self.stats['failed'] == failed:
+                self.state[source] = {'last_run': run_started, 'type': kind}
+
+        self.stats['queued'] = len(selected)
+        logging.info(
+            f"[DISCOVERY] {self.stats['entries']} entradas | "
+            f"{self.stats['old']} antigas | {self.stats['off_topic']} fora do tema | "
+            f"{self.stats['foreign']} de outros domínios | {len(selected)} novas na fila | "
+            f"{self.stats['failed']} fontes com falha")
+        return selected
+
+    def save(self):
+        self.store.save(self.state)
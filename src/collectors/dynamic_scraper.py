@@ -1,74 +1,254 @@
+import asyncio
 import logging
-import time
-from playwright.sync_api import sync_playwright
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+from src.collectors.http_client import load_settings
+from src.collectors.rate_limiter import HostRateLimiter
+
+# Espera até o DOM ficar sem mutações por `ms` milissegundos (gráficos terminaram de desenhar)
+DOM_STABLE_JS = """
+(ms) => new Promise(resolve => {
+    const done = () => { observer.disconnect(); resolve(true); };
+    let timer = setTimeout(done, ms);
+    const observer = new MutationObserver(() => {
+        clearTimeout(timer);
+        timer = setTimeout(done, ms);
+    });
+    observer.observe(document.body, {subtree: true, childList: true, characterData: true, attributes: true});
+})
+"""
+
+
+class BrowserPool:
+    """
+    Um único Chromium para a execução inteira e um pool de contextos
+    reaproveitáveis: abrir o navegador custa segundos, abrir uma aba não.
+    No máximo `size` páginas carregam ao mesmo tempo.
+    """
+
+    def __init__(self, size=3, headless=True, user_agent=None):
+        self.size = max(1, size)
+        self.headless = headless
+        self.user_agent = user_agent
+        self._playwright = None
+        self._browser = None
+        self._contexts = None
+
+    async def __aenter__(self):
+        self._playwright = await async_playwright().start()
+        # headless=True para não abrir janela visual
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._contexts = asyncio.Queue()
+        for _ in range(self.size):
+            # Contexto com User-Agent real para evitar bloqueios
+            context = await self._browser.new_context(
+                user_agent=self.user_agent,
+                viewport={"width": 1920, "height": 1080})
+            self._contexts.put_nowait(context)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._browser.close()
+        await self._playwright.stop()
+
+    @asynccontextmanager
+    async def page(self):
+        context = await self._contexts.get()
+        page = await context.new_page()
+        try:
+            yield page
+        finally:
+            await page.close()
+            self._contexts.put_nowait(context)
 
 
 class DynamicScraper:
-    def __init__(self):
+    """
+    Extração de dashboards renderizados por JavaScript (Playwright assíncrono).
+
+    Cada alvo pode definir como esperar o carregamento ('wait'), no lugar do
+    antigo sleep fixo de 5 segundos:
+      - load_state:    'load', 'domcontentloaded' ou 'networkidle'
+      - selector:      seletor CSS que precisa aparecer (ex: "#chart svg")
+      - response:      trecho da URL de um XHR que precisa terminar (ex: "/api/")
+      - dom_stable_ms: DOM sem mutações por esse tempo (animações terminaram)
+      - timeout_ms:    limite de cada condição
+
+    Modo dashboard (também por alvo):
+      - block_resources:    tipos de recurso abortados no roteamento
+                            (ex: ["image", "font", "media"]) - o painel carrega sem
+                            imagens, fontes e tiles de mapa
+      - block_url_patterns: trechos de URL sempre abortados (ex: servidores de tiles)
+      - capture_json:       guarda as respostas JSON das APIs do painel em 'captured_data'
+      - capture_url_patterns: só captura respostas cuja URL contém um destes trechos
+    """
+
+    # Respostas JSON maiores que isso não são capturadas
+    MAX_CAPTURE_BYTES = 5 * 1024 * 1024
+
+    USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+    def __init__(self, config_path='config/settings.yaml'):
         self.logger = logging.getLogger(__name__)
+        config = load_settings(config_path)
+        dynamic = config.get('dynamic', {})
+
+        self.max_pages = dynamic.get('max_pages', 3)
+        self.headless = dynamic.get('headless', True)
+        # Timeout aumentado para 60s pois dashboards são pesados
+        self.navigation_timeout_ms = dynamic.get('navigation_timeout_ms', 60000)
+        self.default_wait = dynamic.get(
+            'default_wait', {'load_state': 'networkidle', 'dom_stable_ms': 1500})
+        self.rate_limiter = HostRateLimiter.from_settings(config)
+
+    async def _wait_until_ready(self, page, wait, response_waiter):
+        timeout = wait.get('timeout_ms', 30000)
+
+        if wait.get('load_state'):
+            self.logger.info(
+                f"[DYNAMIC] Aguardando estado '{wait['load_state']}'...")
+            await page.wait_for_load_state(wait['load_state'], timeout=timeout)
+
+        if response_waiter is not None:
+            self.logger.info(
+                f"[DYNAMIC] Aguardando resposta '{wait['response']}'...")
+            await response_waiter
+
+        if wait.get('selector'):
+            self.logger.info(
+                f"[DYNAMIC] Aguardando seletor '{wait['selector']}'...")
+            await page.wait_for_selector(wait['selector'], timeout=timeout)
+
+        if wait.get('dom_stable_ms'):
+            try:
+                await asyncio.wait_for(
+                    page.evaluate(DOM_STABLE_JS, wait['dom_stable_ms']),
+                    timeout=timeout / 1000)
+            except asyncio.TimeoutError:
+                # Dashboard com animação contínua: segue com o que já renderizou
+                self.logger.warning(
+                    "[DYNAMIC] DOM não estabilizou dentro do limite. Extraindo assim mesmo.")
+
+    async def _route(self, route, blocked_types, blocked_patterns, stats):
+        request = route.request
+        if request.resource_type in blocked_types or \
+                any(p in request.url for p in blocked_patterns):
+            stats['blocked'] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _capture(self, response, patterns, captured):
+        if response.status != 200:
+            return
+        if 'json' not in response.headers.get('content-type', ''):
+            return
+        if patterns and not any(p in response.url for p in patterns):
+            return
+        if int(response.headers.get('content-length') or 0) > self.MAX_CAPTURE_BYTES:
+            self.logger.warning(f"[DYNAMIC] JSON grande demais ignorado: {response.url}")
+            return
+        try:
+            captured.append({'url': response.url, 'data': await response.json()})
+        except Exception as e:
+            self.logger.warning(f"[DYNAMIC] JSON ilegível em {response.url}: {e}")
 
-    def extract(self, url):
-        """
-        Abre a URL usando um navegador headless (Playwright),
-        espera os gráficos carregarem e extrai o texto.
-        """
+    async def _extract_one(self, pool, target):
+        url = target['url']
+        wait = target.get('wait') or self.default_wait
         self.logger.info(f"[DYNAMIC] Iniciando extração via Playwright: {url}")
 
         try:
-            with sync_playwright() as p:
-                # 1. Lança o navegador (headless=True para não abrir janela visual)
-                browser = p.chromium.launch(headless=True)
-
-                # Contexto com User-Agent real para evitar bloqueios
-                context = browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                    viewport={"width": 1920, "height": 1080}
-                )
-
-                page = context.new_page()
-
-                # 2. Acessa a página (Timeout aumentado para 60s pois dashboards são pesados)
-                page.goto(url, timeout=60000)
-
-                # 3. Estratégia de Espera (Crucial para Dashboards)
-                self.logger.info(
-                    "[DYNAMIC] Aguardando carregamento da rede...")
-                # Espera o tráfego de rede parar
-                page.wait_for_load_state("networkidle")
-
-                # Espera explícita extra para animações de gráficos terminarem (TerraBrasilis demora)
-                self.logger.info(
-                    "[DYNAMIC] Aguardando renderização dos gráficos (5s)...")
-                time.sleep(5)
-
-                # 4. Extração
-                # Tenta pegar o título
-                title = page.title()
-
-                # Pega todo o texto visível no corpo da página
+            await self.rate_limiter.acquire_async(url)
+            async with pool.page() as page:
+                stats = {'blocked': 0}
+                blocked_types = set(target.get('block_resources', []))
+                blocked_patterns = target.get('block_url_patterns', [])
+                if blocked_types or blocked_patterns:
+                    await page.route("**/*", lambda route: self._route(
+                        route, blocked_types, blocked_patterns, stats))
+
+                captured, capture_tasks = [], []
+                if target.get('capture_json'):
+                    patterns = target.get('capture_url_patterns', [])
+                    page.on("response", lambda r: capture_tasks.append(
+                        asyncio.ensure_future(self._capture(r, patterns, captured))))
+
+                response_waiter = None
+                if wait.get('response'):
+                    # Registrado ANTES do goto para não perder XHRs rápidos
+                    pattern = wait['response']
+                    response_waiter = asyncio.ensure_future(page.wait_for_response(
+                        lambda r: pattern in r.url, timeout=wait.get('timeout_ms', 30000)))
+
+                try:
+                    await page.goto(url, timeout=self.navigation_timeout_ms)
+                    await self._wait_until_ready(page, wait, response_waiter)
+                finally:
+                    if response_waiter is not None and not response_waiter.done():
+                        response_waiter.cancel()
+
+                # Respostas que ainda estavam sendo lidas quando o painel ficou pronto
+                await asyncio.gather(*capture_tasks, return_exceptions=True)
+
+                title = await page.title()
                 # O 'inner_text' é melhor que 'content' aqui pois já vem sem tags HTML,
                 # pegando o que o usuário realmente vê no painel.
-                content = page.locator("body").inner_text()
-
-                browser.close()
+                content = await page.locator("body").inner_text()
 
-                if not content:
-                    self.logger.warning(
-                        f"[DYNAMIC] Conteúdo vazio retornado de: {url}")
-                    return None
-
-                return {
-                    "url": url,
-                    "title": title,
-                    "content": content,
-                    "source_type": "dynamic_dashboard"
-                }
+            if stats['blocked'] or captured:
+                self.logger.info(
+                    f"[DYNAMIC] {stats['blocked']} recursos bloqueados | "
+                    f"{len(captured)} respostas JSON capturadas: {url}")
+
+            if not content and not captured:
+                self.logger.warning(
+                    f"[DYNAMIC] Conteúdo vazio retornado de: {url}")
+                return None
+
+            result = {
+                "url": url,
+                "title": title,
+                "content": content,
+                "source_type": "dynamic_dashboard"
+            }
+            if target.get('capture_json'):
+                result["captured_data"] = captured
+            return result
 
         except Exception as e:
             self.logger.error(
                 f"[DYNAMIC] Erro crítico ao processar {url}: {str(e)}")
             return None
 
+    async def _extract_many(self, targets):
+        async with BrowserPool(self.max_pages, self.headless, self.USER_AGENT) as pool:
+            return await asyncio.gather(
+                *(self._extract_one(pool, t) for t in targets))
+
+    def extract_many(self, targets):
+        """
+        Renderiza vários dashboards em paralelo com um único navegador.
+        `targets` é uma lista de URLs ou de dicts {'url': ..., 'wait': {...}}.
+        Devolve os resultados na mesma ordem (None para falhas).
+        """
+        targets = [t if isinstance(t, dict) else {'url': t} for t in targets]
+        if not targets:
+            return []
+        try:
+            return asyncio.run(self._extract_many(targets))
+        except Exception as e:
+            # Falha ao lançar o navegador: nenhum alvo pode ser extraído
+            self.logger.error(f"[DYNAMIC] Erro crítico no navegador: {str(e)}")
+            return [None] * len(targets)
+
+    def extract(self, url, wait=None):
+        """
+        Abre a URL usando um navegador headless (Playwright),
+        espera os gráficos carregarem e extrai o texto.
+        """
+        return self.extract_many([{'url': url, 'wait': wait}])[0]
+
     # Método de compatibilidade (caso algum lugar antigo chame .parse)
     def parse(self, url):
         return self.extract(url)
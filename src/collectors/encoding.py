@@ -0,0 +1,95 @@
+import codecs
+import re
+
+# Ordem importa: UTF-32 LE começa com os mesmos bytes do BOM UTF-16 LE
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?([\w\-:.]+)', re.IGNORECASE)
+# Pega <meta charset="x"> e <meta http-equiv="Content-Type" content="text/html; charset=x">
+META_CHARSET = re.compile(
+    rb'<meta[^>]{0,200}?charset\s*=\s*["\']?\s*([\w\-:.]+)', re.IGNORECASE)
+
+# Quanto do início do HTML procurar o <meta charset> (a especificação fala em 1024 bytes;
+# usamos uma margem para portais com <head> cheio de scripts)
+META_SCAN_BYTES = 4096
+# Tamanho máximo da amostra usada pelo detector estatístico
+DETECT_SAMPLE_BYTES = 32 * 1024
+
+
+def _valid_codec(name):
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def _from_header(content_type):
+    match = HEADER_CHARSET.search(content_type or '')
+    return _valid_codec(match.group(1)) if match else None
+
+
+def _from_bom(body):
+    for bom, encoding in BOMS:
+        if body.startswith(bom):
+            return encoding
+    return None
+
+
+def _from_meta(body):
+    match = META_CHARSET.search(body[:META_SCAN_BYTES])
+    if not match:
+        return None
+    return _valid_codec(match.group(1).decode('ascii', errors='ignore'))
+
+
+def _detect(body):
+    """Último recurso: só uma amostra limitada do corpo passa pela detecção."""
+    sample = body[:DETECT_SAMPLE_BYTES]
+
+    # Sonda barata: UTF-8 válido na amostra é quase sempre UTF-8 no documento.
+    # O decoder incremental tolera um caractere multibyte cortado no fim da amostra.
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8', 'utf8_probe'
+    except UnicodeDecodeError:
+        pass
+
+    try:
+        from charset_normalizer import from_bytes
+        best = from_bytes(sample).best()
+        if best and best.encoding:
+            return best.encoding, 'detector'
+    except ImportError:
+        pass
+
+    # Páginas brasileiras antigas que não são UTF-8 quase sempre são Windows-1252
+    return 'cp1252', 'fallback'
+
+
+def resolve_encoding(content_type, body):
+    """
+    Descobre o charset de uma resposta HTML sem analisar o corpo inteiro.
+    Ordem: header HTTP -> BOM -> <meta charset> no início -> detector na amostra.
+
+    Devolve (encoding, origem), onde origem é 'header', 'bom', 'meta',
+    'utf8_probe', 'detector' ou 'fallback'.
+    """
+    encoding = _from_header(content_type)
+    if encoding:
+        return encoding, 'header'
+
+    encoding = _from_bom(body)
+    if encoding:
+        return encoding, 'bom'
+
+    encoding = _from_meta(body)
+    if encoding:
+        return encoding, 'meta'
+
+    return _detect(body)
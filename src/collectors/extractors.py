@@ -0,0 +1,157 @@
+import logging
+from abc import ABC, abstractmethod
+
+
+class BaseExtractor(ABC):
+    """
+    Interface comum dos motores de extração de notícias.
+    Recebe o HTML já decodificado e devolve o mesmo dicionário que o
+    NewsScraper sempre devolveu: {url, title, content, source_type}.
+    """
+
+    name = None
+
+    # Regra: Parágrafo deve ter pelo menos 30 caracteres para ser considerado texto de notícia
+    MIN_PARAGRAPH_LEN = 30
+
+    @classmethod
+    def _keep_paragraph(cls, text):
+        # Filtra parágrafos inúteis (muito curtos ou links de redes sociais)
+        return len(text) > cls.MIN_PARAGRAPH_LEN and "Copyright" not in text
+
+    @staticmethod
+    def _build_result(url, title_text, paragraphs):
+        full_text = "\n".join(paragraphs)
+        if not full_text:
+            return None
+        return {
+            "url": url,
+            "title": title_text,
+            "content": full_text,  # Chave padronizada para o main.py
+            "source_type": "web_news"
+        }
+
+    @abstractmethod
+    def extract(self, html, url):
+        pass
+
+
+class BS4Extractor(BaseExtractor):
+    """Heurística original: árvore completa do BeautifulSoup com html.parser (Python puro)."""
+
+    name = 'bs4'
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self._soup = BeautifulSoup
+
+    def extract(self, html, url):
+        soup = self._soup(html, 'html.parser')
+
+        # 1. Tenta extrair o Título (H1)
+        title = soup.find('h1')
+        title_text = title.get_text().strip() if title else "Sem Titulo"
+
+        # 2. Estratégia de Extração de Texto (Hierarquia)
+        # Tenta focar no conteúdo principal para evitar menus e rodapés
+        content_body = soup.find('article') or \
+            soup.find('main') or \
+            soup.find('div', class_=lambda x: x and 'content' in x) or \
+            soup
+
+        # Pega todos os parágrafos <p> do corpo
+        paragraphs = [p.get_text().strip() for p in content_body.find_all('p')]
+        return self._build_result(
+            url, title_text, [p for p in paragraphs if self._keep_paragraph(p)])
+
+
+class LxmlExtractor(BaseExtractor):
+    """
+    Mesma heurística do BS4Extractor, mas com o parser em C do lxml e
+    buscas em XPath (compiladas uma vez) no lugar dos find/find_all.
+    """
+
+    name = 'lxml'
+
+    def __init__(self):
+        import lxml.html
+        from lxml import etree
+        self._html = lxml.html
+        self._parser_error = etree.ParserError
+        self._xp_title = etree.XPath('(//h1)[1]')
+        self._xp_body = etree.XPath(
+            "(//article)[1] | (//main)[1] | (//div[contains(@class, 'content')])[1]")
+        self._xp_paragraphs = etree.XPath('.//p')
+
+    def _parse(self, html):
+        try:
+            return self._html.document_fromstring(html)
+        except ValueError:
+            # Strings com declaração <?xml encoding=...?> precisam ir como bytes
+            return self._html.document_fromstring(html.encode('utf-8'))
+
+    def _first_body(self, tree):
+        # Mesma prioridade do BS4: article > main > div.content > documento
+        candidates = self._xp_body(tree)
+        for tag in ('article', 'main', 'div'):
+            for node in candidates:
+                if node.tag == tag:
+                    return node
+        return tree
+
+    def extract(self, html, url):
+        try:
+            tree = self._parse(html)
+        except self._parser_error:
+            return None
+
+        title = self._xp_title(tree)
+        title_text = title[0].text_content().strip() if title else "Sem Titulo"
+
+        paragraphs = [p.text_content().strip()
+                      for p in self._xp_paragraphs(self._first_body(tree))]
+        return self._build_result(
+            url, title_text, [p for p in paragraphs if self._keep_paragraph(p)])
+
+
+class TrafilaturaExtractor(BaseExtractor):
+    """Extração do texto principal pelo trafilatura (detecção de boilerplate própria)."""
+
+    name = 'trafilatura'
+
+    def __init__(self):
+        import trafilatura
+        self._trafilatura = trafilatura
+
+    def extract(self, html, url):
+        result = self._trafilatura.bare_extraction(
+            html, url=url, include_comments=False, include_tables=False)
+        if not result or not result.get('text'):
+            return None
+
+        title_text = (result.get('title') or "Sem Titulo").strip()
+        paragraphs = [line.strip() for line in result['text'].split('\n')]
+        return self._build_result(
+            url, title_text, [p for p in paragraphs if self._keep_paragraph(p)])
+
+
+EXTRACTORS = {
+    'lxml': LxmlExtractor,
+    'trafilatura': TrafilaturaExtractor,
+    'bs4': BS4Extractor,
+}
+
+
+def get_extractor(name='lxml'):
+    """
+    Instancia o motor pedido. Se a biblioteca dele não estiver instalada,
+    cai para a heurística BS4 (sempre disponível).
+    """
+    if name not in EXTRACTORS:
+        logging.warning(f"[EXTRACTOR] Motor desconhecido '{name}'. Usando bs4.")
+        name = 'bs4'
+    try:
+        return EXTRACTORS[name]()
+    except ImportError as e:
+        logging.warning(f"[EXTRACTOR] '{name}' indisponível ({e}). Usando bs4.")
+        return BS4Extractor()
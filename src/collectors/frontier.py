@@ -0,0 +1,152 @@
+import logging
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from src.storage.state_store import JSONStateStore
+
+
+class URLFrontier:
+    """
+    Fronteira de coleta: decide quais URLs realmente precisam ir para a rede.
+
+    - Canonicaliza (sem parâmetros de rastreamento, sem 'www.', sem barra final)
+      para detectar a mesma página escrita de jeitos diferentes;
+    - Reconhece a mesma matéria publicada em caminhos diferentes do mesmo site
+      (ex: gov.br/secom/pt-br/assuntos/... e gov.br/secom/pt-br/acompanhe-a-secom/...)
+      pelo slug descritivo do final da URL;
+    - Mantém um índice em disco com o que já foi baixado e quando.
+    """
+
+    TRACKING_PARAMS = {
+        'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid',
+        'cmpid', 'ref', 'ref_src'
+    }
+    TRACKING_PREFIXES = ('utm_', 'at_', 'pk_')
+
+    # Slugs com pelo menos esta quantidade de palavras identificam a matéria
+    MIN_SLUG_WORDS = 5
+
+    def __init__(self, index_path='data/00_state/frontier.json',
+                 revisit_after_days=None, ignore_history=False):
+        self.store = JSONStateStore(index_path)
+        self.index = self.store.load()
+        self.revisit_after_days = revisit_after_days
+        self.ignore_history = ignore_history
+        self.stats = {}
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.stats = {'total': 0, 'duplicates': 0,
+                      'already_fetched': 0, 'to_fetch': 0}
+
+    @classmethod
+    def _is_tracking(cls, param):
+        param = param.lower()
+        return param in cls.TRACKING_PARAMS or param.startswith(cls.TRACKING_PREFIXES)
+
+    @classmethod
+    def canonicalize(cls, url):
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower() or 'http'
+
+        host = (parts.hostname or '').lower()
+        if host.startswith('www.'):
+            host = host[4:]
+        # Porta só importa se não for a padrão do protocolo
+        if parts.port and parts.port not in (80, 443):
+            host = f"{host}:{parts.port}"
+
+        path = parts.path or '/'
+        if len(path) > 1:
+            path = path.rstrip('/')
+
+        query = parts.query
+        # Queries "livres" como as do WWF (?93004/Titulo) não são pares chave=valor
+        if query and '=' in query:
+            params = [(k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+                      if not cls._is_tracking(k)]
+            query = urlencode(sorted(params))
+
+        # http e https apontam para o mesmo documento; o fragmento nunca vai ao servidor
+        return urlunsplit(('https' if scheme == 'http' else scheme, host, path, query, ''))
+
+    @classmethod
+    def story_key(cls, canonical_url):
+        """
+        Chave da matéria: domínio + slug final, quando o slug é descritivo o
+        bastante para ser único. Devolve None para URLs genéricas.
+        """
+        parts = urlsplit(canonical_url)
+        # Para o WWF o slug vem na query (?93004/Incendios-seguem-...)
+        tail = parts.query if parts.query and '=' not in parts.query else parts.path
+        slug = tail.rstrip('/').split('/')[-1]
+        if len(slug.split('-')) < cls.MIN_SLUG_WORDS:
+            return None
+        return f"{parts.netloc}|{slug}"
+
+    def _is_fresh(self, entry):
+        if self.ignore_history or entry.get('status') != 'ok':
+            return False
+        if self.revisit_after_days is None:
+            return True
+        last = datetime.fromisoformat(entry['last_fetched'])
+        return datetime.now() - last < timedelta(days=self.revisit_after_days)
+
+    def _fetched_stories(self):
+        return {entry['story']: entry for entry in self.index.values()
+                if entry.get('story') and self._is_fresh(entry)}
+
+    def filter(self, urls):
+        """
+        Devolve apenas as URLs que precisam ser baixadas, na ordem original.
+        Nenhuma requisição de rede é feita aqui.
+        """
+        self._reset_stats()
+        fetched_stories = self._fetched_stories()
+        seen_canonical = set()
+        seen_stories = set()
+        selected = []
+
+        for url in urls:
+            self.stats['total'] += 1
+            canonical = self.canonicalize(url)
+            story = self.story_key(canonical)
+
+            if canonical in seen_canonical or (story and story in seen_stories):
+                self.stats['duplicates'] += 1
+                logging.debug(f"[FRONTIER] Duplicada na lista: {url}")
+                continue
+            seen_canonical.add(canonical)
+            if story:
+                seen_stories.add(story)
+
+            entry = self.index.get(canonical)
+            if (entry and self._is_fresh(entry)) or (story and story in fetched_stories):
+                self.stats['already_fetched'] += 1
+                logging.debug(f"[FRONTIER] Já coletada: {url}")
+                continue
+
+            selected.append(url)
+
+        self.stats['to_fetch'] = len(selected)
+        return selected
+
+    def mark_fetched(self, url, success):
+        canonical = self.canonicalize(url)
+        self.index[canonical] = {
+            'url': url,
+            'story': self.story_key(canonical),
+            'status': 'ok' if success else 'failed',
+            'last_fetched': datetime.now().isoformat(timespec='seconds')
+        }
+
+    def save(self):
+        self.store.save(self.index)
+
+    def report(self):
+        avoided = self.stats['duplicates'] + self.stats['already_fetched']
+        logging.info(
+            f"[FRONTIER] {self.stats['total']} URLs | "
+            f"{self.stats['duplicates']} duplicadas | "
+            f"{self.stats['already_fetched']} já coletadas | "
+            f"{avoided} downloads evitados | {self.stats['to_fetch']} a baixar")
+        return avoided
@@ -1,10 +1,13 @@
-import requests
-from bs4 import BeautifulSoup
 import logging
+from src.collectors.extractors import get_extractor
+from src.collectors.http_client import create_client, load_settings
 
 
 class NewsScraper:
-    def __init__(self):
+    def __init__(self, config_path='config/settings.yaml', cache_only=False,
+                 pdf_engine=None):
+        self.config = load_settings(config_path)
+
         # Cabeçalhos para fingir ser um navegador real (Evita bloqueio 403/404 do Gov.br e Globo)
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -13,65 +16,83 @@ class NewsScraper:
             'Referer': 'https://www.google.com/'
         }
 
-    def fetch_article(self, url):
+        # Session compartilhada (keep-alive) dimensionada para o modo concorrente,
+        # com cache em disco, rate limiting por domínio, retentativas e circuit breaker
+        # Timeout de 15s para evitar travar em sites lentos
+        # cache_only=True: replay do cache em disco, sem acessar a rede
+        self.http = create_client(
+            self.config, cache_only=cache_only, timeout=15, headers=self.headers)
+
+        # URLs que redirecionam para PDF são entregues ao PDFEngine
+        self.pdf_engine = pdf_engine
+
+        self.extractor = get_extractor(
+            self.config.get('scraping', {}).get('extractor', 'lxml'))
+
+    def fetch_article(self, url, parse_pdf=True):
         """
         Baixa e extrai o texto principal de uma notícia.
+
+        Com parse_pdf=False (threads do ConcurrentFetcher), uma URL que
+        entrega PDF devolve só {url, pdf_path, source_type} e quem chamou
+        passa o arquivo ao parse_pdf() na thread principal: o PDFEngine não
+        é thread-safe (OCR preguiçoso, stats, backend com estado).
         """
         logging.info(f"[WEB] Baixando URL: {url}")
 
         try:
-            # Timeout de 15s para evitar travar em sites lentos
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = self.http.get(url)
 
             if response.status_code != 200:
                 logging.error(
                     f"[WEB] Erro {response.status_code} ao acessar: {url}")
                 return None
 
-            # Força a codificação correta (evita caracteres estranhos)
-            response.encoding = response.apparent_encoding
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # 1. Tenta extrair o Título (H1)
-            title = soup.find('h1')
-            title_text = title.get_text().strip() if title else "Sem Titulo"
-
-            # 2. Estratégia de Extração de Texto (Hierarquia)
-            # Tenta focar no conteúdo principal para evitar menus e rodapés
-            content_body = soup.find('article') or \
-                soup.find('main') or \
-                soup.find('div', class_=lambda x: x and 'content' in x) or \
-                soup
+            if response.content_kind == 'pdf':
+                if not parse_pdf:
+                    return {"url": url, "pdf_path": response.pdf_path,
+                            "source_type": "web_pdf"}
+                return self.parse_pdf(url, response.pdf_path)
 
-            # Pega todos os parágrafos <p> do corpo
-            paragraphs = content_body.find_all('p')
+            # Codificação correta sem detecção estatística no corpo inteiro
+            # (header -> BOM -> <meta charset> -> detector numa amostra)
+            html = self.http.decode(response)
 
-            # Filtra parágrafos inúteis (muito curtos ou links de redes sociais)
-            clean_paragraphs = []
-            for p in paragraphs:
-                text = p.get_text().strip()
-                # Regra: Parágrafo deve ter pelo menos 30 caracteres para ser considerado texto de notícia
-                if len(text) > 30 and "Copyright" not in text:
-                    clean_paragraphs.append(text)
+            # Motor de extração configurável (lxml, trafilatura ou bs4)
+            result = self.extractor.extract(html, url)
 
-            full_text = "\n".join(clean_paragraphs)
-
-            if not full_text:
+            if not result:
                 logging.warning(f"[WEB] Conteúdo vazio extraído de: {url}")
                 return None
 
-            return {
-                "url": url,
-                "title": title_text,
-                "content": full_text,  # Chave padronizada para o main.py
-                "source_type": "web_news"
-            }
+            return result
 
         except Exception as e:
             logging.error(f"[WEB] Falha crítica em {url}: {str(e)}")
             return None
 
+    def parse_pdf(self, url, pdf_path):
+        """
+        Notícia que na verdade é um PDF: PDFEngine em vez de parser HTML.
+        Chamar de uma thread só (ver fetch_article).
+        """
+        logging.info(f"[WEB] URL entregou um PDF, enviando ao PDFEngine: {url}")
+        if self.pdf_engine is None:
+            from src.collectors.pdf_engine import PDFEngine
+            self.pdf_engine = PDFEngine()
+
+        raw_data = self.pdf_engine.parse(pdf_path)
+        if not raw_data:
+            return None
+
+        return {
+            "url": url,
+            "title": raw_data['title'] or raw_data['filename'],
+            "content": raw_data['raw_content'],
+            "source_type": "web_pdf",
+            "filename": raw_data['filename']
+        }
+
     # Alias para manter compatibilidade caso algo chame .parse()
     def parse(self, url):
         return self.fetch_article(url)
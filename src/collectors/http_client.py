@@ -0,0 +1,372 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import yaml
+from collections import Counter
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib.parse import urlsplit
+from src.collectors.encoding import resolve_encoding
+from src.collectors.rate_limiter import HostRateLimiter
+from src.collectors.resilience import CircuitBreaker, CircuitOpen, RetryPolicy
+from src.storage.http_cache import HTTPCache
+
+
+def load_settings(config_path='config/settings.yaml'):
+    """
+    Lê o settings.yaml. Se o arquivo não existir, devolve um dicionário vazio
+    (os componentes usam seus próprios valores padrão).
+    """
+    if not os.path.exists(config_path):
+        logging.warning(
+            f"[HTTP] {config_path} não encontrado. Usando valores padrão.")
+        return {}
+    with open(config_path, 'r') as file:
+        return yaml.safe_load(file) or {}
+
+
+def create_cache(config, offline=False):
+    """
+    Monta o HTTPCache a partir da seção 'http_cache' do settings.yaml.
+    O modo offline (replay) força o cache mesmo que esteja desabilitado.
+    """
+    cache_cfg = config.get('http_cache', {})
+    if not cache_cfg.get('enabled', True) and not offline:
+        return None
+    return HTTPCache(
+        cache_dir=cache_cfg.get('dir', 'data/00_state/http_cache'),
+        max_bytes=cache_cfg.get('max_size_mb', 500) * 1024 * 1024,
+        offline=offline)
+
+
+class OfflineCacheMiss(requests.exceptions.RequestException):
+    """URL pedida em modo cache-only que não está no cache."""
+
+
+class ContentRejected(requests.exceptions.RequestException):
+    """Download abortado: tipo de conteúdo não suportado ou corpo grande demais."""
+
+
+def create_client(config, cache_only=False, timeout=None, headers=None):
+    """
+    Monta o HTTPClient com todas as camadas configuradas no settings.yaml:
+    cache em disco, rate limiting por domínio, limites de streaming,
+    retentativas e circuit breaker.
+    """
+    scraping = config.get('scraping', {})
+    return HTTPClient(
+        pool_size=config.get('concurrency', {}).get('max_workers', 8),
+        timeout=timeout or scraping.get('timeout', 30),
+        connect_timeout=scraping.get('connect_timeout'),
+        headers=headers,
+        cache=create_cache(config, offline=cache_only),
+        rate_limiter=HostRateLimiter.from_settings(config),
+        retry_policy=RetryPolicy.from_settings(config),
+        breaker=CircuitBreaker.from_settings(config),
+        max_body_mb=scraping.get('max_body_mb', 5),
+        max_pdf_mb=scraping.get('max_pdf_mb', 50),
+        downloads_dir=scraping.get('downloads_dir', 'data/02_downloads'))
+
+
+class HTTPClient:
+    """
+    Cliente HTTP compartilhado pelos coletores.
+    Uma única Session com pool de conexões keep-alive: várias requisições ao
+    mesmo domínio reaproveitam a conexão TCP/TLS em vez de abrir uma nova.
+    A Session é usada por várias threads do ConcurrentFetcher ao mesmo tempo.
+
+    Com um HTTPCache, toda URL já vista é revalidada com If-None-Match /
+    If-Modified-Since; um 304 devolve o corpo do disco como se fosse um 200.
+
+    Com um HostRateLimiter, cada acesso à rede espera a vaga do próprio
+    domínio (replays do cache não esperam) e respostas 429/503 com
+    Retry-After colocam o host em espera.
+
+    Os downloads são em streaming: o Content-Type é checado antes de ler o
+    corpo, tipos que não são texto/HTML/XML/PDF são abortados e nenhum corpo
+    passa do limite configurado. PDFs vão direto para um arquivo em
+    downloads_dir (response.content_kind == 'pdf', response.pdf_path).
+
+    Com RetryPolicy e CircuitBreaker, erros transitórios (conexão, timeout,
+    429/5xx) são repetidos com backoff exponencial; esgotadas as tentativas,
+    a requisição conta UMA falha do domínio. Com o circuito aberto a
+    requisição falha na hora (CircuitOpen).
+    As URLs que terminam em falha transitória ficam em transient_failures
+    para o pipeline colocá-las na fila de retentativa.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, pool_size=10, timeout=15, headers=None, cache=None,
+                 rate_limiter=None, max_body_mb=5, max_pdf_mb=50,
+                 downloads_dir='data/02_downloads', retry_policy=None,
+                 breaker=None, connect_timeout=None):
+        # (conexão, leitura): host fora do ar falha em segundos, não no timeout de leitura
+        self.timeout = (connect_timeout, timeout) if connect_timeout else timeout
+        self.max_body_bytes = int(max_body_mb * 1024 * 1024)
+        self.max_pdf_bytes = int(max_pdf_mb * 1024 * 1024)
+        self.downloads_dir = downloads_dir
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.breaker = breaker
+        self.transient_failures = {}
+        self.session = requests.Session()
+
+        # Quantas páginas tiveram o charset resolvido por cada caminho
+        self.encoding_stats = Counter()
+        self._stats_lock = threading.Lock()
+
+        # pool_maxsize precisa acompanhar o nº de downloads simultâneos,
+        # senão o urllib3 descarta conexões e perde o keep-alive
+        adapter = HTTPAdapter(pool_connections=pool_size,
+                              pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        if headers:
+            self.session.headers.update(headers)
+
+    @property
+    def offline(self):
+        return bool(self.cache and self.cache.offline)
+
+    @staticmethod
+    def _cached_response(url, entry, body):
+        """Monta um Response 200 a partir do que está no disco."""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = url
+        response.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        response._content = body
+        response.content_kind = 'text'
+        response.from_cache = True
+        return response
+
+    @staticmethod
+    def _content_kind(content_type, first_chunk):
+        """'text' (HTML/XML/texto), 'pdf' ou None (não suportado)."""
+        if 'pdf' in content_type or first_chunk.startswith(b'%PDF'):
+            return 'pdf'
+        if not content_type or content_type.startswith('text/') \
+                or 'html' in content_type or 'xml' in content_type:
+            return 'text'
+        return None
+
+    def _save_pdf(self, url, first_chunk, chunks, response):
+        os.makedirs(self.downloads_dir, exist_ok=True)
+        name = os.path.basename(urlsplit(url).path) or 'documento'
+        name = re.sub(r'[^\w.\-]', '_', name)
+        if not name.lower().endswith('.pdf'):
+            name += '.pdf'
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:10]
+        path = os.path.join(self.downloads_dir, f"{digest}_{name}")
+
+        size = len(first_chunk)
+        try:
+            with open(path + '.part', 'wb') as f:
+                f.write(first_chunk)
+                for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.max_pdf_bytes:
+                        response.close()
+                        raise ContentRejected(
+                            f"PDF maior que {self.max_pdf_bytes // (1024 * 1024)} MB: {url}")
+                    f.write(chunk)
+        except BaseException:
+            # Limite, conexão caída no meio (ChunkedEncodingError), disco cheio...:
+            # nenhum .part fica para trás em downloads_dir
+            if os.path.exists(path + '.part'):
+                os.remove(path + '.part')
+            raise
+        os.replace(path + '.part', path)
+        return path
+
+    @staticmethod
+    def _declared_length(value):
+        """
+        Tamanho do Content-Length, ou 0 se ausente/inválido. Servidores mandam
+        o header duplicado ("12, 12") ou lixo; o limite em streaming vale igual.
+        """
+        try:
+            return max(int((value or '0').split(',')[0]), 0)
+        except ValueError:
+            return 0
+
+    def _consume(self, response, url):
+        """Lê o corpo em blocos, decidindo pelo Content-Type antes de baixar tudo."""
+        content_type = response.headers.get(
+            'Content-Type', '').split(';')[0].strip().lower()
+        declared = self._declared_length(response.headers.get('Content-Length'))
+
+        chunks = response.iter_content(chunk_size=self.CHUNK_SIZE)
+        first_chunk = next(chunks, b'')
+        kind = self._content_kind(content_type, first_chunk)
+
+        if kind is None:
+            response.close()
+            raise ContentRejected(
+                f"Tipo de conteúdo não suportado ({content_type}): {url}")
+
+        limit = self.max_pdf_bytes if kind == 'pdf' else self.max_body_bytes
+        if declared > limit:
+            response.close()
+            raise ContentRejected(
+                f"Corpo declarado de {declared // 1024} KB excede o limite: {url}")
+
+        response.content_kind = kind
+        if kind == 'pdf':
+            response.pdf_path = self._save_pdf(url, first_chunk, chunks, response)
+            response._content = b''
+            return response
+
+        body = bytearray(first_chunk)
+        for chunk in chunks:
+            body += chunk
+            if len(body) > limit:
+                response.close()
+                raise ContentRejected(
+                    f"Corpo maior que {limit // 1024} KB (abortado): {url}")
+        response._content = bytes(body)
+        return response
+
+    def _send(self, url, headers, timeout):
+        if self.rate_limiter:
+            self.rate_limiter.acquire(url)
+        response = self.session.get(url, headers=headers, stream=True,
+                                    timeout=timeout or self.timeout)
+        if self.rate_limiter and response.status_code in (429, 503):
+            self.rate_limiter.penalize(url, response.headers.get('Retry-After'))
+
+        if response.status_code != 200:
+            # 304 e erros: o corpo não interessa
+            response._content = b''
+            response.close()
+            return response
+        return self._consume(response, url)
+
+    def _record_transient(self, url, reason, final):
+        """
+        Anota a falha transitória da URL. Só a última tentativa (final=True)
+        conta para o circuit breaker: uma URL que falha sempre não pode,
+        sozinha, abrir o circuito do domínio inteiro com as retentativas.
+        """
+        with self._stats_lock:
+            self.transient_failures[url] = reason
+        if final and self.breaker:
+            self.breaker.record_failure(url)
+
+    def _network_get(self, url, headers, timeout):
+        policy = self.retry_policy
+        max_retries = policy.max_retries if policy else 0
+
+        # A requisição lógica passa pelo breaker uma vez (em half-open, é a
+        # sonda); as retentativas dela não pedem vaga de novo
+        if self.breaker and not self.breaker.allow(url):
+            with self._stats_lock:
+                self.transient_failures[url] = 'circuito aberto'
+            raise CircuitOpen(f"Circuito aberto para o domínio de {url}")
+
+        try:
+            for attempt in range(max_retries + 1):
+                try:
+                    response = self._send(url, headers, timeout)
+                except requests.exceptions.RequestException as e:
+                    if not (policy and policy.is_transient_error(e)):
+                        # Conteúdo rejeitado, redirects demais...: o host respondeu
+                        if self.breaker and not isinstance(e, RetryPolicy.TRANSIENT_EXCEPTIONS):
+                            self.breaker.record_success(url)
+                        raise
+                    self._record_transient(url, type(e).__name__, final=attempt == max_retries)
+                    if attempt == max_retries:
+                        raise
+                    delay = policy.delay(attempt)
+                    logging.warning(
+                        f"[HTTP] {type(e).__name__} em {url}. "
+                        f"Tentativa {attempt + 2}/{max_retries + 1} em {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+
+                if policy and policy.is_transient_status(response.status_code):
+                    self._record_transient(url, f"HTTP {response.status_code}",
+                                           final=attempt == max_retries)
+                    if attempt < max_retries:
+                        # Um Retry-After já colocou o host em espera no rate limiter
+                        delay = policy.delay(attempt)
+                        logging.warning(
+                            f"[HTTP] {response.status_code} em {url}. "
+                            f"Tentativa {attempt + 2}/{max_retries + 1} em {delay:.1f}s")
+                        time.sleep(delay)
+                        continue
+                    return response
+
+                if self.breaker:
+                    self.breaker.record_success(url)
+                with self._stats_lock:
+                    self.transient_failures.pop(url, None)
+                return response
+        finally:
+            # Qualquer outra saída (ex: OSError ao gravar o PDF) não pode deixar
+            # a sonda half-open presa: o domínio ficaria bloqueado até o fim
+            if self.breaker:
+                self.breaker.release(url)
+
+    def get(self, url, headers=None, timeout=None):
+        if not self.cache:
+            return self._network_get(url, headers, timeout)
+
+        entry, body = self.cache.lookup(url)
+
+        if self.cache.offline:
+            if entry is None:
+                self.cache.count('misses')
+                raise OfflineCacheMiss(f"Fora do cache (modo cache-only): {url}")
+            self.cache.count('offline_hits')
+            self.cache.touch(url)
+            return self._cached_response(url, entry, body)
+
+        request_headers = dict(headers or {})
+        if entry:
+            request_headers.update(self.cache.conditional_headers(entry))
+        else:
+            self.cache.count('misses')
+
+        response = self._network_get(url, request_headers, timeout)
+
+        if response.status_code == 304 and entry:
+            self.cache.count('revalidated')
+            self.cache.touch(url)
+            return self._cached_response(url, entry, body)
+
+        if response.status_code == 200 and response.content_kind == 'text':
+            self.cache.store(url, response.content, response.headers)
+        return response
+
+    def decode(self, response):
+        """
+        Define response.encoding pelo caminho mais barato disponível
+        (header, BOM, <meta>, detector numa amostra) e devolve o texto.
+        Substitui o response.apparent_encoding, que roda a detecção
+        estatística sobre o corpo inteiro de toda página.
+        """
+        encoding, source = resolve_encoding(
+            response.headers.get('Content-Type'), response.content)
+        response.encoding = encoding
+        with self._stats_lock:
+            self.encoding_stats[source] += 1
+        logging.debug(f"[HTTP] Charset {encoding} via {source}: {response.url}")
+        return response.text
+
+    def close(self):
+        if self.encoding_stats:
+            summary = ", ".join(f"{k}={v}" for k, v in self.encoding_stats.most_common())
+            logging.info(f"[HTTP] Origem do charset: {summary}")
+        if self.cache:
+            self.cache.flush()
+            self.cache.report()
+        self.session.close()
@@ -0,0 +1,193 @@
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import fitz  # PyMuPDF
+from PIL import Image
+from src.storage.ocr_cache import OCRCache
+
+
+def create_ocr_cache(cache_cfg):
+    """Monta o OCRCache a partir da seção 'ocr_cache' do settings.yaml (None se desabilitado)."""
+    if cache_cfg is None or not cache_cfg.get('enabled', True):
+        return None
+    return OCRCache(
+        cache_dir=cache_cfg.get('dir', 'data/00_state/ocr_cache'),
+        max_bytes=cache_cfg.get('max_size_mb', 200) * 1024 * 1024)
+
+
+@functools.lru_cache(maxsize=None)
+def tesseract_version(binding='pytesseract'):
+    """Versão do motor de OCR, parte da chave do OCRCache."""
+    try:
+        if binding == 'tesserocr':
+            import tesserocr
+            return f"tesserocr-{tesserocr.tesseract_version().split()[1]}"
+        import pytesseract
+        return f"tesseract-{pytesseract.get_tesseract_version()}"
+    except Exception:
+        return f"{binding}-desconhecido"
+
+
+@functools.lru_cache(maxsize=None)
+def _warn_pytesseract_fallback(reason):
+    # Uma vez por processo: sem tesserocr, o OCR ainda abre um tesseract por página
+    logging.warning(
+        f"[OCR] tesserocr indisponível ({reason}); usando pytesseract, que inicia "
+        f"um processo do tesseract por página. Instale o tesserocr para OCR mais rápido.")
+
+
+class OCRPool:
+    """
+    OCR das páginas escaneadas sem sair do processo para renderizar:
+
+    - A página é desenhada pelo documento fitz já aberto direto num pixmap
+      em memória (tons de cinza), sem o poppler do pdf2image reabrir o PDF
+      inteiro a cada página;
+    - O DPI é adaptativo: não passa da resolução nativa da imagem escaneada
+      (renderizar acima disso só gasta memória) e respeita um teto de pixels
+      para slides gigantes;
+    - As imagens vão para um pool de threads de Tesseract reaproveitado entre
+      páginas e documentos. Com o `tesserocr` instalado, cada thread mantém a
+      sua instância da API carregada (sem processo por página); sem ele
+      (opcional, fora do requirements), cai no `pytesseract`, que ainda roda
+      as páginas em paralelo mas com um processo cada - e avisa no log;
+    - Com um OCRCache, páginas já reconhecidas nem são renderizadas.
+    """
+
+    # Teto de pixels por página (~ A4 a 300 DPI); acima disso o DPI desce
+    MAX_PIXELS = 9_000_000
+
+    def __init__(self, lang='por', workers=2, dpi=200, min_dpi=150, max_dpi=300,
+                 adaptive=True, cache=None):
+        self.lang = lang
+        self.cache = cache
+        self.workers = max(1, workers)
+        self.dpi = dpi
+        self.min_dpi = min_dpi
+        self.max_dpi = max_dpi
+        self.adaptive = adaptive
+
+        if self.workers > 1:
+            # Vários Tesseracts com OpenMP cada disputam os mesmos núcleos
+            os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='ocr')
+
+    def page_dpi(self, page):
+        if not self.adaptive:
+            return self.dpi
+
+        dpi = self.dpi
+        # Resolução efetiva da maior imagem da página (pixels / polegadas ocupadas)
+        images = [info for info in page.get_image_info() if info.get('width')]
+        if images:
+            biggest = max(images, key=lambda i: (i['bbox'][2] - i['bbox'][0]) *
+                          (i['bbox'][3] - i['bbox'][1]))
+            inches = (biggest['bbox'][2] - biggest['bbox'][0]) / 72
+            if inches > 0:
+                dpi = min(dpi, biggest['width'] / inches)
+        dpi = max(self.min_dpi, min(self.max_dpi, dpi))
+
+        # Slides e plantas enormes: reduz até caber no teto de pixels
+        width_in, height_in = page.rect.width / 72, page.rect.height / 72
+        if width_in * height_in * dpi * dpi > self.MAX_PIXELS:
+            dpi = (self.MAX_PIXELS / (width_in * height_in)) ** 0.5
+        return int(dpi)
+
+    def render(self, page, dpi=None):
+        """Renderiza a página num pixmap em memória e devolve uma imagem PIL em cinza."""
+        pix = page.get_pixmap(dpi=dpi or self.page_dpi(page), colorspace=fitz.csGRAY)
+        return Image.frombytes("L", (pix.width, pix.height), pix.samples)
+
+    def _tesseract_api(self):
+        # Uma instância da API por thread (não é thread-safe); None sem tesserocr
+        if not hasattr(self._local, 'api'):
+            try:
+                import tesserocr
+                self._local.api = tesserocr.PyTessBaseAPI(lang=self.lang)
+            except (ImportError, RuntimeError) as e:
+                _warn_pytesseract_fallback(type(e).__name__)
+                self._local.api = None
+        return self._local.api
+
+    def _recognize(self, image):
+        api = self._tesseract_api()
+        if api is not None:
+            api.SetImage(image)
+            return api.GetUTF8Text()
+
+        import pytesseract
+        return pytesseract.image_to_string(image, lang=self.lang)
+
+    @property
+    def engine_version(self):
+        try:
+            import tesserocr  # noqa: F401
+            return tesseract_version('tesserocr')
+        except ImportError:
+            return tesseract_version('pytesseract')
+
+    def _recognize_safe(self, page_number, image, cache_key):
+        try:
+            text = self._recognize(image)
+        except Exception as e:
+            logging.error(f"[OCR] Erro no OCR da página {page_number + 1}: {e}")
+            return None
+        # Só resultados bem-sucedidos entram no cache (falhas tentam de novo)
+        if cache_key is not None:
+            try:
+                self.cache.put(cache_key, text)
+            except Exception as e:
+                # Disco cheio, permissão...: o texto reconhecido não se perde
+                logging.warning(
+                    f"[OCR CACHE] Falha ao gravar a página {page_number + 1}: {e}")
+        return text
+
+    def _cache_key(self, digest, page_number, dpi):
+        if self.cache is None or digest is None:
+            return None
+        return self.cache.key(digest, page_number, dpi, self.lang,
+                              self.engine_version, 'fitz-gray')
+
+    def recognize_pages(self, doc, page_numbers, digest=None):
+        """
+        OCR em lote das páginas `page_numbers` do documento aberto.
+        Renderiza em janelas do tamanho do pool (memória limitada) e
+        devolve {nº da página (base 0): texto}; None = a página falhou
+        (renderização ou Tesseract) e fica sem texto.
+        `digest` (hash do arquivo) habilita o OCRCache.
+        """
+        results = {}
+        window = self.workers * 2
+        for offset in range(0, len(page_numbers), window):
+            batch = page_numbers[offset:offset + window]
+            futures = {}
+            for number in batch:
+                try:
+                    page = doc[number]
+                    dpi = self.page_dpi(page)
+                    cache_key = self._cache_key(digest, number, dpi)
+                    if cache_key is not None:
+                        cached = self.cache.get(cache_key)
+                        if cached is not None:
+                            results[number] = cached
+                            continue
+                    image = self.render(page, dpi)
+                except Exception as e:
+                    logging.error(f"[OCR] Erro ao renderizar a página {number + 1}: {e}")
+                    results[number] = None
+                    continue
+                futures[number] = self._executor.submit(
+                    self._recognize_safe, number, image, cache_key)
+            for number, future in futures.items():
+                results[number] = future.result()
+        return results
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        if self.cache is not None and any(self.cache.stats.values()):
+            self.cache.report()
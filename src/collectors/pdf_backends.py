@@ -0,0 +1,141 @@
+import logging
+from abc import ABC, abstractmethod
+import fitz  # PyMuPDF
+
+
+class BasePDFBackend(ABC):
+    """
+    Interface comum dos motores de texto nativo de PDF (camada de texto).
+    O PDFEngine escolhe, página a página, entre o motor configurado e o OCR;
+    o resultado final tem sempre o mesmo esquema (ver PDFEngine.parse).
+    """
+
+    name = None
+
+    @abstractmethod
+    def extract_page(self, doc, filepath, page_number):
+        """Texto da página `page_number` (base 0) do documento fitz já aberto."""
+
+    def close(self):
+        pass
+
+
+class PyMuPDFBackend(BasePDFBackend):
+    """Blocos do PyMuPDF ordenados por posição (padrão; o mais rápido)."""
+
+    name = 'pymupdf'
+
+    def extract_page(self, doc, filepath, page_number):
+        """
+        Extrai texto respeitando colunas (Blocos).
+        Retorna o texto ou string vazia se for imagem.
+        """
+        # get_text("blocks") retorna: (x0, y0, x1, y1, "texto", block_no, block_type)
+        blocks = doc[page_number].get_text("blocks")
+
+        # Ordena os blocos: Primeiro de cima para baixo (y0), depois da esquerda para a direita (x0)
+        # Isso resolve o problema de ler colunas misturadas
+        blocks.sort(key=lambda b: (b[1], b[0]))
+
+        full_text = []
+        for b in blocks:
+            # O índice 4 é o conteúdo de texto do bloco
+            text_content = b[4].strip()
+            if text_content:
+                full_text.append(text_content)
+
+        return "\n".join(full_text)
+
+
+class PDFPlumberBackend(BasePDFBackend):
+    """Texto do pdfplumber (antigo PDFExtractor): mais lento, layout por caractere."""
+
+    name = 'pdfplumber'
+
+    def __init__(self):
+        import pdfplumber
+        self._pdfplumber = pdfplumber
+        self._path = None
+        self._pdf = None
+
+    def extract_page(self, doc, filepath, page_number):
+        # O pdfplumber abre o arquivo por conta própria; um documento por vez
+        if self._path != filepath:
+            self.close()
+            self._pdf = self._pdfplumber.open(filepath)
+            self._path = filepath
+        return (self._pdf.pages[page_number].extract_text() or "").strip()
+
+    def close(self):
+        if self._pdf is not None:
+            self._pdf.close()
+        self._pdf, self._path = None, None
+
+
+PDF_BACKENDS = {
+    'pymupdf': PyMuPDFBackend,
+    'pdfplumber': PDFPlumberBackend,
+}
+
+
+def get_pdf_backend(name='pymupdf'):
+    """
+    Instancia o motor pedido. Se a biblioteca dele não estiver instalada,
+    cai para o PyMuPDF (dependência obrigatória).
+    """
+    if name not in PDF_BACKENDS:
+        logging.warning(f"[PDF ENGINE] Motor desconhecido '{name}'. Usando pymupdf.")
+        name = 'pymupdf'
+    try:
+        return PDF_BACKENDS[name]()
+    except ImportError as e:
+        logging.warning(f"[PDF ENGINE] '{name}' indisponível ({e}). Usando pymupdf.")
+        return PyMuPDFBackend()
+
+
+class PageRouter:
+    """
+    Decide o motor de cada página por sinais baratos, antes de gastar com
+    extração ou OCR:
+
+      - fontes:    sem nenhuma fonte a página não tem camada de texto, então
+                   a extração nativa nem é tentada;
+      - imagens:   fração da página coberta por imagens (scan = página inteira);
+      - desenhos:  texto convertido em curvas aparece como muitos vetores;
+      - densidade: caracteres extraídos da camada de texto.
+
+    Resultado: 'text' (camada nativa basta), 'ocr' ou 'skip' (página em
+    branco: nem texto, nem imagem, nem desenho para ler).
+    """
+
+    # Menos que isso na camada de texto é considerado página sem texto
+    MIN_TEXT_CHARS = 50
+    # Cobertura de imagem a partir da qual uma página pobre em texto vai para o OCR
+    MIN_SCAN_COVERAGE = 0.3
+    # Vetores a partir dos quais uma página sem fontes pode ser texto em curvas
+    MIN_VECTOR_PATHS = 200
+
+    @staticmethod
+    def image_coverage(page):
+        area = abs(page.rect)
+        if not area:
+            return 0.0
+        covered = sum(abs(fitz.Rect(info['bbox']) & page.rect)
+                      for info in page.get_image_info())
+        return min(1.0, covered / area)
+
+    @classmethod
+    def needs_text(cls, page):
+        """Sem fontes não há camada de texto: a extração nativa é pulada."""
+        return bool(page.get_fonts())
+
+    @classmethod
+    def route(cls, page, text):
+        """`text` é o resultado da camada nativa (None se não foi extraída)."""
+        if text is not None and len(text) >= cls.MIN_TEXT_CHARS:
+            return 'text'
+        if cls.image_coverage(page) >= cls.MIN_SCAN_COVERAGE:
+            return 'ocr'
+        if text is None and len(page.get_cdrawings()) >= cls.MIN_VECTOR_PATHS:
+            return 'ocr'
+        return 'text' if text else 'skip'
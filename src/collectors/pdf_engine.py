@@ -1,52 +1,220 @@
 import fitz  # PyMuPDF
-import pytesseract
 import logging
+import math
+import multiprocessing
 import os
-from pdf2image import convert_from_path
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
+from src.collectors.ocr_engine import OCRPool, create_ocr_cache
+from src.collectors.pdf_backends import PageRouter, get_pdf_backend
+
+
+def _extract_page_range(filepath, start, end, options):
+    """
+    Job de um processo do pool: abre o PDF por conta própria (o documento
+    do fitz não atravessa processos) e extrai as páginas [start, end).
+    """
+    engine = PDFEngine(**options)
+    try:
+        with fitz.open(filepath) as doc:
+            return engine._extract_pages(doc, filepath, start, end), engine.stats
+    finally:
+        engine.close()
 
 
 class PDFEngine:
-    def __init__(self):
+    """
+    Extração de texto de PDFs: backend único para todo o projeto.
+
+    Cada página passa pelo PageRouter, que escolhe por sinais baratos
+    (fontes, cobertura de imagem, densidade de texto) entre a camada de
+    texto nativa - motor `text_engine`: 'pymupdf' (blocos, padrão) ou
+    'pdfplumber' - e o OCR. Páginas sem fontes não pagam a extração
+    nativa e páginas em branco não vão para o Tesseract. As decisões ficam
+    em `stats` ('text', 'ocr', 'skip').
+
+    Documentos com pelo menos `split_min_pages` páginas são divididos em
+    faixas de páginas extraídas em paralelo por até `page_workers` processos;
+    o pai remonta o texto na ordem original com os mesmos marcadores
+    "--- PAGE n ---". Assim um relatório escaneado de 300 páginas não prende
+    um único núcleo por minutos enquanto o resto do lote já terminou.
+
+    Páginas escaneadas vão em lote para o OCRPool (renderização em memória
+    pelo próprio fitz, DPI adaptativo, pool de Tesseract reaproveitado).
+    Com `ocr_cache` (seção do settings.yaml), o texto de cada página fica em
+    disco e reexecuções não rodam o Tesseract de novo. Páginas em que o
+    OCR falhou saem sem texto e somam em `stats['ocr_failed']`.
+    """
+
+    # Incrementar quando a extração mudar de comportamento (reprocessa os PDFs do manifesto)
+    VERSION = "3"
+
+    # Faixas menores que isso não compensam abrir o PDF num novo processo
+    MIN_CHUNK_PAGES = 10
+
+    def __init__(self, page_workers=1, split_min_pages=40, ocr_lang='por',
+                 ocr_workers=2, ocr_dpi=200, ocr_adaptive_dpi=True, ocr_cache=None,
+                 text_engine='pymupdf'):
         # Configura o Tesseract para português
-        self.ocr_lang = 'por'
+        self.ocr_lang = ocr_lang
+        self.ocr_workers = ocr_workers
+        self.ocr_dpi = ocr_dpi
+        self.ocr_adaptive_dpi = ocr_adaptive_dpi
+        # Configuração (dict) e não o OCRCache: também vai para os processos das faixas
+        self.ocr_cache = ocr_cache
+        self.page_workers = page_workers or os.cpu_count() or 1
+        self.split_min_pages = split_min_pages
+        # Criado na primeira página escaneada e reaproveitado entre documentos
+        self._ocr = None
+        self.text_engine = text_engine
+        self.text_backend = get_pdf_backend(text_engine)
+        self.stats = Counter()
 
-    def _extract_text_with_layout(self, page):
+    @classmethod
+    def from_settings(cls, config):
+        pdf = config.get('pdf', {})
+        return cls(page_workers=pdf.get('page_workers', 1),
+                   split_min_pages=pdf.get('split_min_pages', 40),
+                   ocr_lang=pdf.get('ocr_lang', 'por'),
+                   ocr_workers=pdf.get('ocr_workers', 2),
+                   ocr_dpi=pdf.get('ocr_dpi', 200),
+                   ocr_adaptive_dpi=pdf.get('ocr_adaptive_dpi', True),
+                   ocr_cache=config.get('ocr_cache', {}),
+                   text_engine=pdf.get('text_engine', 'pymupdf'))
+
+    @property
+    def ocr(self):
+        if self._ocr is None:
+            self._ocr = OCRPool(lang=self.ocr_lang, workers=self.ocr_workers,
+                                dpi=self.ocr_dpi, adaptive=self.ocr_adaptive_dpi,
+                                cache=create_ocr_cache(self.ocr_cache))
+        return self._ocr
+
+    def close(self):
+        self.text_backend.close()
+        if self._ocr is not None:
+            self._ocr.close()
+            self._ocr = None
+
+    def _extract_with_ocr(self, doc, filepath, page_numbers):
         """
-        Extrai texto respeitando colunas (Blocos).
-        Retorna o texto ou string vazia se for imagem.
+        Fallback: Usa OCR se o PDF for uma imagem escaneada.
+        Recebe todas as páginas escaneadas de uma vez e devolve {nº: texto}.
         """
-        # get_text("blocks") retorna: (x0, y0, x1, y1, "texto", block_no, block_type)
-        blocks = page.get_text("blocks")
+        if not page_numbers:
+            return {}
+        logging.info(
+            f"[PDF ENGINE] OCR em lote de {len(page_numbers)} página(s) "
+            f"({self.ocr.workers} worker(s) Tesseract)")
+        digest = self.ocr.cache.file_digest(filepath) if self.ocr.cache else None
+        results = self.ocr.recognize_pages(doc, page_numbers, digest)
+        # Páginas que falharam ficam sem texto; o pipeline não dá o
+        # documento por processado (manifesto) enquanto houver falhas
+        self.stats['ocr_failed'] += sum(text is None for text in results.values())
+        return results
 
-        # Ordena os blocos: Primeiro de cima para baixo (y0), depois da esquerda para a direita (x0)
-        # Isso resolve o problema de ler colunas misturadas
-        blocks.sort(key=lambda b: (b[1], b[0]))
+    def _extract_pages(self, doc, filepath, start, end):
+        """Extrai as páginas [start, end). Devolve [(nº da página, texto)] das que têm texto."""
+        total_pages = len(doc)
+        texts, scanned = {}, []
+        for i in range(start, end):
+            page = doc[i]
+            # 1. Tentativa Rápida (camada de texto), só se a página tiver fontes
+            text = None
+            if PageRouter.needs_text(page):
+                text = self.text_backend.extract_page(doc, filepath, i)
 
-        full_text = []
-        for b in blocks:
-            # O índice 4 é o conteúdo de texto do bloco
-            text_content = b[4].strip()
-            if text_content:
-                full_text.append(text_content)
+            # 2. Pouco texto + página coberta por imagem (ou texto em curvas): OCR
+            engine = PageRouter.route(page, text)
+            self.stats[engine] += 1
+            texts[i] = text if engine == 'text' else ""
+            if engine == 'ocr':
+                logging.info(
+                    f"[PDF ENGINE] Pag {i+1}/{total_pages} parece imagem. Ativando OCR...")
+                scanned.append(i)
 
-        return "\n".join(full_text)
+        texts.update(self._extract_with_ocr(doc, filepath, scanned))
+        return [(i + 1, texts[i]) for i in range(start, end) if texts[i]]
+
+    def _page_ranges(self, total_pages):
+        # Faixas menores que o necessário para `page_workers`: quem termina
+        # primeiro pega a próxima, e páginas de OCR lento não viram gargalo
+        chunk = max(self.MIN_CHUNK_PAGES,
+                    math.ceil(total_pages / (self.page_workers * 2)))
+        return [(start, min(start + chunk, total_pages))
+                for start in range(0, total_pages, chunk)]
+
+    def _extract_parallel(self, doc, filepath, total_pages):
+        ranges = self._page_ranges(total_pages)
+        workers = min(self.page_workers, len(ranges))
+        logging.info(
+            f"[PDF ENGINE] {total_pages} páginas divididas em {len(ranges)} faixas "
+            f"({workers} processos)")
+        # fork com outras threads vivas (downloads do modo web) copia locks
+        # presos nelas; nesse caso os processos nascem limpos (spawn)
+        context = multiprocessing.get_context('spawn') if threading.active_count() > 1 else None
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                # Cada processo já é um worker: OCR sequencial dentro da faixa
+                options = {'ocr_lang': self.ocr_lang, 'ocr_workers': 1,
+                           'ocr_dpi': self.ocr_dpi, 'ocr_adaptive_dpi': self.ocr_adaptive_dpi,
+                           'ocr_cache': self.ocr_cache, 'text_engine': self.text_engine}
+                futures = [pool.submit(_extract_page_range, filepath, start, end, options)
+                           for start, end in ranges]
+                # Remonta na ordem original das faixas; as contagens só entram
+                # em `stats` com todas prontas (no fallback abaixo as páginas
+                # seriam contadas de novo)
+                pages, stats = [], Counter()
+                for future in futures:
+                    range_pages, range_stats = future.result()
+                    pages.extend(range_pages)
+                    stats.update(range_stats)
+            self.stats.update(stats)
+            return pages
+        except Exception as e:
+            logging.warning(
+                f"[PDF ENGINE] Extração paralela falhou ({e}). Seguindo sequencialmente.")
+            return self._extract_pages(doc, filepath, 0, total_pages)
 
-    def _extract_with_ocr(self, pdf_path, page_number):
+    @staticmethod
+    def _document_info(metadata, filepath):
+        return {
+            "title": metadata.get('title', os.path.basename(filepath)),
+            "author": metadata.get('author', 'Unknown'),
+            "date": metadata.get('creationDate', date.today().isoformat()),
+            "source_type": "pdf_document",
+            "filename": os.path.basename(filepath)
+        }
+
+    def stream(self, filepath, chunk_pages=8):
         """
-        Fallback: Usa OCR se o PDF for uma imagem escaneada.
+        Versão streaming do parse(): devolve (metadados, gerador de páginas).
+        O gerador entrega (nº da página, texto) de `chunk_pages` em
+        `chunk_pages` páginas (o OCR continua em lote dentro de cada grupo),
+        sem acumular o texto do documento. Devolve None se o PDF não abrir.
         """
+        if not os.path.exists(filepath):
+            logging.error(f"Arquivo não encontrado: {filepath}")
+            return None
+
+        logging.info(f"[PDF ENGINE] Processando (streaming): {os.path.basename(filepath)}")
         try:
-            # Converte APENAS a página atual para imagem (economiza memória)
-            images = convert_from_path(
-                pdf_path, first_page=page_number+1, last_page=page_number+1)
-            if images:
-                # Roda OCR na imagem
-                return pytesseract.image_to_string(images[0], lang=self.ocr_lang)
+            doc = fitz.open(filepath)
         except Exception as e:
-            logging.error(
-                f"[PDF ENGINE] Erro no OCR da página {page_number}: {e}")
-        return ""
+            logging.error(f"[PDF ENGINE] Falha crítica ao abrir PDF: {e}")
+            return None
+
+        def pages():
+            try:
+                for start in range(0, len(doc), chunk_pages):
+                    end = min(start + chunk_pages, len(doc))
+                    yield from self._extract_pages(doc, filepath, start, end)
+            finally:
+                doc.close()
+
+        return self._document_info(doc.metadata, filepath), pages()
 
     def parse(self, filepath):
         if not os.path.exists(filepath):
@@ -61,26 +229,20 @@ class PDFEngine:
         try:
             doc = fitz.open(filepath)
             metadata = doc.metadata
-
             total_pages = len(doc)
 
-            for i, page in enumerate(doc):
-                # 1. Tentativa Rápida (Layout Extraction)
-                text = self._extract_text_with_layout(page)
-
-                # 2. Validação: Se a página tiver menos de 50 caracteres, provavelmente é imagem/escaneada
-                if len(text) < 50:
-                    logging.info(
-                        f"[PDF ENGINE] Pag {i+1}/{total_pages} parece imagem. Ativando OCR...")
-                    text = self._extract_with_ocr(filepath, i)
-
-                if text:
-                    # Adiciona marcador de página para ajudar na depuração
-                    full_content.append(f"--- PAGE {i+1} ---")
-                    full_content.append(text)
+            if self.page_workers > 1 and total_pages >= self.split_min_pages:
+                pages = self._extract_parallel(doc, filepath, total_pages)
+            else:
+                pages = self._extract_pages(doc, filepath, 0, total_pages)
 
             doc.close()
 
+            for page_number, text in pages:
+                # Adiciona marcador de página para ajudar na depuração
+                full_content.append(f"--- PAGE {page_number} ---")
+                full_content.append(text)
+
             raw_text = "\n".join(full_content)
 
             if not raw_text:
@@ -88,14 +250,9 @@ class PDFEngine:
                     f"[PDF ENGINE] Nenhum texto extraído de {filepath} (nem com OCR).")
                 return None
 
-            return {
-                "title": metadata.get('title', os.path.basename(filepath)),
-                "author": metadata.get('author', 'Unknown'),
-                "date": metadata.get('creationDate', date.today().isoformat()),
-                "source_type": "pdf_document",
-                "filename": os.path.basename(filepath),
-                "raw_content": raw_text
-            }
+            result = self._document_info(metadata, filepath)
+            result["raw_content"] = raw_text
+            return result
 
         except Exception as e:
             logging.error(f"[PDF ENGINE] Falha crítica ao abrir PDF: {e}")
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+
+class HostRateLimiter:
+    """
+    Rate limiting por domínio (token bucket no formato GCRA).
+
+    Cada host tem seu próprio balde: no máximo `burst` requisições seguidas e
+    depois uma a cada `interval` segundos, mais um jitter aleatório. Quem
+    espera é só a thread/corrotina que vai acessar aquele host; requisições
+    para outros domínios seguem sem atraso.
+
+    A reserva do horário é feita sob lock e o sono acontece fora dele, então
+    o mesmo limitador serve para fetchers síncronos (acquire) e assíncronos
+    (acquire_async).
+    """
+
+    def __init__(self, interval=2.0, jitter=3.0, burst=1, host_overrides=None):
+        self.interval = interval
+        self.jitter = jitter
+        self.burst = max(1, burst)
+        # {'gov.br': {'min_delay': 5, 'max_delay': 8}} (vale para subdomínios)
+        self.host_overrides = host_overrides or {}
+
+        self._lock = threading.Lock()
+        self._tat = {}            # theoretical arrival time por host
+        self._blocked_until = {}  # Retry-After recebido do servidor
+
+    @classmethod
+    def from_settings(cls, config):
+        """
+        Usa min_delay/max_delay da seção 'scraping' como intervalo por host:
+        intervalo = min_delay, jitter = max_delay - min_delay.
+        """
+        scraping = config.get('scraping', {})
+        min_delay = scraping.get('min_delay', 2)
+        max_delay = scraping.get('max_delay', min_delay)
+        return cls(interval=min_delay,
+                   jitter=max(0, max_delay - min_delay),
+                   burst=scraping.get('burst', 1),
+                   host_overrides=scraping.get('host_delays'))
+
+    @staticmethod
+    def _host(url):
+        return (urlsplit(url).hostname or url).lower()
+
+    def _params(self, host):
+        for domain, cfg in self.host_overrides.items():
+            if host == domain or host.endswith('.' + domain):
+                min_delay = cfg.get('min_delay', self.interval)
+                max_delay = cfg.get('max_delay', min_delay)
+                return min_delay, max(0, max_delay - min_delay)
+        return self.interval, self.jitter
+
+    def _reserve(self, url):
+        """Reserva a próxima vaga do host e devolve quantos segundos esperar."""
+        host = self._host(url)
+        interval, jitter = self._params(host)
+        with self._lock:
+            now = time.monotonic()
+            blocked_until = self._blocked_until.get(host, 0)
+            tat = max(self._tat.get(host, now), now, blocked_until)
+            new_tat = tat + interval
+            self._tat[host] = new_tat
+
+            delay = max(0.0, new_tat - self.burst * interval - now,
+                        blocked_until - now)
+        if delay > 0 and jitter:
+            delay += random.uniform(0, jitter)
+        return host, delay
+
+    def acquire(self, url):
+        host, delay = self._reserve(url)
+        if delay > 0:
+            logging.info(f"Aguardando {delay:.2f} segundos ({host})...")
+            time.sleep(delay)
+
+    async def acquire_async(self, url):
+        host, delay = self._reserve(url)
+        if delay > 0:
+            logging.info(f"Aguardando {delay:.2f} segundos ({host})...")
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def parse_retry_after(value):
+        """Retry-After pode vir em segundos ('120') ou como data HTTP."""
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+    def penalize(self, url, retry_after):
+        """Bloqueia o host pelo tempo pedido no header Retry-After."""
+        seconds = self.parse_retry_after(retry_after)
+        if seconds is None:
+            return
+        host = self._host(url)
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._blocked_until[host] = max(
+                self._blocked_until.get(host, 0), until)
+        logging.warning(
+            f"[RATE] {host} pediu Retry-After de {seconds:.0f}s. Host em espera.")
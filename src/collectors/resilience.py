@@ -0,0 +1,166 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+import requests
+from src.storage.state_store import JSONStateStore
+
+
+class CircuitOpen(requests.exceptions.RequestException):
+    """O domínio está com o circuito aberto: a requisição nem foi enviada."""
+
+
+class RetryPolicy:
+    """
+    Novas tentativas com backoff exponencial (com jitter) para erros
+    transitórios: falhas de conexão, timeouts e respostas 429/5xx.
+    Erros definitivos (404, conteúdo rejeitado) não são repetidos.
+    """
+
+    TRANSIENT_EXCEPTIONS = (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+        requests.exceptions.ChunkedEncodingError,
+    )
+
+    def __init__(self, max_retries=2, backoff_base=1.0, backoff_max=30.0,
+                 retry_statuses=(429, 500, 502, 503, 504)):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = set(retry_statuses)
+
+    @classmethod
+    def from_settings(cls, config):
+        retry = config.get('retry', {})
+        return cls(max_retries=retry.get('max_retries', 2),
+                   backoff_base=retry.get('backoff_base', 1.0),
+                   backoff_max=retry.get('backoff_max', 30.0))
+
+    def delay(self, attempt):
+        # "Full jitter": evita que várias threads voltem ao host no mesmo instante
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def is_transient_error(self, error):
+        return isinstance(error, self.TRANSIENT_EXCEPTIONS)
+
+    def is_transient_status(self, status_code):
+        return status_code in self.retry_statuses
+
+
+class CircuitBreaker:
+    """
+    Disjuntor por domínio.
+
+    closed    -> requisições normais; cada falha transitória soma 1.
+    open      -> após `failure_threshold` falhas seguidas, o host fica
+                 bloqueado por `reset_timeout` segundos (falha imediata).
+    half_open -> passado o tempo, UMA requisição de teste é liberada:
+                 sucesso fecha o circuito, falha reabre; sem veredito
+                 (release), a próxima requisição vira a sonda.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=120):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    @classmethod
+    def from_settings(cls, config):
+        retry = config.get('retry', {})
+        return cls(failure_threshold=retry.get('breaker_threshold', 3),
+                   reset_timeout=retry.get('breaker_reset_seconds', 120))
+
+    @staticmethod
+    def _host(url):
+        return (urlsplit(url).hostname or url).lower()
+
+    def _state(self, host):
+        return self._hosts.setdefault(
+            host, {'state': 'closed', 'failures': 0, 'opened_at': 0.0, 'probing': False})
+
+    def allow(self, url):
+        host = self._host(url)
+        with self._lock:
+            state = self._state(host)
+            if state['state'] == 'closed':
+                return True
+            if state['state'] == 'open':
+                if time.monotonic() - state['opened_at'] < self.reset_timeout:
+                    return False
+                state['state'] = 'half_open'
+                state['probing'] = False
+            # half_open: só uma sonda por vez
+            if state['probing']:
+                return False
+            state['probing'] = True
+            state['probe_thread'] = threading.get_ident()
+            logging.info(f"[BREAKER] Testando {host} novamente (half-open).")
+            return True
+
+    def release(self, url):
+        """
+        A sonda half-open desta thread terminou sem veredito (erro local,
+        exceção inesperada): libera a vaga para a próxima requisição testar.
+        """
+        host = self._host(url)
+        with self._lock:
+            state = self._state(host)
+            if state['probing'] and state.get('probe_thread') == threading.get_ident():
+                state['probing'] = False
+
+    def record_success(self, url):
+        host = self._host(url)
+        with self._lock:
+            state = self._state(host)
+            if state['state'] != 'closed':
+                logging.info(f"[BREAKER] {host} respondeu. Circuito fechado.")
+            state.update(state='closed', failures=0, probing=False)
+
+    def record_failure(self, url):
+        host = self._host(url)
+        with self._lock:
+            state = self._state(host)
+            state['failures'] += 1
+            state['probing'] = False
+            if state['state'] == 'half_open' or state['failures'] >= self.failure_threshold:
+                if state['state'] != 'open':
+                    logging.warning(
+                        f"[BREAKER] {host} falhou {state['failures']}x. "
+                        f"Circuito aberto por {self.reset_timeout}s.")
+                state.update(state='open', opened_at=time.monotonic())
+
+
+class RetryQueue:
+    """
+    URLs que falharam por erro transitório, persistidas para a próxima
+    execução. Depois de `max_attempts` execuções falhando, a URL sai da fila.
+    """
+
+    def __init__(self, path='data/00_state/retry_queue.json', max_attempts=5):
+        self.store = JSONStateStore(path)
+        self.queue = self.store.load()
+        self.max_attempts = max_attempts
+
+    def pending(self):
+        return list(self.queue)
+
+    def add(self, url, reason):
+        entry = self.queue.setdefault(url, {'attempts': 0})
+        entry['attempts'] += 1
+        entry['last_error'] = reason
+        entry['last_attempt'] = datetime.now().isoformat(timespec='seconds')
+        if entry['attempts'] >= self.max_attempts:
+            logging.warning(
+                f"[RETRY] Desistindo de {url} após {entry['attempts']} execuções: {reason}")
+            del self.queue[url]
+
+    def remove(self, url):
+        self.queue.pop(url, None)
+
+    def save(self):
+        self.store.save(self.queue)
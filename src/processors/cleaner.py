@@ -1,152 +1,203 @@
 import re
 import unicodedata
 
+from src.processors.cleaning_rules import CLEANING_RULES, PROFILER, apply_rules, needs_re_fallback
+from src.processors.literal_replacer import LiteralReplacer
+
 
 class TextCleaner:
-    @staticmethod
-    def fix_mojibake(text):
+    """
+    Limpeza do texto de notícias/PDFs para o corpus.
+
+    Todas as regex são compiladas uma única vez, no carregamento da classe;
+    as listas de remoção vêm do config/cleaning_rules.yaml (seção
+    text_cleaner). Elas continuam aplicadas em sequência (juntar tudo numa
+    alternação muda o resultado quando os padrões se sobrepõem), mas cada
+    regra só roda se uma palavra-chave dela aparece no texto. A saída é byte
+    a byte a mesma da versão original (verificado por
+    tests/test_cleaner_golden.py contra uma cópia congelada).
+    """
+
+    # Incrementar ao mudar o código da limpeza (reprocessa os PDFs do
+    # manifesto); as regras têm versão própria no cleaning_rules.yaml
+    VERSION = "1"
+
+    # Caracteres que o re.IGNORECASE iguala a letras das palavras-chave mas o
+    # str.lower() não ('İ', 'ı' ~ i, 'ſ' ~ s). Com eles no texto o pré-filtro
+    # poderia pular um match, então todas as regras rodam.
+    _CASE_EXOTIC = ('\u0130', '\u0131', '\u017f')
+
+    # Tabelas de troca literal (uma passada cada; ver LiteralReplacer), na
+    # ordem de aplicação original
+    _MOJIBAKE = LiteralReplacer({
+        '√°': 'á', '√†': 'à', '√¢': 'â', '√£': 'ã', '√§': 'ä',
+        '√©': 'é', '√®': 'è', '√™': 'ê', '√´': 'ë',
+        '√≠': 'í', '√¨': 'ì', '√Æ': 'î', '√Ø': 'ï',
+        '√≥': 'ó', '√≤': 'ò', '√¥': 'ô', '√µ': 'õ', '√∂': 'ö',
+        '√∫': 'ú', '√π': 'ù', '√ª': 'û', '√º': 'ü',
+        '√ß': 'ç', '√±': 'ñ',
+        '√Å': 'Á', '√Ä': 'À', '√Ç': 'Â', '√É': 'Ã',
+        '√â': 'É', '√à': 'È', '√ä': 'Ê',
+        '√ç': 'Í', '√î': 'Î',
+        '√ì': 'Ó', '√í': 'Ò', '√î': 'Ô', '√ï': 'Õ',
+        '√ö': 'Ú', '√ô': 'Ù', '√õ': 'Û',
+        '√á': 'Ç',
+        '‚Äì': '–', '‚Äî': '—', '‚Äô': "'", '‚Äú': '"', '‚Äù': '"'
+    }.items())
+
+    _STATES = LiteralReplacer((state, f" {state} ") for state in sorted([
+        'ACRE', 'ALAGOAS', 'AMAPÁ', 'AMAZONAS', 'BAHIA', 'CEARÁ',
+        'DISTRITO FEDERAL', 'ESPÍRITO SANTO', 'GOIÁS', 'MARANHÃO',
+        'MATO GROSSO DO SUL', 'MATO GROSSO', 'MINAS GERAIS', 'PARÁ',
+        'PARAÍBA', 'PARANÁ', 'PERNAMBUCO', 'PIAUÍ', 'RIO DE JANEIRO',
+        'RIO GRANDE DO NORTE', 'RIO GRANDE DO SUL', 'RONDÔNIA', 'RORAIMA',
+        'SANTA CATARINA', 'SÃO PAULO', 'SERGIPE', 'TOCANTINS'
+    ], key=len, reverse=True))
+
+    # Em ASCII a categoria C é exatamente 0x00-0x1F e 0x7F
+    _ASCII_CONTROLS = dict.fromkeys([*range(0x20), 0x7f])
+    # Acima disso, um translate único sai mais barato que um replace por controle
+    MAX_CONTROL_REPLACES = 32
+
+    _HTML_TAG = re.compile('<.*?>')
+    # Lookbehind de um caractere virou match consumido ('\1', '\g<0> '): dois
+    # matches nunca disputam o mesmo caractere, e o motor acha o início do
+    # match pela classe em vez de testar o lookbehind em toda posição
+    _THOUSANDS_DOT = re.compile(r'(\d)\.(?=\d)')
+    # Padrões que começam por literal: o motor pula direto para as ocorrências
+    _STICKY_PUNCTUATION = tuple(re.compile(p) for p in (r':(?=[A-Z])', r';(?=[A-Z])', r'\)(?=[A-Z])'))
+    _STICKY_SUFFIXES = CLEANING_RULES.group('text_cleaner', 'sticky_suffixes')
+    _GLUED_YEARS = re.compile(r'(?<=\d{4})(?=\d{4})')
+    _EIGHT_DIGITS = re.compile(r'\d{8}')
+    _MISSING_SPACE = tuple(re.compile(p) for p in (
+        r'[a-z](?=[A-Z])', r'[A-Z](?=[A-Z][a-z])', r'[0-9](?=[A-Za-z])', r'\.(?=[A-Z])'))
+
+    # Listas de remoção: config/cleaning_rules.yaml (seção text_cleaner)
+    _GARBAGE = CLEANING_RULES.group('text_cleaner', 'garbage')
+    _JOURNALISTIC_NOISE = CLEANING_RULES.group('text_cleaner', 'journalistic_noise')
+    _FIGURE_REFERENCES = CLEANING_RULES.group('text_cleaner', 'figure_references')
+    _ACADEMIC_NOISE = CLEANING_RULES.group('text_cleaner', 'academic_noise')
+
+    # re.match de qualquer um dos padrões == re.match da alternação
+    _CITATION_LINE = re.compile(r'^[A-ZÁÉÍÓÚÇ\s]{3,},.*|^\d{4}\.|^Vol\.\s?\d+')
+
+    # \b: o match sempre começa no início da palavra (evita tentar no meio dela)
+    _BROKEN_WORD = re.compile(r'\b(\w+)-\s+(\w+)')
+    _ET_AL = re.compile(r'([a-z])et al\.')
+    _SIDEBAR_BULLET = re.compile(r'(?<=[a-z])\s*[•●-]\s*')
+
+    _FIGURE_LINE = re.compile(r'^(Figura|Tabela|Quadro|Fonte:|Lista dos?|Foto:)\s+', re.IGNORECASE)
+
+    @classmethod
+    def _remove_rules(cls, text, rules):
+        """
+        Aplica as regras em ordem, pulando as que não têm palavra-chave no
+        texto (regra sem `keywords` roda sempre).
+        """
+        if any(ch in text for ch in cls._CASE_EXOTIC) or needs_re_fallback(text, rules):
+            return apply_rules(text, rules, PROFILER)
+
+        profiling = PROFILER.enabled
+        lowered, stale = text.lower(), False
+        for rule in rules:
+            if rule.keywords and not any(k in lowered for k in rule.keywords):
+                if stale:
+                    # Uma remoção anterior pode ter juntado trechos e criado a
+                    # palavra-chave: só então vale refazer a cópia minúscula
+                    lowered, stale = text.lower(), False
+                if not any(k in lowered for k in rule.keywords):
+                    if profiling:
+                        PROFILER.skip(rule)
+                    continue
+            if profiling:
+                text, count = PROFILER.sub(rule, text)
+            else:
+                text, count = rule.pattern.subn(rule.repl, text)
+            stale = stale or bool(count)
+        return text
+
+    @classmethod
+    def fix_mojibake(cls, text):
         """
         [NOVO] Corrige caracteres corrompidos (UTF-8 interpretado como MacRoman).
         Ex: converte '√°' de volta para 'á', '√£' para 'ã'.
         """
-        replacements = {
-            '√°': 'á', '√†': 'à', '√¢': 'â', '√£': 'ã', '√§': 'ä',
-            '√©': 'é', '√®': 'è', '√™': 'ê', '√´': 'ë',
-            '√≠': 'í', '√¨': 'ì', '√Æ': 'î', '√Ø': 'ï',
-            '√≥': 'ó', '√≤': 'ò', '√¥': 'ô', '√µ': 'õ', '√∂': 'ö',
-            '√∫': 'ú', '√π': 'ù', '√ª': 'û', '√º': 'ü',
-            '√ß': 'ç', '√±': 'ñ',
-            '√Å': 'Á', '√Ä': 'À', '√Ç': 'Â', '√É': 'Ã',
-            '√â': 'É', '√à': 'È', '√ä': 'Ê',
-            '√ç': 'Í', '√î': 'Î',
-            '√ì': 'Ó', '√í': 'Ò', '√î': 'Ô', '√ï': 'Õ',
-            '√ö': 'Ú', '√ô': 'Ù', '√õ': 'Û',
-            '√á': 'Ç',
-            '‚Äì': '–', '‚Äî': '—', '‚Äô': "'", '‚Äú': '"', '‚Äù': '"'
-        }
-        for bad, good in replacements.items():
-            text = text.replace(bad, good)
+        return cls._MOJIBAKE.replace(text)
+
+    @classmethod
+    def remove_control_characters(cls, text):
+        # Sem nenhum caractere das categorias C/Z (fora o espaço): nada a remover
+        if text.isprintable():
+            return text
+        if text.isascii():
+            return text.translate(cls._ASCII_CONTROLS)
+        # Só os caracteres distintos passam pelo unicodedata; os de categoria
+        # C saem com str.replace (busca em C, sem laço Python por caractere)
+        controls = [ch for ch in set(text) if unicodedata.category(ch)[0] == "C"]
+        if len(controls) > cls.MAX_CONTROL_REPLACES:
+            # Lixo binário com muitos controles distintos: uma passada só
+            return text.translate(dict.fromkeys(map(ord, controls)))
+        for ch in controls:
+            text = text.replace(ch, "")
         return text
 
-    @staticmethod
-    def remove_control_characters(text):
-        return "".join(ch for ch in text if unicodedata.category(ch)[0] != "C")
+    @classmethod
+    def remove_html_tags(cls, text):
+        return cls._HTML_TAG.sub('', text)
 
-    @staticmethod
-    def remove_html_tags(text):
-        clean = re.compile('<.*?>')
-        return re.sub(clean, '', text)
+    @classmethod
+    def normalize_numbers(cls, text):
+        return cls._THOUSANDS_DOT.sub(r'\1', text)
 
-    @staticmethod
-    def normalize_numbers(text):
-        return re.sub(r'(?<=\d)\.(?=\d)', '', text)
-
-    @staticmethod
-    def fix_sticky_punctuation(text):
-        text = re.sub(r':(?=[A-Z])', ': ', text)
-        text = re.sub(r';(?=[A-Z])', '; ', text)
-        text = re.sub(r'\)(?=[A-Z])', ') ', text)
+    @classmethod
+    def fix_sticky_punctuation(cls, text):
+        for pattern in cls._STICKY_PUNCTUATION:
+            text = pattern.sub(r'\g<0> ', text)
         return text
 
-    @staticmethod
-    def separate_brazilian_states(text):
-        states = [
-            'ACRE', 'ALAGOAS', 'AMAPÁ', 'AMAZONAS', 'BAHIA', 'CEARÁ',
-            'DISTRITO FEDERAL', 'ESPÍRITO SANTO', 'GOIÁS', 'MARANHÃO',
-            'MATO GROSSO DO SUL', 'MATO GROSSO', 'MINAS GERAIS', 'PARÁ',
-            'PARAÍBA', 'PARANÁ', 'PERNAMBUCO', 'PIAUÍ', 'RIO DE JANEIRO',
-            'RIO GRANDE DO NORTE', 'RIO GRANDE DO SUL', 'RONDÔNIA', 'RORAIMA',
-            'SANTA CATARINA', 'SÃO PAULO', 'SERGIPE', 'TOCANTINS'
-        ]
-        states.sort(key=len, reverse=True)
-        for state in states:
-            if state in text:
-                text = text.replace(state, f" {state} ")
-        return text
+    @classmethod
+    def separate_brazilian_states(cls, text):
+        return cls._STATES.replace(text)
 
-    @staticmethod
-    def clean_sticky_suffixes(text):
-        text = re.sub(r'(?<=\w)print\b', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'(?<=\w)info\b', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'(?<=\d{4})(?=\d{4})', ' ', text)
+    @classmethod
+    def clean_sticky_suffixes(cls, text):
+        text = cls._remove_rules(text, cls._STICKY_SUFFIXES)
+        # Anos colados exigem 8 dígitos seguidos: sem isso a regex nem roda
+        if cls._EIGHT_DIGITS.search(text):
+            text = cls._GLUED_YEARS.sub(' ', text)
         return text
 
-    @staticmethod
-    def inject_missing_spaces(text):
-        text = re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', text)
-        text = re.sub(r'(?<=[A-Z])(?=[A-Z][a-z])', ' ', text)
-        text = re.sub(r'(?<=[0-9])(?=[A-Za-z])', ' ', text)
-        text = re.sub(r'\.(?=[A-Z])', '. ', text)
+    @classmethod
+    def inject_missing_spaces(cls, text):
+        for pattern in cls._MISSING_SPACE:
+            text = pattern.sub(r'\g<0> ', text)
         return text
 
-    @staticmethod
-    def remove_garbage_lines(text):
-        garbage_patterns = [
-            r"ipam_amazonia.*", r"IPAMamazonia.*", r"ipam\.org\.br.*",
-            r"otnemuA", r"oãçudeR", r"Sugestão de referência.*",
-            r"NOTA TÉCNICA.*", r"--- PAGE .* ---",
-            r"http\S+", r"www\.\S+",
-            r"Ouça este conteúdo", r"VEJA TAMBÉM",
-            r"Notícias\s*MEIO\s*AMBIENTE", r"Por\s+WWF-Brasil",
-            r'^[a-zç]+,\s+\d+\s+\d+',
-            r"Brigadistas do Ibama.*?Amazonas",
-            r"- •",
-            r"Terra Brasilis Queimadas[\s\S]*?clicando nesta caixa\.?",
-            r"Sobre Terra Brasillis[\s\S]*?Não mostrar novamente\.?",
-            r"Terra Brasilis\|",
-            # [NOVO] Filtros baseados no seu feedback
-            r"^vide linha \d+.*",     # Remove "vide linha 13"
-            r"^viAcessar material.*",  # Remove "viAcessar" (erro de OCR)
-            r"Acesse o site.*",
-            r"Clique aqui.*"
-        ]
-        for pat in garbage_patterns:
-            text = re.sub(pat, "", text, flags=re.IGNORECASE | re.MULTILINE)
-        return text
+    @classmethod
+    def remove_garbage_lines(cls, text):
+        return cls._remove_rules(text, cls._GARBAGE)
 
-    @staticmethod
-    def remove_journalistic_noise(text):
-        dash_pattern = r'(?:-|–|—)'
-        patterns = [
-            rf'{dash_pattern}\s*Foto:\s*MapBiomas\s*',
-            rf'{dash_pattern}?\s*Arte\s*g1',
-            r'/\s*File\s*Photo', r'/\s*Reuters',
-            rf'{dash_pattern}\s*Foto:\s*(?:[A-Z][\w\-/]+\s*)+(?=(\s[A-Z]|\.|\n|$))',
-            r'^Foto:.*', r'^Fonte:.*'
-        ]
-        for pat in patterns:
-            text = re.sub(pat, "", text, flags=re.IGNORECASE | re.MULTILINE)
-        return text
+    @classmethod
+    def remove_journalistic_noise(cls, text):
+        return cls._remove_rules(text, cls._JOURNALISTIC_NOISE)
 
-    @staticmethod
-    def remove_figure_references(text):
-        text = re.sub(
-            r'\s*\(\s*(ver|vide)?\s*(Figura|Fig\.|Tabela|Tab\.|Quadro|Gráfico|Anexo)\s+[\w\d\.]+\s*\)\.?', "", text, flags=re.IGNORECASE)
-        patterns_loose = [r'Figura\s+\d+\.?',
-                          r'Tabela\s+\d+\.?', r'Quadro\s+\d+\.?']
-        for pat in patterns_loose:
-            text = re.sub(pat, "", text, flags=re.IGNORECASE)
-        return text
+    @classmethod
+    def remove_figure_references(cls, text):
+        return cls._remove_rules(text, cls._FIGURE_REFERENCES)
 
-    @staticmethod
-    def clean_citations(text):
-        patterns = [r'^[A-ZÁÉÍÓÚÇ\s]{3,},.*', r'^\d{4}\.', r'^Vol\.\s?\d+']
+    @classmethod
+    def clean_citations(cls, text):
         lines = text.split('\n')
-        clean_lines = [l for l in lines if not any(
-            re.match(p, l.strip()) for p in patterns)]
+        clean_lines = [l for l in lines if not cls._CITATION_LINE.match(l.strip())]
         return "\n".join(clean_lines)
 
-    @staticmethod
-    def remove_academic_noise(text):
-        patterns = [r"Disponível em:.*", r"Acesso em:.*",
-                    r"SUMÁRIO \d+\.", r"REFERÊNCIAS.*", r"INTRODUÇÃO \.*"]
-        for pat in patterns:
-            text = re.sub(pat, "", text, flags=re.IGNORECASE)
-        return text
+    @classmethod
+    def remove_academic_noise(cls, text):
+        return cls._remove_rules(text, cls._ACADEMIC_NOISE)
 
-    @staticmethod
-    def fix_broken_words(text):
-        return re.sub(r'(\w+)-\s+(\w+)', r'\1\2', text)
+    @classmethod
+    def fix_broken_words(cls, text):
+        return cls._BROKEN_WORD.sub(r'\1\2', text)
 
     @staticmethod
     def normalize_unicode(text):
@@ -157,25 +208,26 @@ class TextCleaner:
         text = text.replace('\n', ' ')
         return " ".join(text.split())
 
-    @staticmethod
-    def repair_malformed_citations(text):
-        text = re.sub(r'(?<=[a-z])et al\.', ' et al.', text)
-        return text
+    @classmethod
+    def repair_malformed_citations(cls, text):
+        if 'et al.' not in text:
+            return text
+        return cls._ET_AL.sub(r'\1 et al.', text)
 
-    @staticmethod
-    def remove_sidebar_intrusions(text):
-        text = re.sub(r'(?<=[a-z])\s*[•●-]\s*', '. ', text)
+    @classmethod
+    def remove_sidebar_intrusions(cls, text):
+        text = cls._SIDEBAR_BULLET.sub('. ', text)
         text = text.replace('•', '').replace('●', '')
         return text
 
-    @staticmethod
-    def is_narrative_text(line):
+    @classmethod
+    def is_narrative_text(cls, line):
         line = line.strip()
         if not line:
             return False
 
         # Filtros de exclusão
-        if re.match(r'^(Figura|Tabela|Quadro|Fonte:|Lista dos?|Foto:)\s+', line, re.IGNORECASE):
+        if cls._FIGURE_LINE.match(line):
             return False
 
         # Filtro de Mojibake grave (se tiver muitos √, deleta a linha)
@@ -0,0 +1,440 @@
+import functools
+import json
+import logging
+import os
+import re
+import signal
+import sys
+import threading
+import time
+
+import yaml
+
+try:
+    # Opcional (pip install google-re2): motor de tempo linear, sem backtracking
+    import re2
+except ImportError:
+    re2 = None
+
+# Relativo à raiz do projeto: as regras são carregadas na importação dos
+# cleaners, que também acontece fora da raiz (benchmarks, workers)
+DEFAULT_RULES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'config', 'cleaning_rules.yaml')
+
+
+_RE2_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'))
+
+# Letras que o re.IGNORECASE iguala a i/I e o RE2 não ('İ', 'ı'; conferido
+# por benchmarks/bench_regex_engine.py). Com elas no texto, ou com surrogates
+# soltos (o RE2 só aceita UTF-8 válido), as regras rodam no re.
+RE2_CASE_EXOTIC = ('\u0130', '\u0131')
+_RE2_UNSAFE = re.compile('[%s\ud800-\udfff]' % ''.join(RE2_CASE_EXOTIC))
+
+
+@functools.lru_cache(maxsize=None)
+def _re2_class(letter):
+    """
+    Conteúdo de classe do RE2 com exatamente os code points que \\s, \\d ou
+    \\w casam no re. No RE2 elas são só ASCII, e o \\p{..} dele segue uma
+    versão do Unicode diferente da do Python: a lista sai do próprio re.
+    """
+    everything = ''.join(chr(cp) for cp in range(sys.maxunicode + 1)
+                         if not 0xd800 <= cp <= 0xdfff)
+    ranges, start, last = [], None, None
+    for cp in map(ord, re.findall('\\' + letter, everything)):
+        if last is not None and cp == last + 1:
+            last = cp
+            continue
+        if start is not None:
+            ranges.append((start, last))
+        start = last = cp
+    ranges.append((start, last))
+    return ''.join(f"\\x{{{a:x}}}" if a == b else f"\\x{{{a:x}}}-\\x{{{b:x}}}"
+                   for a, b in ranges)
+
+
+def re2_source(source, flags):
+    r"""
+    Traduz um padrão do re para a sintaxe do RE2 com o mesmo significado, ou
+    None se não houver tradução fiel (\b e \B do RE2 são só ASCII; o $ sem
+    MULTILINE do re também casa antes do '\n' final). Lookarounds e
+    referências para trás passam adiante e o RE2 recusa ao compilar.
+    """
+    if flags & ~(re.IGNORECASE | re.MULTILINE | re.DOTALL | re.UNICODE):
+        return None
+    # Qualquer caractere (idiomático nas regras de bloco)
+    source = source.replace(r'[\s\S]', '(?s:.)')
+    out, i, in_class = [], 0, False
+    while i < len(source):
+        ch = source[i]
+        if ch == '\\' and i + 1 < len(source):
+            esc = source[i + 1]
+            i += 2
+            if esc in 'bB':
+                return None
+            if esc == 'Z':
+                out.append(r'\z')
+            elif esc in 'sSdDwW':
+                members = _re2_class(esc.lower())
+                if in_class:
+                    if esc.isupper():
+                        return None
+                    out.append(members)
+                else:
+                    out.append(f"[{'^' if esc.isupper() else ''}{members}]")
+            else:
+                out.append('\\' + esc)
+            continue
+        if in_class:
+            if ch == ']':
+                in_class = False
+        elif ch == '[':
+            in_class = True
+            out.append(ch)
+            i += 1
+            # '^' e um ']' logo no início fazem parte da classe
+            if source.startswith('^', i):
+                out.append('^')
+                i += 1
+            if source.startswith(']', i):
+                out.append(r'\]')
+                i += 1
+            continue
+        elif ch == '$' and not flags & re.MULTILINE:
+            return None
+        out.append(ch)
+        i += 1
+    inline = ''.join(letter for flag, letter in _RE2_FLAGS if flags & flag)
+    return (f"(?{inline})" if inline else '') + ''.join(out)
+
+
+class Rule:
+    """
+    Uma regra já compilada: `name` é 'seção.grupo[i]' (chave do perfil).
+    `pattern` é o padrão em uso (re ou RE2); `re_pattern`, sempre o do re.
+    """
+
+    __slots__ = ('name', 'pattern', 're_pattern', 'engine', 'repl', 'keywords')
+
+    def __init__(self, name, pattern, repl="", keywords=()):
+        self.name = name
+        self.pattern = self.re_pattern = pattern
+        self.engine = 're'
+        self.repl = repl
+        self.keywords = keywords
+
+    def use_re2(self, options):
+        """Passa a regra para o RE2, se ela tiver tradução fiel. Devolve se passou."""
+        source = re2_source(self.re_pattern.pattern, self.re_pattern.flags)
+        if source is None:
+            return False
+        try:
+            self.pattern = re2.compile(source, options)
+        except re2.error:
+            return False  # lookaround, referência para trás...
+        self.engine = 're2'
+        return True
+
+    def use_re(self):
+        self.pattern, self.engine = self.re_pattern, 're'
+
+    def __repr__(self):
+        return f"Rule({self.name}: {self.re_pattern.pattern!r})"
+
+
+def needs_re_fallback(text, rules):
+    """Há regras no RE2 e o texto tem caracteres que elas não tratam igual ao re?"""
+    return (any(rule.engine == 're2' for rule in rules)
+            and _RE2_UNSAFE.search(text) is not None)
+
+
+class RuleSet:
+    """
+    Regras de limpeza lidas do config/cleaning_rules.yaml e compiladas uma
+    única vez. `version` (declarada no arquivo) entra na versão do pipeline
+    dos caches/manifestos que dependem do texto limpo.
+    """
+
+    def __init__(self, version, sections, path=None):
+        self.version = version
+        self.sections = sections
+        self.path = path
+        self.engine = 're'
+
+    @staticmethod
+    def _flags(names, where):
+        flags = 0
+        for name in names or []:
+            flag = getattr(re, str(name).upper(), None)
+            if not isinstance(flag, re.RegexFlag):
+                raise ValueError(f"[RULES] Flag de regex desconhecida '{name}' em {where}")
+            flags |= flag
+        return flags
+
+    @classmethod
+    def _compile_group(cls, section, group, spec, default_flags):
+        where = f"{section}.{group}"
+        if isinstance(spec, dict):
+            flags = cls._flags(spec['flags'], where) if 'flags' in spec else default_flags
+            spec = spec.get('rules', [])
+        else:
+            flags = default_flags
+
+        rules = []
+        for i, item in enumerate(spec):
+            name = f"{where}[{i}]"
+            try:
+                pattern = re.compile(item['pattern'], flags)
+            except (KeyError, TypeError, re.error) as e:
+                raise ValueError(f"[RULES] Regra inválida {name}: {e}") from e
+            keywords = tuple(k.lower() for k in item.get('keywords', ()))
+            rules.append(Rule(name, pattern, item.get('repl', ''), keywords))
+        return tuple(rules)
+
+    @classmethod
+    def from_dict(cls, data, path=None):
+        if 'version' not in data:
+            raise ValueError(f"[RULES] {path or 'regras'} sem o campo 'version'")
+        sections = {}
+        for section, groups in data.items():
+            if section == 'version':
+                continue
+            groups = dict(groups)
+            default_flags = cls._flags(groups.pop('flags', []), section)
+            sections[section] = {
+                group: cls._compile_group(section, group, spec, default_flags)
+                for group, spec in groups.items()}
+        return cls(str(data['version']), sections, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_RULES_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(yaml.safe_load(f) or {}, path)
+
+    def section(self, name):
+        return self.sections[name]
+
+    def group(self, section, name):
+        return self.sections[section][name]
+
+    def rules(self):
+        for groups in self.sections.values():
+            for rules in groups.values():
+                yield from rules
+
+    def use_engine(self, engine='re'):
+        """
+        Troca o motor das regras, no lugar (os cleaners guardam as mesmas
+        instâncias de Rule). Com 're2', cada regra com tradução fiel passa
+        para o RE2 (tempo linear: sem backtracking catastrófico em texto de
+        OCR malformado); as demais (lookarounds, \\b, ...) ficam no re.
+        """
+        if engine == self.engine:
+            return
+        if engine not in ('re', 're2'):
+            raise ValueError(f"[RULES] Motor de regex desconhecido: '{engine}' (use re ou re2)")
+        if engine == 're2' and re2 is None:
+            logging.warning("[RULES] Motor 're2' pedido, mas o google-re2 não está instalado. Usando re.")
+            return
+
+        rules = list(self.rules())
+        if engine == 're':
+            for rule in rules:
+                rule.use_re()
+        else:
+            options = re2.Options()
+            options.log_errors = False
+            kept = [rule.name for rule in rules if not rule.use_re2(options)]
+            logging.info(f"[RULES] Motor re2: {len(rules) - len(kept)} regras no RE2, "
+                         f"{len(kept)} no re (sem tradução fiel): {', '.join(kept)}")
+        self.engine = engine
+
+
+class RuleProfiler:
+    """
+    Perfil opcional das regras: por regra, quantas vezes rodou, quantas foi
+    pulada pelo pré-filtro de palavras-chave, quantos matches, quantos
+    caracteres removeu e o tempo acumulado. Desligado, não custa nada além
+    de um `if` por grupo de regras.
+
+    Em lote (processos), cada worker devolve o seu perfil com drain() e o
+    processo pai junta com merge() antes de gravar o relatório.
+    """
+
+    FIELDS = ('calls', 'skipped', 'matches', 'chars_removed', 'seconds')
+
+    def __init__(self):
+        self.enabled = False
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def _entry(self, name):
+        entry = self._stats.get(name)
+        if entry is None:
+            entry = self._stats[name] = dict.fromkeys(self.FIELDS, 0)
+        return entry
+
+    def skip(self, rule):
+        with self._lock:
+            self._entry(rule.name)['skipped'] += 1
+
+    def sub(self, rule, text, pattern=None):
+        """subn da regra (ou de `pattern`, a versão re dela), cronometrado e contabilizado."""
+        start = time.perf_counter()
+        result, count = (pattern or rule.pattern).subn(rule.repl, text)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            entry = self._entry(rule.name)
+            entry['calls'] += 1
+            entry['matches'] += count
+            entry['chars_removed'] += len(text) - len(result)
+            entry['seconds'] += elapsed
+        return result, count
+
+    def search(self, rule, text, pattern=None):
+        """finditer da regra (regras só de busca, como os marcadores de fim)."""
+        start = time.perf_counter()
+        matches = list((pattern or rule.pattern).finditer(text))
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            entry = self._entry(rule.name)
+            entry['calls'] += 1
+            entry['matches'] += len(matches)
+            entry['seconds'] += elapsed
+        return matches
+
+    def drain(self):
+        """Devolve o perfil acumulado e zera (usado pelos workers do lote)."""
+        with self._lock:
+            stats, self._stats = self._stats, {}
+        return stats
+
+    def merge(self, stats):
+        with self._lock:
+            for name, values in (stats or {}).items():
+                entry = self._entry(name)
+                for field in self.FIELDS:
+                    entry[field] += values.get(field, 0)
+
+    def report(self, ruleset, path):
+        """
+        Grava o relatório JSON (regras mais caras primeiro; as que nunca deram
+        match também aparecem) e loga um resumo. Devolve as linhas do relatório.
+        """
+        with self._lock:
+            stats = {name: dict(values) for name, values in self._stats.items()}
+
+        rows = []
+        for rule in ruleset.rules():
+            values = stats.get(rule.name, dict.fromkeys(self.FIELDS, 0))
+            rows.append({'rule': rule.name, 'pattern': rule.re_pattern.pattern,
+                         'engine': rule.engine, **values})
+        rows.sort(key=lambda row: -row['seconds'])
+        never = [row['rule'] for row in rows if row['calls'] and not row['matches']]
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': ruleset.version, 'rules': rows, 'never_matched': never},
+                      f, ensure_ascii=False, indent=2)
+
+        total = sum(row['seconds'] for row in rows)
+        logging.info(f"[RULES] Perfil das regras (v{ruleset.version}) em {path}: "
+                     f"{total:.2f}s no total, {len(never)} regras sem nenhum match.")
+        for row in rows[:10]:
+            logging.info(f"[RULES]   {row['seconds']:7.3f}s | {row['matches']:6} matches | "
+                         f"{row['chars_removed']:8} chars | {row['rule']}")
+        return rows
+
+
+def apply_rules(text, rules, profiler=None):
+    """Aplica as regras (sub) em ordem; com o perfilador ligado, mede cada uma."""
+    # As remoções não criam caracteres novos: basta olhar o texto uma vez
+    attr = 're_pattern' if needs_re_fallback(text, rules) else 'pattern'
+    if profiler is not None and profiler.enabled:
+        for rule in rules:
+            text, _ = profiler.sub(rule, text, getattr(rule, attr))
+        return text
+    for rule in rules:
+        text = getattr(rule, attr).sub(rule.repl, text)
+    return text
+
+
+class CleaningTimeout(Exception):
+    """A limpeza de um documento estourou o orçamento de tempo."""
+
+
+class CleaningBudget:
+    """
+    Orçamento de tempo da limpeza de UM documento (cleaning.time_budget_s,
+    mais time_budget_s_per_mb por milhão de caracteres liberados com
+    allow()). Cada `with budget:` arma um SIGALRM com o tempo que resta e
+    desconta o que gastou ao sair; estourado, a regex em andamento é
+    interrompida com CleaningTimeout e o documento vai para a quarentena,
+    em vez de travar o worker.
+
+    Sem SIGALRM (Windows, threads secundárias) o orçamento só é conferido
+    ao fim de cada bloco. `seconds` 0/None desliga.
+    """
+
+    def __init__(self, seconds=None, per_mb=0.0):
+        self.remaining = seconds or None
+        self.per_mb = per_mb
+        self._depth = 0
+        self._started = None
+        self._previous_handler = None
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Um orçamento novo por documento (seção `cleaning` do settings.yaml)."""
+        cfg = settings.get('cleaning', {})
+        return cls(cfg.get('time_budget_s', 0), cfg.get('time_budget_s_per_mb', 0.0))
+
+    def allow(self, text):
+        """Libera tempo proporcional ao tamanho do texto que vai ser limpo."""
+        if self.remaining is not None and text:
+            self.remaining += self.per_mb * len(text) / 1e6
+        return self
+
+    @staticmethod
+    def _can_alarm():
+        return (hasattr(signal, 'setitimer')
+                and threading.current_thread() is threading.main_thread())
+
+    def _expire(self, signum, frame):
+        raise CleaningTimeout("orçamento de tempo da limpeza esgotado")
+
+    def __enter__(self):
+        self._depth += 1
+        if self.remaining is None or self._depth > 1:
+            return self
+        if self.remaining <= 0:
+            self._depth -= 1
+            raise CleaningTimeout("orçamento de tempo da limpeza esgotado")
+        if self._can_alarm():
+            self._previous_handler = signal.signal(signal.SIGALRM, self._expire)
+            signal.setitimer(signal.ITIMER_REAL, self.remaining)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        if self._started is None or self._depth:
+            return False
+        if self._previous_handler is not None:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self._previous_handler)
+            self._previous_handler = None
+        self.remaining -= time.perf_counter() - self._started
+        self._started = None
+        if exc_type is None and self.remaining <= 0:
+            raise CleaningTimeout("orçamento de tempo da limpeza esgotado")
+        return False
+
+
+# Carregadas uma vez por processo, na importação dos cleaners
+CLEANING_RULES = RuleSet.load()
+PROFILER = RuleProfiler()
@@ -53,10 +53,11 @@ class CorpusCompiler:
             filepath = os.path.join(input_dir, filename)
             try:
                 with open(filepath, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
+                    # Mojibake corrigido no arquivo inteiro (uma passada só);
+                    # as trocas nunca atravessam quebras de linha
+                    lines = TextCleaner.fix_mojibake(f.read()).split('\n')
                     for line in lines:
                         clean_line = line.strip()
-                        clean_line = TextCleaner.fix_mojibake(clean_line)
                         if "vide linha" in clean_line.lower():
                             continue
                         if len(clean_line) < 20:
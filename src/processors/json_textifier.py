@@ -0,0 +1,59 @@
+class JSONTextifier:
+    """
+    Converte as respostas JSON capturadas dos dashboards em frases simples,
+    para que os números entrem no corpus exatamente como a API os entregou
+    (em vez do texto achatado do inner_text).
+
+    Cada registro vira uma linha "campo: valor; campo: valor." e estruturas
+    aninhadas carregam o caminho das chaves como prefixo.
+    """
+
+    MAX_RECORDS = 2000
+
+    @staticmethod
+    def _is_scalar(value):
+        return value is None or isinstance(value, (str, int, float, bool))
+
+    @staticmethod
+    def _format_value(value):
+        if isinstance(value, float):
+            return f"{value:.2f}".rstrip('0').rstrip('.')
+        return str(value).strip()
+
+    @classmethod
+    def _record_line(cls, record, prefix):
+        parts = [f"{key}: {cls._format_value(value)}"
+                 for key, value in record.items()
+                 if cls._is_scalar(value) and value not in (None, '')]
+        if not parts:
+            return None
+        line = "; ".join(parts)
+        return f"{prefix} - {line}." if prefix else f"{line}."
+
+    @classmethod
+    def _walk(cls, node, prefix, lines):
+        if len(lines) >= cls.MAX_RECORDS:
+            return
+        if isinstance(node, dict):
+            line = cls._record_line(node, prefix)
+            if line:
+                lines.append(line)
+            for key, value in node.items():
+                if not cls._is_scalar(value):
+                    cls._walk(value, f"{prefix} {key}".strip(), lines)
+        elif isinstance(node, list):
+            scalars = [cls._format_value(v) for v in node if cls._is_scalar(v) and v is not None]
+            if scalars and len(scalars) == len(node):
+                lines.append(f"{prefix}: {', '.join(scalars)}." if prefix
+                             else f"{', '.join(scalars)}.")
+                return
+            for item in node:
+                cls._walk(item, prefix, lines)
+
+    @classmethod
+    def to_text(cls, captures):
+        """`captures`: lista de {'url': ..., 'data': <json>} do DynamicScraper."""
+        lines = []
+        for capture in captures:
+            cls._walk(capture.get('data'), '', lines)
+        return "\n".join(lines[:cls.MAX_RECORDS])
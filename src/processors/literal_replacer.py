@@ -0,0 +1,64 @@
+import re
+
+
+class LiteralReplacer:
+    """
+    Troca várias strings literais numa passada só, com o mesmo resultado da
+    sequência original de `text = text.replace(old, new)` na ordem da tabela
+    (inclusive quando uma troca cria ocorrência para uma regra seguinte ou
+    quando as chaves se sobrepõem).
+
+    Uma alternação compilada das chaves localiza os trechos afetados. Uma
+    chave só usa caracteres do "alfabeto" das chaves, então as trocas nunca
+    atravessam um caractere fora dele: cada trecho contínuo de caracteres do
+    alfabeto que contém alguma chave é resolvido sozinho, com a sequência
+    original de replace, e memorizado (os trechos se repetem muito: '√°',
+    ' PARÁ ', ...). O resto do texto é copiado.
+
+    Vale a pena para tabelas longas (dezenas de chaves). Para poucas trocas
+    de um caractere, str.replace em sequência continua mais rápido.
+    """
+
+    def __init__(self, table, cache_size=4096):
+        self.table = tuple(table)
+        olds = [old for old, _ in self.table]
+        self._alphabet = frozenset("".join(olds))
+        # Mais longas primeiro: ao achar um trecho, a ordem não muda o
+        # resultado (ele é refeito pela sequência original), só evita
+        # tentativas parciais
+        self._pattern = re.compile("|".join(
+            re.escape(old) for old in sorted(set(olds), key=len, reverse=True)))
+        alphabet_class = "".join(re.escape(ch) for ch in sorted(self._alphabet))
+        self._run_end = re.compile(f"[{alphabet_class}]*")
+        self._cache = {}
+        self._cache_size = cache_size
+
+    def _replace_sequential(self, segment):
+        for old, new in self.table:
+            if old in segment:
+                segment = segment.replace(old, new)
+        return segment
+
+    def replace(self, text):
+        pieces, last = [], 0
+        for match in self._pattern.finditer(text):
+            if match.start() < last:
+                continue  # dentro de um trecho já resolvido
+            start = match.start()
+            while start > last and text[start - 1] in self._alphabet:
+                start -= 1
+            end = self._run_end.match(text, match.end()).end()
+            segment = text[start:end]
+            replaced = self._cache.get(segment)
+            if replaced is None:
+                if len(self._cache) >= self._cache_size:
+                    self._cache.clear()
+                replaced = self._cache[segment] = self._replace_sequential(segment)
+            pieces.append(text[last:start])
+            pieces.append(replaced)
+            last = end
+
+        if not pieces:
+            return text
+        pieces.append(text[last:])
+        return "".join(pieces)
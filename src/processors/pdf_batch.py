@@ -0,0 +1,170 @@
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from src.processors.cleaning_rules import CLEANING_RULES, PROFILER, CleaningBudget, CleaningTimeout
+
+# Ferramentas criadas UMA vez por processo worker (no initializer)
+_worker = {}
+
+
+class _WorkerTag(logging.Filter):
+    """Prefixa as mensagens com o PID para identificar o worker no log do pai."""
+
+    def filter(self, record):
+        record.msg = f"[worker {os.getpid()}] {record.msg}"
+        return True
+
+
+def _init_worker(log_queue, language, profile_rules=False):
+    # Todo log do worker vai para a fila; o processo pai é quem escreve
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.handlers[0].addFilter(_WorkerTag())
+    root.setLevel(logging.INFO)
+
+    from src.collectors.http_client import load_settings
+    from src.collectors.pdf_engine import PDFEngine
+    from src.processors.pdf_cleaner import PDFCleaner
+    from src.processors.tokenizer import NLTKTokenizer
+    settings = load_settings('config/settings.yaml')
+    PROFILER.enable(profile_rules)
+    CLEANING_RULES.use_engine(settings.get('cleaning', {}).get('regex_engine', 're'))
+    # O pool já ocupa os núcleos (--workers): páginas e OCR em série dentro do
+    # worker, senão N workers x pdf.page_workers processos x pdf.ocr_workers threads
+    engine = PDFEngine.from_settings(settings)
+    engine.page_workers = engine.ocr_workers = 1
+    _worker['engine'] = engine
+    _worker['settings'] = settings
+    _worker['cleaner'] = PDFCleaner()
+    _worker['tokenizer'] = NLTKTokenizer(language=language)
+
+
+def process_pdf_document(filepath):
+    """
+    Job completo de um documento: parse -> limpeza -> sentenças.
+    Roda dentro do worker; a gravação fica com o processo pai.
+    """
+    timings = {}
+    start = time.perf_counter()
+    engine = _worker['engine']
+    ocr_failed = engine.stats['ocr_failed']
+    raw_data = engine.parse(filepath)
+    timings['parse'] = time.perf_counter() - start
+
+    sentences, quarantined = [], None
+    if raw_data:
+        step = time.perf_counter()
+        # Um documento patológico estoura o orçamento em vez de prender o worker
+        budget = CleaningBudget.from_settings(_worker['settings'])
+        try:
+            with budget.allow(raw_data['raw_content']):
+                clean_text = _worker['cleaner'].process(raw_data['raw_content'])
+        except CleaningTimeout as e:
+            clean_text, quarantined = None, str(e)
+        timings['clean'] = time.perf_counter() - step
+
+        if clean_text is not None:
+            step = time.perf_counter()
+            sentences = _worker['tokenizer'].tokenize_sentences(clean_text)
+            timings['tokenize'] = time.perf_counter() - step
+
+    timings['total'] = time.perf_counter() - start
+    return {
+        "filepath": filepath,
+        "raw_data": raw_data,
+        "sentences": sentences,
+        "timings": timings,
+        # Perfil das regras deste documento (o pai soma os de todos)
+        "rule_profile": PROFILER.drain() if PROFILER.enabled else {},
+        "quarantined": quarantined,
+        # Páginas em que o OCR falhou (o manifesto manda refazer o documento)
+        "ocr_failed_pages": engine.stats['ocr_failed'] - ocr_failed,
+        "error": None
+    }
+
+
+class PDFBatchProcessor:
+    """
+    Modo PDF em paralelo: cada documento inteiro (parse + limpeza +
+    tokenização) vai para um processo do pool, já que PyMuPDF, Tesseract e
+    as regex da limpeza são CPU-bound e o GIL impede ganho com threads.
+
+    - Um processo por documento: dentro do worker, páginas e OCR rodam em
+      série (pdf.page_workers e pdf.ocr_workers valem só no modo sequencial);
+    - Os resultados chegam ao pai na ordem de conclusão (gerador);
+    - Os logs dos workers passam por uma fila e são escritos pelo pai;
+    - Se um worker morre (segfault, falta de memória), só os documentos que
+      estavam em andamento são reprocessados isoladamente, um por vez; os
+      demais seguem num pool novo e o lote não é perdido;
+    - Uma limpeza que estoura o orçamento de tempo (cleaning.time_budget_s)
+      é interrompida no worker e o documento volta marcado 'quarantined'.
+    """
+
+    def __init__(self, workers=None, language='portuguese', profile_rules=False):
+        self.workers = workers or os.cpu_count() or 1
+        self.language = language
+        self.profile_rules = profile_rules
+
+    @staticmethod
+    def _failure(filepath, error):
+        return {"filepath": filepath, "raw_data": None, "sentences": [],
+                "timings": {}, "quarantined": None, "ocr_failed_pages": 0,
+                "error": str(error)}
+
+    def _run_pool(self, queue, workers, log_queue):
+        """
+        Consome a fila com no máximo `workers` documentos em andamento.
+        Se o pool quebrar, devolve (via StopIteration) os que estavam rodando.
+        """
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(log_queue, self.language, self.profile_rules)) as pool:
+            in_flight = {}
+            while queue or in_flight:
+                while queue and len(in_flight) < workers:
+                    path = queue.popleft()
+                    in_flight[pool.submit(process_pdf_document, path)] = path
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                broken = []
+                for future in done:
+                    path = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        broken.append(path)
+                        continue
+                    except Exception as e:
+                        result = self._failure(path, e)
+                    yield result
+
+                if broken:
+                    return broken + list(in_flight.values())
+        return []
+
+    def run(self, filepaths):
+        log_queue = multiprocessing.Queue()
+        listener = logging.handlers.QueueListener(
+            log_queue, *logging.getLogger().handlers, respect_handler_level=True)
+        listener.start()
+
+        queue = deque(filepaths)
+        try:
+            while queue:
+                suspects = yield from self._run_pool(queue, self.workers, log_queue)
+                if suspects:
+                    logging.error(
+                        f"[PDF BATCH] Um worker morreu. Reprocessando isoladamente: "
+                        f"{', '.join(os.path.basename(p) for p in suspects)}")
+                # Isolamento: o culpado derruba apenas o próprio pool de 1 worker
+                for path in suspects:
+                    still_broken = yield from self._run_pool(deque([path]), 1, log_queue)
+                    if still_broken:
+                        yield self._failure(path, "processo worker morreu (crash)")
+        finally:
+            listener.stop()
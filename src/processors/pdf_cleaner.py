@@ -1,101 +1,21 @@
+import itertools
 import re
+import tempfile
 import unicodedata
 
+from src.processors.cleaning_rules import (
+    CLEANING_RULES, PROFILER, CleaningBudget, apply_rules, needs_re_fallback)
+
 
 class PDFCleaner:
+    # Incrementar ao mudar o código da limpeza (reprocessa os PDFs do
+    # manifesto); as regras têm versão própria no cleaning_rules.yaml
+    VERSION = "1"
+
     # --- 1. CONFIGURAÇÃO DE PADRÕES (Modo Agressivo) ---
-    REGEX_PATTERNS = {
-        'structure': [
-            (r'(\w+)-\s*\n\s*(\w+)', r'\1\2'),
-            (r'^.*(?:\.{4,}|…{2,}).*$', ''),
-            (r'^\s*\d+\s*$', ''),
-            (r'--- PAGE \d+ ---', ''),
-            (r'Página \d+ de \d+', ''),
-        ],
-        'academic_front_matter': [
-            # INSTITUCIONAIS (Topo da página)
-            (r'^\s*INSTITUTO FEDERAL.*', ''),
-            (r'^\s*UNIVERSIDADE.*', ''),
-            (r'^\s*FACULDADE.*', ''),
-            (r'^\s*PRÓ-REITORIA.*', ''),
-            (r'^\s*DIRETORIA DE.*', ''),
-            (r'^\s*COORDENAÇÃO DE.*', ''),
-            (r'^\s*CURSO DE.*', ''),
-            (r'^\s*DEPARTAMENTO DE.*', ''),
-            (r'^\s*PROGRAMA DE PÓS-GRADUAÇÃO.*', ''),
-
-            # NATUREZA DO TRABALHO
-            (r'^\s*TCC-Artigo apresentado.*', ''),  # Específico do seu arquivo
-            (r'^\s*Trabalho de Conclusão de Curso.*', ''),
-            (r'^\s*Monografia submetida.*', ''),
-            (r'^\s*Dissertação.*', ''),
-            (r'^\s*Tese apresentada.*', ''),
-            (r'^\s*Artigo apresentado.*', ''),
-            (r'^\s*Requisito para obtenção.*', ''),
-
-            # PESSOAS E BANCA
-            (r'^\s*Orientador[a]?:.*', ''),
-            (r'^\s*Coorientador[a]?:.*', ''),
-            (r'^\s*Banca Examinadora.*', ''),
-            (r'^\s*Prof\.\s*Dr\..*', ''),
-            (r'^\s*Prof\.\s*Ms\..*', ''),
-            (r'^\s*Aprovado em:.*', ''),
-
-            # ELEMENTOS PRÉ-TEXTUAIS
-            (r'^\s*DEDICATÓRIA.*', ''),
-            (r'^\s*AGRADECIMENTOS.*', ''),
-            (r'^\s*EPÍGRAFE.*', ''),
-            (r'^\s*RESUMO\s*$', ''),
-            (r'^\s*ABSTRACT\s*$', ''),
-            (r'^\s*LISTA DE .*', ''),
-            (r'^\s*SUMÁRIO\s*$', ''),
-            # Pega "CATALOGRÁFICA" e "COTALOGRÁFICA"
-            (r'^\s*FICHA CA[TO]LOGRÁFICA.*', ''),
-        ],
-        'metadata': [
-            (r'NOTA TÉCNICA.*', ''),
-            (r'AMAZÔNIA EM CHAMAS.*', ''),
-            (r'REFERÊNCIAS BIBLIOGRÁFICAS.*', ''),
-            (r'CONSIDERAÇÕES FINAIS.*', ''),
-            (r'ipam\.org\.br.*', ''),
-            (r'ipam_amazonia.*', ''),
-            (r'IPAMamazonia.*', ''),
-            (r'IPAMclima.*', ''),
-            (r'Abril de \d{4} • nº \d+', ''),
-            (r'^\s*Documento Digitalizado.*', ''),  # Final do seu arquivo
-            (r'^\s*Assinado digitalmente.*', ''),
-        ],
-        'contacts': [
-            (r'(?:E-mails?:?\s*)?[\w\.-]+@[\w\.-]+\.\w+', ''),
-            (r'https?://\S+', ''),
-            (r'doi:?\s*10\.\S+', ''),
-            (r'^.*\b\d{5}-\d{3}\b.*$', ''),
-            # Remove linhas com CNPJ
-            (r'^.*\bCNPJ:?\s*\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}\b.*$', ''),
-            (r'^.*(?:Av\.|Rua|Alameda|Bloco|Sala)\s+.*$', ''),
-            (r'^\s*Brasília,\s*DF.*', ''),
-        ],
-        'tables_and_figures': [
-            (r'^(TI|UC|APA|ASR|PP|ND|SI)\s+[\d\.]+\s+[\d\.]+', ''),
-            (r'^Categoria fundiária.*', ''),
-            (r'.*[\d\.,]{3,}\s+[\d\.,]{3,}\s+[\d\.,]{3,}.*', ''),
-            (r'\(\s*(?:ver|vide|consultar|fonte:?)?[:\s]*(?:Figura|Fig\.|Tabela|Tab\.|Quadro|Gráfico|Mapa|Imagem|Foto|Anexo)\s+[\w\d.-]+\s*\)', ''),
-            (r'\b(?:Figura|Fig\.|Tabela|Tab\.|Quadro|Gráfico|Mapa|Imagem|Foto|Anexo)\s+\d+(?:[\.-]\d+)*\b', ''),
-            (r'^\s*(?:Fonte|Foto|Elaboração|Organização):\s+.*$', ''),
-        ],
-        'citations': [
-            (r'\([^\)]+\d{4}[^\)]*\)', ''),
-            (r'.*Global Change Biology.*', ''),
-            (r'.*Ecological Applications.*', ''),
-            (r'.*Proceedings of the National Academy.*', ''),
-        ],
-        'navigation_junk': [
-            (r'^\s*[\d\.]+\s*$', ''),
-            (r'^\s*[•●-]\s*$', ''),
-            (r'^\s*[IVXLCDM]+\.\s*$', ''),
-            (r'^\s*CAPÍTULO\s+[IVXLCDM\d]+\s*$', ''),
-        ]
-    }
+    # Grupos de regras compilados de config/cleaning_rules.yaml (seção
+    # pdf_cleaner), aplicados com IGNORECASE | MULTILINE
+    REGEX_PATTERNS = CLEANING_RULES.section('pdf_cleaner')
 
     # ... (Mantenha ENGLISH_STOPS e PORTUGUESE_STOPS iguais) ...
     ENGLISH_STOPS = {
@@ -111,96 +31,343 @@ class PDFCleaner:
 
     @staticmethod
     def _apply_regex_rules(text, pattern_group):
-        """Aplica regex com flag IGNORECASE e MULTILINE para pegar âncoras ^ corretamente."""
-        for pat, repl in pattern_group:
-            text = re.sub(pat, repl, text, flags=re.MULTILINE | re.IGNORECASE)
-        return text
+        """Aplica as regras (já compiladas com IGNORECASE e MULTILINE) em ordem."""
+        return apply_rules(text, pattern_group, PROFILER)
 
-    @staticmethod
-    def _truncate_at_references(text):
+    # Marcadores de fim do texto útil (grupo end_markers do cleaning_rules.yaml)
+    END_MARKERS = REGEX_PATTERNS['end_markers']
+
+    # Grupos de regras de linha, na ordem do process()
+    LINE_RULE_GROUPS = ('academic_front_matter', 'metadata', 'contacts',
+                        'tables_and_figures', 'navigation_junk')
+
+    # Modo streaming: tamanho dos blocos de texto lidos do spool, limite do
+    # trecho guardado entre blocos à espera do ')' de uma citação e quanto
+    # do fim de cada bloco é examinado atrás de um corte que nenhuma regra
+    # de linha atravesse ("Figura\n4", números de tabela em linhas seguidas)
+    STREAM_CHUNK_CHARS = 64 * 1024
+    MAX_PAREN_CARRY = 64 * 1024
+    STREAM_CUT_WINDOW = 2048
+
+    @classmethod
+    def _last_reference_markers(cls, text, offset=0, found=None):
+        """Última ocorrência (posição, trecho) de cada marcador de fim de texto."""
+        found = {} if found is None else found
+        attr = 're_pattern' if needs_re_fallback(text, cls.END_MARKERS) else 'pattern'
+        for marker in cls.END_MARKERS:
+            if PROFILER.enabled:
+                matches = PROFILER.search(marker, text, getattr(marker, attr))
+            else:
+                matches = list(getattr(marker, attr).finditer(text))
+            if matches:
+                last = matches[-1]
+                found[marker.name] = (offset + last.start(), last.group())
+        return found
+
+    @classmethod
+    def _reference_cut(cls, length, found):
+        """Posição onde o texto deve ser cortado (ou None)."""
+        if length < 1000:
+            return None
+        halfway = length // 2
+
+        for marker in cls.END_MARKERS:
+            if marker.name in found:
+                start, group = found[marker.name]
+                if start > halfway or "Sugestão de citação" in group:
+                    return start
+        return None
+
+    @classmethod
+    def _truncate_at_references(cls, text):
         """
         [ATUALIZADO] Corta referências de forma mais agressiva se encontrar os cabeçalhos.
         """
         if len(text) < 1000:
             return text
+        cut = cls._reference_cut(len(text), cls._last_reference_markers(text))
+        return text if cut is None else text[:cut]
 
-        # Adicionei variações comuns em letras maiúsculas ou mistas
-        end_markers = [
-            r"REFERÊNCIAS BIBLIOGRÁFICAS",
-            r"REFERÊNCIAS BIBLIOGRAFIAS",
-            r"LITERATURA CITADA",
-            r"BIBLIOGRAFIA CONSULTADA",
-            r"Sugestão de citação:.*",
-            r"^REFERÊNCIAS\s*$"  # Referências solto na linha
-        ]
-        halfway = len(text) // 2
-
-        for marker in end_markers:
-            matches = list(re.finditer(
-                marker, text, flags=re.IGNORECASE | re.MULTILINE))
-            if matches:
-                last = matches[-1]
-                if last.start() > halfway or "Sugestão de citação" in last.group():
-                    return text[:last.start()]
-        return text
+    # --- Filtro de linhas (classificação em lote) ---
+    # As regras por linha rodam UMA vez sobre o texto todo (linhas já sem
+    # espaços nas pontas, unidas por '\n'); por isso o \s delas vira
+    # [^\S\n], que não atravessa linhas. O match diz só o nº da linha.
+    # Metadados de referência em qualquer ponto da linha
+    METADATA_GARBAGE = re.compile(
+        r"Acesso em:|Disponível em:|\bv\.[^\S\n]*\d+|\bn\.[^\S\n]*\d+|\bp\.[^\S\n]*\d+"
+        r"|Vol\.[^\S\n]*\d+|Revista|Journal|In:[^\S\n]+[A-Z]|et al\.",
+        re.IGNORECASE
+    )
+    # A mesma regra sobre o texto minúsculo, sem IGNORECASE nem \b no início
+    # das alternativas: assim o sre pula direto para os caracteres iniciais
+    # possíveis (~5x mais rápido). O \b antes de v./n./p. é conferido à parte.
+    METADATA_GARBAGE_LOWER = re.compile(
+        r"acesso em:|disponível em:|[vnp]\.[^\S\n]*\d+|vol\.[^\S\n]*\d+"
+        r"|revista|journal|in:[^\S\n]+[a-z]|et al\."
+    )
+    # Letras que o IGNORECASE iguala a i/s mas o lower() não (as mesmas do
+    # TextCleaner._CASE_EXOTIC): com elas no texto, vale a regra original
+    CASE_EXOTIC = re.compile('[\u0130\u0131\u017f]')
+    # Linha inteira de autores em maiúsculas ("SILVA, J.; SOUZA, M.") - o
+    # [.,] final já garante a vírgula ou o ponto
+    AUTHOR_LINE = re.compile(r'^(?:[A-ZÀ-Ú\.,;-]|[^\S\n]){4,}[\.,]$', re.MULTILINE)
+    RESOLUTION_LINE = re.compile(r'^resolução nº', re.MULTILINE)
+    # Palavras ASCII (no texto minúsculo) e as quebras de linha, em ordem
+    WORD_OR_BREAK = re.compile(r'\b[a-z]+\b|\n')
 
-    # ... (Mantenha _filter_content_lines e process iguais) ...
-    def _filter_content_lines(self, text):
-        lines = text.split('\n')
-        clean_lines = []
+    # Cada palavra vira um código de um caractere: E/P = stopword só em
+    # inglês/português, B = nas duas, w = outra. Por linha, a contagem sai
+    # de str.count() sobre esses códigos, sem laço Python por palavra.
+    STOPWORD_CODES = {
+        **dict.fromkeys(ENGLISH_STOPS - PORTUGUESE_STOPS, 'E'),
+        **dict.fromkeys(PORTUGUESE_STOPS - ENGLISH_STOPS, 'P'),
+        **dict.fromkeys(ENGLISH_STOPS & PORTUGUESE_STOPS, 'B'),
+        '\n': '\n',
+    }
 
-        author_pattern = re.compile(r'^[A-ZÀ-Ú\.\s,;-]{4,}[\.,]$')
-        metadata_garbage = re.compile(
-            r"Acesso em:|Disponível em:|\bv\.\s*\d+|\bn\.\s*\d+|\bp\.\s*\d+|Vol\.\s*\d+|Revista|Journal|In:\s+[A-Z]|et al\.",
-            re.IGNORECASE
-        )
+    @staticmethod
+    def _matching_lines(pattern, text):
+        """Números das linhas de `text` com algum match de `pattern` (que não atravessa linhas)."""
+        lines, line, last = set(), 0, 0
+        for match in pattern.finditer(text):
+            line += text.count('\n', last, match.start())
+            last = match.start()
+            lines.add(line)
+        return lines
 
-        for line in lines:
-            line_str = line.strip()
-            if len(line_str) < 3:
+    @classmethod
+    def _metadata_lines(cls, stripped, joined, lowered):
+        """Números das linhas com metadados de referência (METADATA_GARBAGE)."""
+        search = cls.METADATA_GARBAGE_LOWER.search
+        lines, line, last = set(), 0, 0
+        match = search(lowered)
+        while match:
+            start = match.start()
+            # "v. 12" colado no fim de uma palavra: o \b do original falha.
+            # Nenhum match válido começa dentro deste (só pontuação, espaço e
+            # dígitos depois da letra), então basta seguir depois dele.
+            if lowered[start + 1] == '.' and start and (
+                    lowered[start - 1].isalnum() or lowered[start - 1] == '_'):
+                match = search(lowered, match.end())
                 continue
+            line += lowered.count('\n', last, start)
+            lines.add(line)
+            # Linha já descartada: o resto dela não interessa
+            last = lowered.find('\n', start)
+            if last < 0:
+                break
+            match = search(lowered, last)
 
-            if metadata_garbage.search(line_str):
-                continue
+        # Linhas com İ/ı/ſ: vale a regra original, linha a linha
+        for i in cls._matching_lines(cls.CASE_EXOTIC, joined):
+            if cls.METADATA_GARBAGE.search(stripped[i]):
+                lines.add(i)
+            else:
+                lines.discard(i)
+        return lines
 
-            if author_pattern.match(line_str):
-                if ',' in line_str or '.' in line_str:
-                    continue
+    @classmethod
+    def _english_lines(cls, lowered):
+        """
+        Índices das linhas (de `lowered`, uma por '\\n') em inglês: 3+
+        palavras, 2+ stopwords inglesas e mais inglesas que portuguesas.
+        """
+        tokens = cls.WORD_OR_BREAK.findall(lowered)
+        codes = ''.join(map(cls.STOPWORD_CODES.get, tokens, itertools.repeat('w')))
+        english = set()
+        for i, words in enumerate(codes.split('\n')):
+            if len(words) >= 3:
+                both = words.count('B')
+                eng_score = words.count('E') + both
+                if eng_score >= 2 and eng_score > words.count('P') + both:
+                    english.add(i)
+        return english
 
-            if line_str.lower().startswith('resolução nº'):
-                continue
+    def _filter_content_lines(self, text):
+        """
+        Remove linhas curtas, de metadados de referência, de autores, de
+        resoluções e em inglês; une as que sobram com espaço.
 
-            words = re.findall(r'\b[a-z]+\b', line_str.lower())
-            if len(words) >= 3:
-                eng_score = sum(1 for w in words if w in self.ENGLISH_STOPS)
-                pt_score = sum(1 for w in words if w in self.PORTUGUESE_STOPS)
-                if eng_score > pt_score and eng_score >= 2:
-                    continue
+        Cada regra roda uma vez sobre as linhas unidas por '\\n' (em vez de
+        uma vez por linha); a contagem de stopwords só vê as linhas que
+        sobraram das outras regras. Nos PDFs de data/inputs isso é 1,3x a 2x
+        mais rápido que o laço por linha; em texto em que quase toda linha
+        dispara alguma regra (os casos de borda de
+        benchmarks/bench_line_filter.py) é mais lento: 0,5x a 0,7x.
+        """
+        lines = text.split('\n')
+        stripped = [line.strip() for line in lines]
+        joined = '\n'.join(stripped)
+        # lower() linha a linha == lower() do texto unido (nunca gera '\n')
+        lowered = joined.lower()
+
+        dropped = (self._metadata_lines(stripped, joined, lowered)
+                   | self._matching_lines(self.AUTHOR_LINE, joined)
+                   | self._matching_lines(self.RESOLUTION_LINE, lowered))
+        kept = [i for i, line_str in enumerate(stripped)
+                if len(line_str) >= 3 and i not in dropped]
+
+        lowered_lines = lowered.split('\n')
+        english = self._english_lines('\n'.join([lowered_lines[i] for i in kept]))
+        return " ".join([lines[i] for n, i in enumerate(kept) if n not in english])
+
+    def _clean_structure(self, text):
+        text = unicodedata.normalize('NFC', text)
+        return self._apply_regex_rules(text, self.REGEX_PATTERNS['structure'])
 
-            clean_lines.append(line)
+    def _clean_lines(self, text):
+        """Regras de linha (todas ancoradas na própria linha) + filtro de conteúdo."""
+        for group in self.LINE_RULE_GROUPS:
+            text = self._apply_regex_rules(text, self.REGEX_PATTERNS[group])
 
-        return " ".join(clean_lines)
+        return self._filter_content_lines(text)
+
+    def _clean_citations(self, text):
+        text = self._apply_regex_rules(text, self.REGEX_PATTERNS['citations'])
+        return re.sub(r'\s+', ' ', text).strip()
 
     def process(self, raw_text):
         if not raw_text:
             return ""
 
-        text = unicodedata.normalize('NFC', raw_text)
-
-        text = self._apply_regex_rules(text, self.REGEX_PATTERNS['structure'])
+        text = self._clean_structure(raw_text)
         text = self._truncate_at_references(text)
+        text = self._clean_lines(text)
+        return self._clean_citations(text)
 
-        text = self._apply_regex_rules(
-            text, self.REGEX_PATTERNS['academic_front_matter'])
-        text = self._apply_regex_rules(text, self.REGEX_PATTERNS['metadata'])
-        text = self._apply_regex_rules(text, self.REGEX_PATTERNS['contacts'])
-        text = self._apply_regex_rules(
-            text, self.REGEX_PATTERNS['tables_and_figures'])
-        text = self._apply_regex_rules(
-            text, self.REGEX_PATTERNS['navigation_junk'])
+    # --- Modo streaming (página a página, memória constante) ---
 
-        text = self._filter_content_lines(text)
-        text = self._apply_regex_rules(text, self.REGEX_PATTERNS['citations'])
-        text = re.sub(r'\s+', ' ', text).strip()
+    @staticmethod
+    def _safe_line_cut(text):
+        """
+        Última quebra de linha onde o texto pode ser dividido sem separar uma
+        palavra hifenizada ("quei-\nmadas") da sua continuação.
+        """
+        cut = text.rfind('\n')
+        while cut > 0 and text[:cut].rstrip().endswith('-'):
+            cut = text.rfind('\n', 0, cut)
+        return cut
+
+    def _spool_pages(self, pages, spool, budget):
+        """
+        1ª etapa: limpeza estrutural página a página, gravada num arquivo
+        temporário. A cauda de cada página segue para a próxima (hifenização
+        entre páginas) e as posições dos marcadores de referências são
+        anotadas para o corte. Devolve (tamanho total, marcadores).
+        """
+        carry, length, found = '', 0, {}
+        for page_text in pages:
+            # O orçamento cresce com as páginas e só corre durante a limpeza
+            # (a extração/OCR da próxima página não conta)
+            with budget.allow(page_text):
+                window = self._clean_structure(f"{carry}\n{page_text}" if carry else page_text)
+                cut = self._safe_line_cut(window)
+                if cut <= 0:
+                    carry = window
+                    continue
+                head, carry = window[:cut], window[cut + 1:]
+                self._last_reference_markers(head, length, found)
+            spool.write(head + '\n')
+            length += len(head) + 1
+        if carry:
+            with budget:
+                self._last_reference_markers(carry, length, found)
+            spool.write(carry)
+            length += len(carry)
+        return length, found
+
+    def _read_spool(self, spool, limit):
+        """Blocos de linhas inteiras do spool até a posição `limit`."""
+        spool.seek(0)
+        remaining = limit
+        block, size = [], 0
+        for line in spool:
+            if remaining <= 0:
+                break
+            line = line[:remaining]
+            remaining -= len(line)
+            block.append(line)
+            size += len(line)
+            if size >= self.STREAM_CHUNK_CHARS:
+                yield ''.join(block)
+                block, size = [], 0
+        if block:
+            yield ''.join(block)
+
+    def process_stream(self, pages, budget=None):
+        """
+        Versão streaming do process(): recebe os textos das páginas (gerador)
+        e devolve blocos de texto limpo, sem nunca montar o documento inteiro
+        em memória.
+
+        Contexto entre páginas/blocos:
+          - palavras hifenizadas na virada de página são unidas (o process()
+            não as une, pois o marcador "--- PAGE n ---" fica no meio);
+          - o corte das referências usa as mesmas regras do process(), sobre
+            o documento inteiro (guardado num arquivo temporário);
+          - as regras de linha que atravessam quebras ("Figura\\n4") não
+            são partidas: cada bloco termina numa quebra que nenhuma delas
+            cruza, e o resto segue para o bloco seguinte;
+          - uma citação "(Autor, 2020)" aberta no fim de um bloco espera o
+            ')' no bloco seguinte.
+
+        `budget` (CleaningBudget) limita o tempo de limpeza do documento:
+        estourado, o gerador levanta CleaningTimeout.
+        """
+        budget = budget or CleaningBudget()
+        with tempfile.TemporaryFile(mode='w+', encoding='utf-8') as spool:
+            length, found = self._spool_pages(pages, spool, budget)
+            cut = self._reference_cut(length, found)
+
+            tail, carry = '', ''
+            for block in self._read_spool(spool, length if cut is None else cut):
+                with budget:
+                    block = tail + block
+                    cut = self._rule_safe_cut(block)
+                    block, tail = block[:cut], block[cut:]
+                    text, carry = self._clean_stream_block(block, carry)
+                if text:
+                    yield text
+            with budget:
+                text, carry = self._clean_stream_block(tail, carry)
+                text = " ".join(filter(None, (text, self._clean_citations(carry))))
+            if text:
+                yield text
+
+    def _clean_stream_block(self, block, carry):
+        """
+        Regras de linha + citações de um bloco. Devolve (texto limpo, trecho
+        guardado): a partir do primeiro '(' ainda sem ')', o texto espera o
+        próximo bloco, como a regra de citação o veria no process().
+        """
+        text = self._clean_lines(block)
+        text = f"{carry} {text}" if carry else text
+        open_paren = text.find('(', text.rfind(')') + 1)
+        if open_paren >= 0 and len(text) - open_paren <= self.MAX_PAREN_CARRY:
+            text, carry = text[:open_paren], text[open_paren:]
+        else:
+            carry = ''
+        return self._clean_citations(text), carry
+
+    def _rule_safe_cut(self, block):
+        """
+        Última quebra de linha do fim do bloco que nenhum match das regras
+        de linha atravessa (o bloco inteiro, se não houver). Só conta uma
+        quebra com uma linha não vazia depois dela, já que o match poderia
+        continuar no bloco seguinte.
+        """
+        region = max(0, len(block) - 2 * self.STREAM_CUT_WINDOW)
+        region = block.rfind('\n', 0, region) + 1 if region else 0
+        spans = []
+        for group in self.LINE_RULE_GROUPS:
+            for rule in self.REGEX_PATTERNS[group]:
+                spans.extend(m.span() for m in rule.re_pattern.finditer(block, region)
+                             if '\n' in m.group())
 
-        return text
+        floor = max(region, len(block) - self.STREAM_CUT_WINDOW)
+        cut = block.rstrip().rfind('\n')
+        while cut >= floor:
+            if not any(start <= cut < end for start, end in spans):
+                return cut + 1
+            cut = block.rfind('\n', 0, cut)
+        return len(block)
@@ -8,6 +8,9 @@ import logging
 
 
 class NLTKTokenizer:
+    # Incrementar ao mudar a segmentação (reprocessa os PDFs do manifesto)
+    VERSION = "1"
+
     def __init__(self, language='portuguese'):
         self.language = language
         self._download_resources()
@@ -33,6 +36,22 @@ class NLTKTokenizer:
             return []
         return sent_tokenize(text, language=self.language)
 
+    def tokenize_stream(self, chunks):
+        """
+        Sentenças de um texto que chega em blocos (PDFCleaner.process_stream).
+        A última sentença de cada bloco pode estar incompleta: ela é guardada
+        e segmentada de novo junto com o bloco seguinte.
+        """
+        carry = ''
+        for chunk in chunks:
+            sentences = self.tokenize_sentences(f"{carry} {chunk}" if carry else chunk)
+            if not sentences:
+                continue
+            carry = sentences.pop()
+            yield from sentences
+        if carry:
+            yield carry
+
     def has_content(self, word):
         """
         Verifica se a palavra tem pelo menos uma letra.
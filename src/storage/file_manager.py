@@ -1,3 +1,4 @@
+import itertools
 import json
 import os
 import re
@@ -26,6 +27,31 @@ class FileManager:
         print(f"[STORAGE] Raw JSON salvo: {filename}")
         return filepath
 
+    def stream_raw_json(self, data, pages, source_name):
+        """
+        Versão streaming do save_raw_json(): grava o mesmo JSON, mas o
+        'raw_content' é escrito página a página enquanto `pages` ((nº, texto))
+        é consumido. Devolve (caminho, gerador com os textos das páginas).
+        """
+        filename = self._generate_filename(source_name, "json")
+        filepath = os.path.join(self.base_path, "01_raw", filename)
+
+        def passthrough():
+            with open(filepath, 'w', encoding='utf-8') as f:
+                # Mesmo layout do json.dump(indent=4), com raw_content por último
+                header = json.dumps(data, ensure_ascii=False, indent=4)[:-2]
+                f.write(header + ',\n    "raw_content": "')
+                separator = ''
+                for page_number, text in pages:
+                    chunk = f"{separator}--- PAGE {page_number} ---\n{text}"
+                    f.write(json.dumps(chunk, ensure_ascii=False)[1:-1])
+                    separator = '\n'
+                    yield text
+                f.write('"\n}')
+            print(f"[STORAGE] Raw JSON salvo: {filename}")
+
+        return filepath, passthrough()
+
     def save_processed_text(self, text, source_name):
         filename = self._generate_filename(source_name, "txt")
         filepath = os.path.join(self.base_path, "03_processed", filename)
@@ -37,8 +63,12 @@ class FileManager:
     def save_corpus_for_training(self, sentences, source_name):
         """
         Salva o Corpus Final com filtragem e Logs de Alerta.
+        `sentences` pode ser um gerador (modo streaming): cada sentença é
+        gravada assim que chega.
         """
-        if not sentences:
+        sentences = iter(sentences)
+        first = next(sentences, None)
+        if first is None:
             print(f"[ALERTA] Nenhuma sentença gerada para: {source_name}")
             return None
 
@@ -46,22 +76,28 @@ class FileManager:
         filepath = os.path.join(self.base_path, "04_training_corpus", filename)
 
         count = 0
-        with open(filepath, 'w', encoding='utf-8') as f:
-            for sent in sentences:
-                clean_sent = sent.replace('\n', ' ').strip()
+        try:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                for sent in itertools.chain([first], sentences):
+                    clean_sent = sent.replace('\n', ' ').strip()
 
-                # Validação:
-                # 1. Deve ser narrativa válida
-                # 2. Relaxamos a pontuação: aceitamos terminar em aspas ou parenteses também
-                if TextCleaner.is_narrative_text(clean_sent):
-                    valid_endings = ['.', '!', '?', '"', "'", ')', ':']
+                    # Validação:
+                    # 1. Deve ser narrativa válida
+                    # 2. Relaxamos a pontuação: aceitamos terminar em aspas ou parenteses também
+                    if TextCleaner.is_narrative_text(clean_sent):
+                        valid_endings = ['.', '!', '?', '"', "'", ')', ':']
 
-                    if clean_sent[-1] in valid_endings:
-                        # Remove numeração inicial
-                        clean_sent = re.sub(
-                            r'^\d+(\.\d+)*\.?\s+', '', clean_sent)
-                        f.write(clean_sent + '\n')
-                        count += 1
+                        if clean_sent[-1] in valid_endings:
+                            # Remove numeração inicial
+                            clean_sent = re.sub(
+                                r'^\d+(\.\d+)*\.?\s+', '', clean_sent)
+                            f.write(clean_sent + '\n')
+                            count += 1
+        except BaseException:
+            # Gerador interrompido (ex.: quarentena no modo streaming): nada de
+            # corpus pela metade para o modo compile
+            os.remove(filepath)
+            raise
 
         if count == 0:
             print(
@@ -0,0 +1,57 @@
+import hashlib
+import json
+import re
+from datetime import datetime
+from src.storage.state_store import JSONStateStore
+
+
+class FingerprintStore:
+    """
+    Guarda entre execuções uma impressão digital (SHA-256) do que cada alvo
+    dinâmico entregou. Se o dashboard não mudou, o pipeline pula limpeza,
+    tokenização e gravação.
+
+    Quando há respostas JSON capturadas, a impressão vem delas (os dados
+    exatos); senão, do texto visível com espaços normalizados. Padrões em
+    `ignore_patterns` (ex: "Atualizado em .*") são removidos antes do hash
+    para que relógios e carimbos de data não contem como mudança.
+    """
+
+    def __init__(self, path='data/00_state/dynamic_fingerprints.json'):
+        self.store = JSONStateStore(path)
+        self.entries = self.store.load()
+
+    @staticmethod
+    def fingerprint(raw_data, ignore_patterns=()):
+        if raw_data.get('captured_data'):
+            # Só os dados: URLs de API costumam ter parâmetros anti-cache. As
+            # respostas chegam na ordem em que a rede as entrega: ordenadas,
+            # a mesma coleta dá sempre o mesmo hash
+            payload = json.dumps(sorted(
+                json.dumps(c['data'], sort_keys=True, ensure_ascii=False)
+                for c in raw_data['captured_data']), ensure_ascii=False)
+        else:
+            payload = raw_data.get('content', '')
+        for pattern in ignore_patterns:
+            payload = re.sub(pattern, '', payload)
+        payload = " ".join(payload.split())
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def is_unchanged(self, name, fingerprint):
+        entry = self.entries.get(name)
+        return bool(entry) and entry['hash'] == fingerprint
+
+    def update(self, name, fingerprint):
+        now = datetime.now().isoformat(timespec='seconds')
+        entry = self.entries.setdefault(name, {})
+        if entry.get('hash') != fingerprint:
+            entry['changed_at'] = now
+        entry['hash'] = fingerprint
+        entry['checked_at'] = now
+
+    def touch(self, name):
+        if name in self.entries:
+            self.entries[name]['checked_at'] = datetime.now().isoformat(timespec='seconds')
+
+    def save(self):
+        self.store.save(self.entries)
@@ -0,0 +1,124 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from src.storage.lru import evict_lru
+from src.storage.state_store import JSONStateStore
+
+
+class HTTPCache:
+    """
+    Cache de respostas HTTP em disco.
+
+    Cada URL vira um arquivo <sha1>.body com o HTML bruto (bytes) e uma entrada
+    no index.json com os validadores (ETag / Last-Modified), o Content-Type e o
+    último acesso. Com os validadores o cliente faz requisições condicionais:
+    se o servidor responder 304, o corpo sai do disco e nada é rebaixado.
+
+    O tamanho total é limitado (max_bytes); ao estourar, as entradas menos
+    usadas recentemente são removidas (LRU).
+    """
+
+    STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+    def __init__(self, cache_dir='data/00_state/http_cache',
+                 max_bytes=500 * 1024 * 1024, offline=False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # offline=True: só replay do disco, nenhuma requisição de rede
+        self.offline = offline
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._store = JSONStateStore(os.path.join(self.cache_dir, 'index.json'))
+        self._index = self._store.load()
+        self._lock = threading.Lock()
+        self.stats = {'revalidated': 0, 'offline_hits': 0,
+                      'misses': 0, 'stored': 0, 'evicted': 0}
+
+    def count(self, name):
+        """Soma 1 ao contador `name` de stats (o cache é usado por várias threads)."""
+        with self._lock:
+            self.stats[name] += 1
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _body_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.body")
+
+    def lookup(self, url):
+        """Devolve (entrada, corpo) ou (None, None) se a URL não está no cache."""
+        key = self._key(url)
+        with self._lock:
+            entry = self._index.get(key)
+        if not entry:
+            return None, None
+        try:
+            with open(self._body_path(key), 'rb') as f:
+                body = f.read()
+        except OSError:
+            # Índice e disco dessincronizados: trata como ausente
+            with self._lock:
+                self._index.pop(key, None)
+            return None, None
+        return entry, body
+
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        validators = entry.get('headers', {})
+        if validators.get('ETag'):
+            headers['If-None-Match'] = validators['ETag']
+        if validators.get('Last-Modified'):
+            headers['If-Modified-Since'] = validators['Last-Modified']
+        return headers
+
+    def touch(self, url):
+        with self._lock:
+            entry = self._index.get(self._key(url))
+            if entry:
+                entry['last_access'] = time.time()
+
+    def store(self, url, body, headers):
+        key = self._key(url)
+        with open(self._body_path(key), 'wb') as f:
+            f.write(body)
+
+        with self._lock:
+            self._index[key] = {
+                'url': url,
+                'size': len(body),
+                'headers': {h: headers[h] for h in self.STORED_HEADERS if headers.get(h)},
+                'stored_at': time.time(),
+                'last_access': time.time()
+            }
+            self.stats['stored'] += 1
+            self._evict()
+            self._store.save(self._index)
+
+    def _evict(self):
+        # Chamado com o lock adquirido
+        total = sum(e['size'] for e in self._index.values())
+        entries = [(e['last_access'], e['size'], key) for key, e in self._index.items()]
+        _, evicted = evict_lru(entries, total, self.max_bytes, self._remove)
+        self.stats['evicted'] += evicted
+
+    def _remove(self, key):
+        try:
+            os.remove(self._body_path(key))
+        except OSError:
+            pass
+        del self._index[key]
+
+    def flush(self):
+        with self._lock:
+            self._store.save(self._index)
+
+    def report(self):
+        logging.info(
+            f"[CACHE] {self.stats['revalidated']} revalidadas (304) | "
+            f"{self.stats['offline_hits']} servidas offline | "
+            f"{self.stats['misses']} ausentes | {self.stats['stored']} gravadas | "
+            f"{self.stats['evicted']} despejadas")
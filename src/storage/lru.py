@@ -0,0 +1,30 @@
+"""
+Despejo LRU por tamanho, comum aos caches em disco (HTTPCache, OCRCache).
+"""
+
+# Remove até ficar com folga de 10% para não despejar a cada gravação
+EVICT_TARGET = 0.9
+
+
+def evict_lru(entries, total, max_bytes, remove):
+    """
+    Remove as entradas menos usadas recentemente até `total` voltar a
+    EVICT_TARGET de `max_bytes` (nada, se `total` ainda cabe no limite).
+
+    `entries`: tuplas (último acesso, tamanho, entrada). `remove(entrada)`
+    apaga a entrada e devolve False se não conseguiu (ela não conta).
+    Devolve (novo total, nº de entradas removidas).
+    """
+    if total <= max_bytes:
+        return total, 0
+
+    target = max_bytes * EVICT_TARGET
+    evicted = 0
+    for _, size, entry in sorted(entries, key=lambda item: item[0]):
+        if total <= target:
+            break
+        if remove(entry) is False:
+            continue
+        total -= size
+        evicted += 1
+    return total, evicted
@@ -0,0 +1,108 @@
+import hashlib
+import logging
+import os
+import threading
+from src.storage.lru import evict_lru
+
+
+class OCRCache:
+    """
+    Cache em disco do texto reconhecido pelo OCR, a etapa mais cara do modo
+    pdf. Reexecutar o pipeline (ex: depois de ajustar o cleaner) não roda o
+    Tesseract de novo para as mesmas páginas escaneadas.
+
+    A chave combina o hash do arquivo + nº da página, o DPI, o idioma, a
+    versão do motor de OCR e o renderizador; trocar qualquer um deles gera
+    uma entrada nova em vez de reaproveitar um texto diferente.
+
+    Cada entrada é um arquivo <sha1>.txt próprio (sem índice central) porque
+    vários processos gravam ao mesmo tempo (--workers, faixas de páginas).
+    O último acesso fica no mtime; acima de `max_bytes` as entradas menos
+    usadas recentemente são removidas (LRU).
+    """
+
+    def __init__(self, cache_dir='data/00_state/ocr_cache', max_bytes=200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._total = sum(e.stat().st_size for e in self._entries())
+        self._digests = {}
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+
+    def _entries(self):
+        return [e for e in os.scandir(self.cache_dir) if e.name.endswith('.txt')]
+
+    def file_digest(self, filepath):
+        """SHA-1 do conteúdo do PDF (memorizado por caminho, tamanho e mtime)."""
+        stat = os.stat(filepath)
+        memo_key = (os.path.abspath(filepath), stat.st_size, stat.st_mtime)
+        with self._lock:
+            if memo_key in self._digests:
+                return self._digests[memo_key]
+
+        sha1 = hashlib.sha1()
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha1.update(chunk)
+        with self._lock:
+            self._digests[memo_key] = sha1.hexdigest()
+        return sha1.hexdigest()
+
+    @staticmethod
+    def key(digest, page_number, dpi, lang, engine, renderer):
+        raw = f"{digest}|{page_number}|{dpi}|{lang}|{engine}|{renderer}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.txt")
+
+    def get(self, key):
+        """Texto da página ou None se ainda não foi reconhecida."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+        with self._lock:
+            self.stats['hits'] += 1
+        return text
+
+    def put(self, key, text):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.stats['stored'] += 1
+            self._total += len(text.encode('utf-8'))
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Chamado com o lock adquirido. Relê o diretório: outros processos também gravam
+        entries = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in self._entries()]
+        self._total = sum(size for _, size, _ in entries)
+        self._total, evicted = evict_lru(entries, self._total, self.max_bytes, self._remove)
+        self.stats['evicted'] += evicted
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            return False
+        return True
+
+    def report(self):
+        logging.info(
+            f"[OCR CACHE] {self.stats['hits']} páginas do cache | "
+            f"{self.stats['misses']} ausentes | {self.stats['stored']} gravadas | "
+            f"{self.stats['evicted']} despejadas")
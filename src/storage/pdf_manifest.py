@@ -0,0 +1,108 @@
+import hashlib
+import logging
+import os
+from datetime import datetime
+from src.storage.state_store import JSONStateStore
+
+
+class PDFManifest:
+    """
+    Manifesto do modo pdf: para cada arquivo de data/inputs guarda o hash
+    do conteúdo, a versão do pipeline que o processou e as saídas geradas
+    (01_raw, 04_training_corpus).
+
+    Um documento só é reprocessado se o arquivo mudou, se a versão do
+    pipeline (motor + cleaners + tokenizer) mudou ou se alguma saída
+    registrada sumiu do disco. Ao reprocessar, as saídas antigas são
+    removidas para o modo compile não ver duplicatas.
+
+    Documentos em quarentena (limpeza estourou o orçamento de tempo) ficam
+    registrados sem corpus e também só voltam se o arquivo ou a versão mudar.
+
+    Documentos com páginas em que o OCR falhou são registrados (as saídas
+    continuam rastreadas) com 'ocr_failed_pages' e refeitos na próxima
+    execução, até o OCR passar em todas as páginas.
+    """
+
+    def __init__(self, path='data/00_state/pdf_manifest.json', pipeline_version='',
+                 ignore_history=False):
+        self.store = JSONStateStore(path)
+        self.entries = self.store.load()
+        self.pipeline_version = pipeline_version
+        # --refresh: processa tudo de novo (o manifesto continua sendo atualizado)
+        self.ignore_history = ignore_history
+        self.stats = {'unchanged': 0, 'changed': 0, 'new': 0, 'quarantined': 0,
+                      'ocr_retry': 0}
+
+    @staticmethod
+    def file_digest(filepath):
+        sha1 = hashlib.sha1()
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha1.update(chunk)
+        return sha1.hexdigest()
+
+    @staticmethod
+    def _key(filepath):
+        return os.path.basename(filepath)
+
+    def _is_current(self, entry, digest):
+        return (entry['sha1'] == digest
+                and entry['pipeline_version'] == self.pipeline_version
+                and not entry.get('ocr_failed_pages')
+                and all(os.path.exists(p) for p in entry['outputs'].values()))
+
+    def filter(self, filepaths):
+        """Devolve [(caminho, hash)] dos documentos novos ou alterados."""
+        pending = []
+        for filepath in filepaths:
+            digest = self.file_digest(filepath)
+            entry = self.entries.get(self._key(filepath))
+            if entry is None:
+                self.stats['new'] += 1
+            elif not self.ignore_history and self._is_current(entry, digest):
+                self.stats['unchanged'] += 1
+                if entry.get('quarantined'):
+                    self.stats['quarantined'] += 1
+                continue
+            elif entry.get('ocr_failed_pages'):
+                self.stats['ocr_retry'] += 1
+            else:
+                self.stats['changed'] += 1
+            pending.append((filepath, digest))
+
+        logging.info(
+            f"[MANIFEST] {self.stats['unchanged']} inalterados (pulados, "
+            f"{self.stats['quarantined']} em quarentena) | "
+            f"{self.stats['changed']} alterados | {self.stats['new']} novos | "
+            f"{self.stats['ocr_retry']} refeitos por falha de OCR")
+        return pending
+
+    def record(self, filepath, digest, outputs, quarantined=False, ocr_failed_pages=0):
+        """
+        Registra as saídas do documento e apaga as da versão anterior.
+        Com ocr_failed_pages > 0 o documento volta na próxima execução.
+        """
+        key = self._key(filepath)
+        outputs = {stage: path for stage, path in outputs.items() if path}
+
+        previous = self.entries.get(key, {}).get('outputs', {})
+        for path in previous.values():
+            if path not in outputs.values() and os.path.exists(path):
+                os.remove(path)
+
+        self.entries[key] = {
+            'sha1': digest,
+            'pipeline_version': self.pipeline_version,
+            'outputs': outputs,
+            'processed_at': datetime.now().isoformat(timespec='seconds')
+        }
+        if quarantined:
+            self.entries[key]['quarantined'] = True
+        if ocr_failed_pages:
+            self.entries[key]['ocr_failed_pages'] = ocr_failed_pages
+            logging.warning(
+                f"[MANIFEST] {key}: OCR falhou em {ocr_failed_pages} página(s). "
+                f"O documento será refeito na próxima execução.")
+        # Grava a cada documento: uma interrupção não perde o que já foi feito
+        self.store.save(self.entries)
@@ -0,0 +1,33 @@
+import json
+import logging
+import os
+
+
+class JSONStateStore:
+    """
+    Arquivo JSON de estado que persiste entre execuções do pipeline
+    (índices, filas, fingerprints). A escrita é atômica: grava num arquivo
+    temporário e troca pelo original, para não corromper o estado se o
+    processo for interrompido no meio.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self, default=None):
+        if not os.path.exists(self.path):
+            return {} if default is None else default
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(
+                f"[STATE] Estado ilegível em {self.path} ({e}). Recomeçando vazio.")
+            return {} if default is None else default
+
+    def save(self, data):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
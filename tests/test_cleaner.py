@@ -0,0 +1,20 @@
+from src.processors.cleaner import TextCleaner
+from src.processors.cleaning_rules import RuleSet
+
+
+def _rules(*rules):
+    ruleset = RuleSet.from_dict({
+        'version': 1,
+        'text_cleaner': {'flags': ['IGNORECASE'], 'extra': list(rules)},
+    })
+    return ruleset.group('text_cleaner', 'extra')
+
+
+def test_rule_without_keywords_always_runs():
+    rules = _rules({'pattern': r'\[\d+\]'})
+    assert TextCleaner._remove_rules("Os focos [12] dobraram.", rules) == "Os focos  dobraram."
+
+
+def test_rule_with_keywords_skipped_when_absent():
+    rules = _rules({'pattern': r'\[\d+\]', 'keywords': ['nota']})
+    assert TextCleaner._remove_rules("Os focos [12] dobraram.", rules) == "Os focos [12] dobraram."
@@ -0,0 +1,70 @@
+import re
+import sys
+
+import pytest
+
+from benchmarks.bench_cleaner import synthetic_samples
+from benchmarks.reference_cleaner import ReferenceTextCleaner
+from src.processors.cleaner import TextCleaner
+from src.processors.cleaning_rules import CLEANING_RULES
+
+# Textos no formato do que chega ao cleaner (notícia, nota técnica, painel)
+FIXED = [
+    "Ouça este conteúdo\nQueimadas na Amazônia batem recorde em 2024 — Foto: João Silva/Agência Brasil\n"
+    "Os focos de calor cresceram 42% no Pará, segundo o INPE (ver Figura 2).\n"
+    "VEJA TAMBÉM\nBrigadistas do Ibama atuam no Amazonas\nhttp://g1.globo.com/meio-ambiente/a?b=1",
+    "--- PAGE 1 ---\nNOTA TÉCNICA Nº 5\nipam.org.br/nota-tecnica\nA degradação florestal "
+    "(SILVA et al., 2020) avan- çou sobre áreas protegidas.\nTabela 5\n1.234.567 focos\n"
+    "Sugestão de referência: Silva, J. Fogo. Vol. 3\nREFERÊNCIAS\nSILVA, J. Fogo. 2020.",
+    "Terra Brasilis Queimadas painel\nclicando nesta caixa.\nMATO GROSSO DO SULMATO GROSSO"
+    "PARÁPARANÁ registram √° queda‚Äù nos focos\x07 de calor​ em relação a 2023.",
+]
+
+SAMPLES = FIXED + synthetic_samples(1000)
+
+
+def _public_steps():
+    return [name for name, value in vars(ReferenceTextCleaner).items()
+            if not name.startswith('_') and name not in ('process', 'is_narrative_text')
+            and isinstance(value, staticmethod)]
+
+
+@pytest.mark.parametrize('step', ['process'] + _public_steps())
+def test_matches_reference(step):
+    reference, current = ReferenceTextCleaner(), TextCleaner()
+    failures = [i for i, sample in enumerate(SAMPLES)
+                if getattr(current, step)(sample) != getattr(reference, step)(sample)]
+    assert failures == []
+
+
+def test_is_narrative_text_matches_reference():
+    lines = [line for sample in SAMPLES for line in sample.split('\n')]
+    assert [line for line in lines
+            if TextCleaner.is_narrative_text(line)
+            != ReferenceTextCleaner.is_narrative_text(line)] == []
+
+
+def test_keyword_prefilter_covers_ignorecase():
+    """
+    O pré-filtro por palavra-chave compara com str.lower(): todo caractere
+    que o re.IGNORECASE iguala a uma letra das palavras-chave sem que o
+    lower() dê essa letra tem que estar em _CASE_EXOTIC.
+    """
+    letters = {ch for rules in CLEANING_RULES.section('text_cleaner').values()
+               for rule in rules for keyword in rule.keywords for ch in keyword if ch.isalpha()}
+    letter_class = re.compile('[' + ''.join(sorted(letters)) + ']', re.IGNORECASE)
+    missing = [ch for ch in map(chr, range(sys.maxunicode + 1))
+               if letter_class.fullmatch(ch) and ch.lower() not in letters
+               and ch not in TextCleaner._CASE_EXOTIC]
+    assert missing == []
+
+
+def test_remove_control_characters_every_code_point():
+    """Todo code point, um a um e em blocos (os caminhos ASCII, distintos e translate)."""
+    reference = ReferenceTextCleaner.remove_control_characters
+    current = TextCleaner.remove_control_characters
+    chunks = ["".join(map(chr, range(start, min(start + 4096, sys.maxunicode + 1))))
+              for start in range(0, sys.maxunicode + 1, 4096)]
+    assert [hex(ord(chunk[0])) for chunk in chunks if current(chunk) != reference(chunk)] == []
+    assert [hex(cp) for cp in range(sys.maxunicode + 1)
+            if current(chr(cp)) != reference(chr(cp))] == []
@@ -0,0 +1,22 @@
+from src.storage.fingerprint_store import FingerprintStore
+
+FOCOS = {'estado': 'AM', 'focos': 1520}
+AREA = {'estado': 'AM', 'area_km2': 312.4}
+
+
+def _raw(*captures):
+    return {'captured_data': [{'url': url, 'data': data} for url, data in captures]}
+
+
+def test_fingerprint_ignores_capture_order_and_cache_busting():
+    first = _raw(('https://painel.gov.br/api/focos?_=1712', FOCOS),
+                 ('https://painel.gov.br/api/area?_=1713', AREA))
+    second = _raw(('https://painel.gov.br/api/area?_=1845', AREA),
+                  ('https://painel.gov.br/api/focos?_=1846', FOCOS))
+    assert FingerprintStore.fingerprint(first) == FingerprintStore.fingerprint(second)
+
+
+def test_fingerprint_changes_with_the_data():
+    before = _raw(('https://painel.gov.br/api/focos', FOCOS))
+    after = _raw(('https://painel.gov.br/api/focos', {**FOCOS, 'focos': 1600}))
+    assert FingerprintStore.fingerprint(before) != FingerprintStore.fingerprint(after)
@@ -0,0 +1,103 @@
+import http.server
+import threading
+import time
+
+import pytest
+
+from src.collectors.http_client import ContentRejected, HTTPClient
+from src.collectors.resilience import CircuitBreaker, RetryPolicy
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """/zip: 200 com Content-Type não suportado; /down: 503."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        status, content_type = {'/zip': (200, 'application/zip'),
+                                '/down': (503, 'text/html')}.get(self.path, (200, 'text/html'))
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def _open_circuit(client, breaker, base):
+    for _ in range(breaker.failure_threshold):
+        client.get(f"{base}/down")
+    assert not breaker.allow(f"{base}/")
+    time.sleep(breaker.reset_timeout * 1.5)
+
+
+def test_probe_with_rejected_content_releases_circuit(server):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+    client = HTTPClient(retry_policy=RetryPolicy(max_retries=0), breaker=breaker)
+    _open_circuit(client, breaker, server)
+
+    # A sonda half-open recebe 200 com tipo não suportado: o host respondeu
+    with pytest.raises(ContentRejected):
+        client.get(f"{server}/zip")
+    assert breaker.allow(f"{server}/")
+
+
+def test_probe_with_local_error_frees_the_probe(server, monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+    client = HTTPClient(retry_policy=RetryPolicy(max_retries=0), breaker=breaker)
+    _open_circuit(client, breaker, server)
+
+    def disk_full(*args):
+        raise OSError("disco cheio")
+    monkeypatch.setattr(client, '_consume', disk_full)
+    with pytest.raises(OSError):
+        client.get(f"{server}/")
+    # Sem veredito: a próxima requisição vira a nova sonda
+    assert breaker.allow(f"{server}/")
+
+
+def test_persistent_failure_counts_once_per_request(server):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    client = HTTPClient(retry_policy=RetryPolicy(max_retries=2, backoff_base=0.001),
+                        breaker=breaker)
+    assert client.get(f"{server}/down").status_code == 503
+    assert breaker.allow(f"{server}/")
+    assert client.get(f"{server}/").status_code == 200
+
+
+class _BrokenPDFHandler(http.server.BaseHTTPRequestHandler):
+    """PDF que promete 1 MB e derruba a conexão no meio."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Length', str(1024 * 1024))
+        self.end_headers()
+        self.wfile.write(b'%PDF-1.4 ' + b'x' * (200 * 1024))
+        self.wfile.flush()
+        self.connection.close()
+
+
+@pytest.mark.parametrize('max_pdf_mb', [0.1, 50])
+def test_interrupted_pdf_download_leaves_no_part_file(tmp_path, max_pdf_mb):
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _BrokenPDFHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    client = HTTPClient(downloads_dir=str(tmp_path), max_pdf_mb=max_pdf_mb)
+    try:
+        # 0.1 MB: estoura o limite; 50 MB: a conexão cai antes do fim
+        with pytest.raises(Exception):
+            client.get(f"http://127.0.0.1:{httpd.server_address[1]}/relatorio.pdf")
+    finally:
+        httpd.shutdown()
+    assert list(tmp_path.iterdir()) == []
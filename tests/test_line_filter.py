@@ -0,0 +1,47 @@
+import re
+import sys
+
+from benchmarks.bench_cleaner import synthetic_samples
+from benchmarks.bench_line_filter import edge_lines, filter_inputs
+from benchmarks.reference_line_filter import reference_filter_content_lines
+from src.processors.pdf_cleaner import PDFCleaner
+
+# Trecho de nota técnica como chega ao filtro (autores, metadados, inglês)
+FIXED = """Os focos de calor na Amazônia cresceram em 2024.
+SILVA, J.; SOUZA, M.
+Revista Brasileira de Meteorologia, v. 12, n. 3, p. 10-20
+RESOLUÇÃO Nº 5, de 12 de março
+The results of the analysis show that fire is increasing in the region
+A seca prolongada favoreceu as queimadas no sul do Amazonas.
+İn: Silva, J. Fogo na floresta
+ok"""
+
+
+def test_keeps_and_drops_the_same_lines_as_reference():
+    edges = edge_lines(6000)
+    samples = ([FIXED] + filter_inputs(synthetic_samples(500))
+               + ["\n".join(edges[i:i + 40]) for i in range(0, len(edges), 40)])
+    cleaner = PDFCleaner()
+    assert [i for i, text in enumerate(samples)
+            if cleaner._filter_content_lines(text) != reference_filter_content_lines(text)] == []
+
+
+def test_case_exotic_covers_ignorecase():
+    """
+    O lote casa METADATA_GARBAGE sobre o texto minúsculo, sem IGNORECASE:
+    todo caractere que o IGNORECASE iguala a uma letra da regra sem que o
+    lower() dê essa letra tem que estar em PDFCleaner.CASE_EXOTIC.
+    """
+    letters = set(re.sub(r'\\.|[^a-zà-ú]', '', PDFCleaner.METADATA_GARBAGE_LOWER.pattern))
+    letter_class = re.compile('[' + ''.join(sorted(letters)) + ']', re.IGNORECASE)
+    assert [ch for ch in map(chr, range(sys.maxunicode + 1))
+            if letter_class.fullmatch(ch) and ch.lower() not in letters
+            and not PDFCleaner.CASE_EXOTIC.match(ch)] == []
+
+
+def test_lower_keeps_word_boundaries():
+    """Nenhum caractere deixa de ser (ou passa a ser) \\w no lower() (o \\b do lote)."""
+    word = re.compile(r'\w')
+    assert [hex(ord(ch)) for ch in map(chr, range(sys.maxunicode + 1))
+            if bool(word.match(ch)) != bool(word.match(ch.lower()[-1]))
+            and not PDFCleaner.CASE_EXOTIC.match(ch)] == []
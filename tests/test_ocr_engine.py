@@ -0,0 +1,17 @@
+from src.collectors.ocr_engine import OCRPool
+
+
+class _FullDiskCache:
+    stats = {}
+
+    def put(self, key, text):
+        raise OSError(28, "No space left on device")
+
+
+def test_cache_write_failure_keeps_the_text(monkeypatch):
+    pool = OCRPool(workers=1, cache=_FullDiskCache())
+    monkeypatch.setattr(pool, '_recognize', lambda image: "Focos de calor no Pará")
+    try:
+        assert pool._recognize_safe(0, None, 'chave') == "Focos de calor no Pará"
+    finally:
+        pool.close()
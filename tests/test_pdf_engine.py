@@ -0,0 +1,56 @@
+from collections import Counter
+from concurrent.futures import Future
+
+import fitz
+
+from src.collectors import pdf_engine
+from src.collectors.pdf_engine import PDFEngine
+
+
+class _InlinePool:
+    """ProcessPoolExecutor que roda cada job na hora, no próprio processo."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, func, *args):
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+PAGES = 30
+
+
+def _failing_last_range(filepath, start, end, options):
+    """As primeiras faixas terminam; a última derruba a extração paralela."""
+    if end == PAGES:
+        raise OSError("worker morreu")
+    return [(i + 1, "texto") for i in range(start, end)], Counter(text=end - start)
+
+
+def test_parallel_fallback_counts_each_page_once(tmp_path, monkeypatch):
+    path = str(tmp_path / 'relatorio.pdf')
+    doc = fitz.open()
+    for i in range(PAGES):
+        doc.new_page().insert_text((72, 72), f"Focos de calor na Amazônia, página {i + 1}. " * 5)
+    doc.save(path)
+    doc.close()
+
+    engine = PDFEngine(page_workers=3, split_min_pages=20)
+    monkeypatch.setattr(pdf_engine, 'ProcessPoolExecutor', _InlinePool)
+    monkeypatch.setattr(pdf_engine, '_extract_page_range', _failing_last_range)
+    try:
+        assert engine.parse(path) is not None
+    finally:
+        engine.close()
+    assert engine.stats['text'] == PAGES
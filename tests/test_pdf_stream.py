@@ -0,0 +1,75 @@
+from main import PipelineController
+from src.processors.pdf_cleaner import PDFCleaner
+from src.storage.file_manager import FileManager
+
+PARAGRAPH = ("A fumaça das queimadas na Amazônia afeta a saúde da população "
+             "das cidades próximas durante toda a estação seca.")
+
+# Trechos que as regras pegam atravessando a quebra de linha
+CROSSING = [
+    "Os focos de calor cresceram muito no período, conforme a Figura\n4",
+    "Extensão dos alertas de desmatamento em 2021\n3,4\n0,1\n9,4",
+    "A estiagem foi mais longa no sul do estado (como já descrito no relatório "
+    "de monitoramento\n" + "\n".join([PARAGRAPH] * 6) + "\nSILVA, 2020).",
+]
+
+
+def _pages():
+    pages = []
+    for i, crossing in enumerate(CROSSING * 4):
+        pages.append("\n".join([PARAGRAPH] * (3 + i % 5) + [crossing] + [PARAGRAPH] * 2))
+    return pages
+
+
+def test_stream_matches_process_across_block_boundaries():
+    pages = _pages()
+    cleaner = PDFCleaner()
+    # Sem o marcador "--- PAGE n ---" entre as páginas as duas versões
+    # recebem o mesmo texto
+    expected = cleaner.process("\n".join(pages)).split()
+    # Vários tamanhos de bloco: algum corte cai no meio de cada trecho
+    for chunk_chars in range(100, 1200, 37):
+        cleaner.STREAM_CHUNK_CHARS = chunk_chars
+        assert " ".join(cleaner.process_stream(iter(pages))).split() == expected, chunk_chars
+
+
+class _BrokenEngine:
+    """PDF que abre, entrega uma página e quebra na seguinte."""
+
+    stats = {'ocr_failed': 0}
+
+    def stream(self, filepath):
+        def pages():
+            yield 1, PARAGRAPH
+            raise RuntimeError("xref corrompida")
+        return {'source': filepath}, pages()
+
+
+class _Tokenizer:
+    def tokenize_stream(self, chunks):
+        for chunk in chunks:
+            yield chunk
+
+
+class _Manifest:
+    def __init__(self):
+        self.recorded = []
+
+    def record(self, *args, **kwargs):
+        self.recorded.append(args)
+
+
+def test_stream_failure_leaves_nothing_behind(tmp_path):
+    ctrl = PipelineController.__new__(PipelineController)
+    ctrl.settings = {}
+    ctrl.pdf_engine = _BrokenEngine()
+    ctrl.pdf_cleaner = PDFCleaner()
+    ctrl.tokenizer = _Tokenizer()
+    ctrl.storage = FileManager(base_path=str(tmp_path))
+    ctrl.pdf_manifest = _Manifest()
+
+    ctrl._stream_pdf('relatorio.pdf', 'abc123', 'relatorio')
+
+    assert ctrl.pdf_manifest.recorded == []
+    assert list((tmp_path / '01_raw').iterdir()) == []
+    assert list((tmp_path / '04_training_corpus').iterdir()) == []
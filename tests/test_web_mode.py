@@ -0,0 +1,55 @@
+import pytest
+
+from main import PipelineController
+from src.collectors.frontier import URLFrontier
+from src.collectors.resilience import RetryQueue
+
+
+class _OfflineFetcher:
+    """Replay do cache em que nenhuma URL está no disco (OfflineCacheMiss -> None)."""
+
+    def fetch_all(self, urls):
+        for url in urls:
+            yield url, None
+
+
+class _HTTP:
+    transient_failures = {}
+
+    def close(self):
+        pass
+
+
+class _Scraper:
+    http = _HTTP()
+
+
+@pytest.fixture
+def controller(tmp_path):
+    def build(cache_only):
+        ctrl = PipelineController.__new__(PipelineController)
+        ctrl.cache_only = cache_only
+        ctrl.web_fetcher = _OfflineFetcher()
+        ctrl.news_scraper = _Scraper()
+        ctrl.frontier = URLFrontier(index_path=str(tmp_path / 'frontier.json'),
+                                    ignore_history=cache_only)
+        ctrl.retry_queue = RetryQueue(path=str(tmp_path / 'retry.json'))
+        return ctrl
+    return build
+
+
+def test_cache_only_keeps_retry_queue_and_frontier(controller):
+    url = 'https://g1.globo.com/meio-ambiente/noticia/queimadas.ghtml'
+    online = controller(cache_only=False)
+    online.frontier.mark_fetched(url, success=True)
+    online.frontier.save()
+    online.retry_queue.add('https://g1.globo.com/fora-do-ar', 'ConnectionError')
+    online.retry_queue.save()
+
+    offline = controller(cache_only=True)
+    offline.run_web_mode(urls=[url])
+
+    after = controller(cache_only=False)
+    assert after.retry_queue.pending() == ['https://g1.globo.com/fora-do-ar']
+    entry = after.frontier.index[URLFrontier.canonicalize(url)]
+    assert entry['status'] == 'ok'